@@ -0,0 +1,59 @@
+"""
+backend_select.py - Inference backend and RIFE model file resolution
+
+process() runs RIFE on the first backend whose VapourSynth plugin is
+loaded, in BACKEND_PREFERENCE order, unless the backend opt names one that
+is available; CPU backends split the cores into a few streams. The model
+file is looked up by model number in the candidate models directories.
+Kept free of VapourSynth so the choices can be tested on its own.
+"""
+
+import os
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Backend name -> VapourSynth plugin namespace it runs on
+BACKEND_PLUGINS = {
+    "trt": "trt",
+    "ncnn": "ncnn",
+    "ov_cpu": "ov",
+    "ort_cpu": "ort",
+}
+BACKEND_PREFERENCE = ("trt", "ncnn", "ov_cpu", "ort_cpu")  # Order tried for "auto"
+
+CORES_PER_STREAM = 4
+MAX_CPU_STREAMS = 4
+
+# RIFE model files by model number (under <models>/rife_v2/)
+MODEL_FILES = {
+    4151: "rife_v4.15_lite",
+    4221: "rife_v4.22_lite",
+}
+DEFAULT_MODEL_FILE = "rife_v4.15"
+
+def available_backends(has_plugin: Callable[[str], bool]) -> List[str]:
+    """Backends whose plugin namespace has_plugin() reports loaded, in
+    BACKEND_PREFERENCE order."""
+    return [name for name in BACKEND_PREFERENCE if has_plugin(BACKEND_PLUGINS[name])]
+
+def pick_backend(requested: str, available: Sequence[str]) -> Optional[str]:
+    """requested if it is available, otherwise the first available backend
+    ("auto" included); None when there is none."""
+    if requested in available:
+        return requested
+    return available[0] if available else None
+
+def cpu_streams(cores: Optional[int] = None) -> Tuple[int, int]:
+    """(streams, threads per stream) for CPU inference: about 4 cores per
+    stream, at most 4 streams, all cores in use."""
+    cores = cores or os.cpu_count() or 1
+    streams = max(1, min(MAX_CPU_STREAMS, cores // CORES_PER_STREAM))
+    return streams, max(1, cores // streams)
+
+def find_model(model: int, dirs: Iterable[str]) -> Tuple[Optional[str], List[str]]:
+    """Path of a RIFE model's .onnx (first hit in dirs), and the paths tried."""
+    name = "rife_v2/" + MODEL_FILES.get(model, DEFAULT_MODEL_FILE) + ".onnx"
+    tried = [os.path.join(d, name) for d in dirs]
+    for path in tried:
+        if os.path.exists(path):
+            return path, tried
+    return None, tried
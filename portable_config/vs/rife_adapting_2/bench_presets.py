@@ -0,0 +1,293 @@
+"""
+bench_presets.py - Headless benchmark of the portable_config/vs/*.vpy presets
+
+Usage:
+    python bench_presets.py [--presets MEMC_RIFE_NV,NR_CCD_STD] [--res 720p,1080p]
+                            [--frames 240] [--json results.json] [--compare old.json]
+
+Every preset runs once per resolution in its own worker process, fed a
+synthetic video_in (BlankClip, or --source <file> resized to the resolution)
+and the other variables mpv's vapoursynth filter provides. A worker reports
+time to the first frame, output frames/second, the p95 interval between
+output frames and its peak memory. Presets whose plugins (or k7sfunc) are not
+installed are reported as skipped. --json/--csv write the results table;
+--compare prints the fps change against an earlier --json file.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import platform
+import subprocess
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from proc_stats import MB, percentile, process_memory
+
+PRESET_DIR = Path(__file__).resolve().parent.parent  # portable_config/vs
+RESOLUTIONS = {
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '2160p': (3840, 2160),
+}
+FIELDS = ('preset', 'resolution', 'status', 'first_frame_ms', 'fps', 'ms_per_frame',
+          'p95_frame_ms', 'peak_mem_mb', 'output', 'detail')
+
+def discover_presets(names: Optional[List[str]] = None) -> List[Path]:
+    """Preset files in PRESET_DIR, optionally only the given names (without .vpy)."""
+    presets = sorted(PRESET_DIR.glob('*.vpy'))
+    if names:
+        wanted = set(names)
+        presets = [p for p in presets if p.stem in wanted]
+    return presets
+
+def parse_fps(text: str) -> tuple:
+    """'23.976' -> (24000, 1001); '25' -> (25, 1); '30000/1001' as given."""
+    if '/' in text:
+        num, den = text.split('/')
+        return int(num), int(den)
+    value = Fraction(text)
+    ntsc = round(value * Fraction(1001, 1000))
+    if value.denominator != 1 and abs(value - Fraction(ntsc * 1000, 1001)) < Fraction(1, 100):
+        return ntsc * 1000, 1001
+    value = value.limit_denominator(1001)
+    return value.numerator, value.denominator
+
+def classify_error(exc: BaseException) -> str:
+    """'skipped' for a missing module/plugin, 'error' for anything else."""
+    if isinstance(exc, ImportError):
+        return 'skipped'
+    message = str(exc)
+    if isinstance(exc, AttributeError) and ('namespace' in message or 'no attribute' in message):
+        return 'skipped'
+    if 'No attribute with the name' in message or 'There is no function named' in message:
+        return 'skipped'
+    return 'error'
+
+# ---------------------------------------------------------------------------
+# Worker (runs one preset at one resolution)
+# ---------------------------------------------------------------------------
+
+def make_source(vs, width: int, height: int, fps: tuple, length: int, source: Optional[str] = None):
+    """The clip handed to the preset as video_in."""
+    core = vs.core
+    if source:
+        reader = getattr(core, 'lsmas', None) or getattr(core, 'ffms2', None) or getattr(core, 'bs', None)
+        if reader is None:
+            raise ImportError('No source filter (lsmas, ffms2 or bs) for --source')
+        if hasattr(reader, 'LWLibavSource'):
+            clip = reader.LWLibavSource(source)
+        elif hasattr(reader, 'VideoSource'):
+            clip = reader.VideoSource(source)
+        else:
+            clip = reader.Source(source)
+        clip = core.resize.Bicubic(clip, width=width, height=height, format=vs.YUV420P8)
+        clip = core.std.Loop(clip, times=-(-length // clip.num_frames))[:length]
+        return core.std.AssumeFPS(clip, fpsnum=fps[0], fpsden=fps[1])
+    return core.std.BlankClip(format=vs.YUV420P8, width=width, height=height, length=length,
+                              fpsnum=fps[0], fpsden=fps[1], color=[64, 128, 128])
+
+def run_preset(path: Path, width: int, height: int, frames: int, fps: tuple,
+               source: Optional[str] = None) -> Dict[str, object]:
+    """Build a preset on a synthetic video_in and time its output."""
+    row = {'status': 'ok'}
+    try:
+        import vapoursynth as vs
+    except ImportError as e:
+        return {'status': 'skipped', 'detail': f'vapoursynth: {e}'}
+
+    sys.path.insert(0, str(path.parent))
+    try:
+        namespace = {
+            '__file__': str(path),
+            '__name__': '__vapoursynth__',
+            'video_in': make_source(vs, width, height, fps, frames * 4, source),
+            'video_in_dw': width,
+            'video_in_dh': height,
+            'container_fps': fps[0] / fps[1],
+            'display_fps': 60.0,
+            'display_res': [3840, 2160],
+            'user_data': '',
+        }
+        start = time.perf_counter()
+        exec(compile(path.read_text(encoding='utf-8'), str(path), 'exec'), namespace)
+        out = vs.get_output(0)
+        out = out.clip if hasattr(out, 'clip') else out
+        row['output'] = f"{out.width}x{out.height} {out.format.name} {out.fps}"
+
+        out.get_frame(0)
+        row['first_frame_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        count = min(frames, out.num_frames - 1)
+        stamps = [time.perf_counter()]
+        for _ in out[1:count + 1].frames():
+            stamps.append(time.perf_counter())
+        intervals = [(b - a) * 1000 for a, b in zip(stamps, stamps[1:])]
+        elapsed = stamps[-1] - stamps[0]
+        row['fps'] = round(count / elapsed, 2) if elapsed > 0 else None
+        row['ms_per_frame'] = round(elapsed * 1000 / count, 2) if count else None
+        row['p95_frame_ms'] = round(percentile(intervals, 95), 2) if intervals else None
+    except Exception as e:
+        row = {'status': classify_error(e), 'detail': f"{type(e).__name__}: {e}".strip()[:300]}
+    finally:
+        vs.clear_outputs()
+    peak = process_memory()[1]
+    row['peak_mem_mb'] = round(peak / MB, 1) if peak else None
+    return row
+
+def worker_main(argv: List[str]):
+    """Entry point of the worker process: prints one JSON result line."""
+    parser = argparse.ArgumentParser(prog='bench_presets.py --worker')
+    parser.add_argument('preset')
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('--frames', type=int, required=True)
+    parser.add_argument('--fps', required=True)
+    parser.add_argument('--source')
+    args = parser.parse_args(argv)
+    row = run_preset(Path(args.preset), args.width, args.height, args.frames,
+                     parse_fps(args.fps), args.source)
+    print(json.dumps(row))
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run_case(path: Path, resolution: str, frames: int, fps: str, timeout: float,
+             source: Optional[str] = None, python: str = sys.executable) -> Dict[str, object]:
+    """Run one preset/resolution in a fresh worker process."""
+    width, height = RESOLUTIONS[resolution]
+    cmd = [python, str(Path(__file__).resolve()), '--worker', str(path), str(width), str(height),
+           '--frames', str(frames), '--fps', fps]
+    if source:
+        cmd += ['--source', source]
+    row = {'preset': path.stem, 'resolution': resolution}
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        row.update(status='timeout', detail=f'no result after {timeout:.0f}s')
+        return row
+    lines = proc.stdout.strip().splitlines()
+    try:
+        row.update(json.loads(lines[-1]))
+    except (IndexError, ValueError):
+        tail = (proc.stderr.strip().splitlines() or [f'exit code {proc.returncode}'])[-1]
+        row.update(status='error', detail=tail[:300])
+    return row
+
+def compare_results(old: List[dict], new: List[dict]) -> List[dict]:
+    """fps of each preset/resolution in both runs and the relative change."""
+    before = {(r['preset'], r['resolution']): r for r in old}
+    changes = []
+    for row in new:
+        prev = before.get((row['preset'], row['resolution']))
+        if not prev or not prev.get('fps') or not row.get('fps'):
+            continue
+        changes.append({'preset': row['preset'], 'resolution': row['resolution'],
+                        'old_fps': prev['fps'], 'new_fps': row['fps'],
+                        'change_pct': round((row['fps'] / prev['fps'] - 1) * 100, 1)})
+    return changes
+
+def environment() -> Dict[str, str]:
+    """Versions recorded with the results so runs can be told apart."""
+    info = {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count()}
+    try:
+        import vapoursynth as vs
+        info['vapoursynth'] = str(vs.core.core_version)
+        import k7sfunc
+        info['k7sfunc'] = getattr(k7sfunc, '__version__', 'unknown')
+    except ImportError:
+        pass
+    return info
+
+def write_results(results: List[dict], path: Path):
+    """Write the results table as .csv, or as .json with the environment."""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+def _cell(value, width: int) -> str:
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{width}}"
+
+def print_results(results: List[dict]):
+    print(f"{'Preset':<16} {'Res':<6} {'Status':<8} {'1st ms':>8} {'fps':>8} "
+          f"{'ms/f':>8} {'p95 ms':>8} {'MB':>8}  Detail")
+    for row in results:
+        print(f"{row['preset']:<16} {row['resolution']:<6} {row['status']:<8} "
+              f"{_cell(row.get('first_frame_ms'), 8)} {_cell(row.get('fps'), 8)} "
+              f"{_cell(row.get('ms_per_frame'), 8)} {_cell(row.get('p95_frame_ms'), 8)} "
+              f"{_cell(row.get('peak_mem_mb'), 8)}  {row.get('detail') or row.get('output') or ''}")
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the vs/*.vpy presets on synthetic input',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                  # Every preset at 720p/1080p/1440p/2160p
+  %(prog)s --presets NR_CCD_STD --res 1080p # One preset, one resolution
+  %(prog)s --json new.json --compare old.json
+        """
+    )
+    parser.add_argument('--presets', help='Comma-separated preset names (default: all)')
+    parser.add_argument('--res', default=','.join(RESOLUTIONS),
+                        help='Comma-separated resolutions (default: %(default)s)')
+    parser.add_argument('--frames', type=int, default=240, help='Output frames timed per run')
+    parser.add_argument('--fps', default='23.976', help='container_fps of the synthetic source')
+    parser.add_argument('--source', help='Use this video (resized) instead of a BlankClip')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds per run (engine builds are slow)')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter with VapourSynth for the workers')
+    parser.add_argument('--json', metavar='PATH', help='Write results (with environment) as JSON')
+    parser.add_argument('--csv', metavar='PATH', help='Write results as CSV')
+    parser.add_argument('--compare', metavar='PATH', help='Print fps changes against an earlier --json file')
+    args = parser.parse_args()
+
+    resolutions = [r.strip() for r in args.res.split(',') if r.strip()]
+    unknown = [r for r in resolutions if r not in RESOLUTIONS]
+    if unknown:
+        parser.error(f"unknown resolution(s): {', '.join(unknown)} (choose from {', '.join(RESOLUTIONS)})")
+    presets = discover_presets(args.presets.split(',') if args.presets else None)
+    if not presets:
+        parser.error(f"no presets found in {PRESET_DIR}")
+
+    results = []
+    for path in presets:
+        for resolution in resolutions:
+            row = run_case(path, resolution, args.frames, args.fps, args.timeout, args.source, args.python)
+            results.append(row)
+            print(f"  {row['preset']} {resolution}: {row['status']}"
+                  + (f" {row['fps']} fps" if row.get('fps') else ''), file=sys.stderr)
+
+    print_results(results)
+    if args.json:
+        write_results(results, args.json)
+    if args.csv:
+        write_results(results, args.csv)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            old = json.load(f)['results']
+        print()
+        for change in compare_results(old, results):
+            print(f"{change['preset']:<16} {change['resolution']:<6} {change['old_fps']:>8} -> "
+                  f"{change['new_fps']:>8}  ({change['change_pct']:+.1f}%)")
+
+if __name__ == '__main__':
+    main()
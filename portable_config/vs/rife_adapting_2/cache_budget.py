@@ -0,0 +1,44 @@
+"""
+cache_budget.py - Frame cache budget and memory figures for the RIFE graph
+
+process() sizes VapourSynth's frame cache from what its stages actually
+hold: about one frame per stage for every worker thread plus some lookahead,
+capped at a share of the memory still available (several mpv instances may
+run the filter at once). When the cap cannot hold that many frames, the
+thread count is lowered to match instead of letting the cache thrash.
+Kept free of VapourSynth so the policy can be tested on its own.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+from proc_stats import MB
+
+MEMORY_SHARE = 0.25   # Largest share of available memory the cache may take
+LOOKAHEAD_FRAMES = 4  # Frames per stage cached beyond one per thread
+MIN_CACHE_MB = 256    # Never below this (VapourSynth's own default is 4096)
+MIN_THREADS = 2
+
+def frame_bytes(width: int, height: int, bytes_per_sample: int, num_planes: int,
+                subsampling_w: int = 0, subsampling_h: int = 0) -> int:
+    """Size of one frame; planes after the first are subsampled (YUV)."""
+    luma = width * height * bytes_per_sample
+    chroma = (width >> subsampling_w) * (height >> subsampling_h) * bytes_per_sample
+    return luma + chroma * (num_planes - 1)
+
+def plan_cache(stage_bytes: Sequence[int], threads: int, available: Optional[int],
+               lookahead: int = LOOKAHEAD_FRAMES) -> Tuple[int, int]:
+    """(threads, cache size in MB) for stages whose frames take stage_bytes.
+
+    The cache is sized for threads + lookahead frames of every stage (more
+    lookahead when frames are prefetched). If MEMORY_SHARE of the available
+    memory (bytes, None if unknown) holds fewer, the threads are cut to what
+    it holds and the cache sized for them; below MIN_THREADS the graph's
+    needs win over the cap.
+    """
+    per_frame = max(1, sum(stage_bytes))
+    threads = max(1, threads)
+    cap = int(available * MEMORY_SHARE) if available else None
+    if cap is not None and per_frame * (threads + lookahead) > cap:
+        threads = max(min(threads, MIN_THREADS), cap // per_frame - lookahead)
+    wanted = per_frame * (threads + lookahead)
+    return threads, max(MIN_CACHE_MB, -(-wanted // MB))
@@ -0,0 +1,249 @@
+"""
+calibrate.py - Measure the pixel budgets rife_core.calculate_targets uses
+
+Usage:
+    python calibrate.py [--models 4151,4221] [--backends auto] [--device 0]
+                        [--mp 1,1.5,2,2.5,3,4] [--fps 23.976] [--headroom 1.15]
+
+For every model and backend, process() runs on a synthetic 16:9 source at
+each megapixel step, once with the VSR path (4:2:0 output) and once
+without, each in its own worker process (see bench_presets). The largest
+size whose output rate still reaches 2x --fps times --headroom (interpolated
+between the last step that kept up and the first that did not) becomes
+max_pixels_vsr_on/off. Results are stored in
+portable_config/_cache/rife_profiles.json keyed by "<backend>:<device>" (the
+backend that ran, so "auto" is stored as what it resolved to) and model;
+rife_main.lua prefers them over its hand-tuned opts and scales them
+to the playing content's fps.
+"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bench_presets import classify_error, make_source, parse_fps
+from proc_stats import percentile
+
+PROFILE_PATH = Path(__file__).parent.parent.parent / "_cache" / "rife_profiles.json"  # portable_config/_cache
+MODELS = (4151, 4221)
+MEGAPIXELS = (1.0, 1.5, 2.0, 2.5, 3.0, 4.0)
+HEADROOM = 1.15  # Required rate = 2x content fps times this
+ALIGN = 32       # Same alignment as rife_core.calculate_targets
+
+def calibration_shape(megapixels: float) -> Tuple[int, int]:
+    """16:9 shape of about megapixels, both sides aligned down to ALIGN."""
+    height = int((megapixels * 1e6 * 9 / 16) ** 0.5) // ALIGN * ALIGN
+    return height * 16 // 9 // ALIGN * ALIGN, height
+
+def derive_budget(points: Sequence[dict], required: float) -> Optional[float]:
+    """Largest megapixels sustaining `required` output fps.
+
+    points are {'megapixels', 'fps'} in increasing size. Between the last
+    point that kept up and the first that did not, fps is interpolated
+    linearly; if even the smallest fails, constant pixel throughput is
+    assumed below it. Sizes above the largest passing point are never
+    extrapolated. None without any measurement.
+    """
+    measured = [p for p in points if p.get('fps')]
+    if not measured:
+        return None
+    last_pass = None
+    for point in measured:
+        if point['fps'] >= required:
+            last_pass = point
+            continue
+        if last_pass is None:
+            return round(point['megapixels'] * point['fps'] / required, 2)
+        if point['fps'] < last_pass['fps']:
+            share = (last_pass['fps'] - required) / (last_pass['fps'] - point['fps'])
+            return round(last_pass['megapixels'] + share * (point['megapixels'] - last_pass['megapixels']), 2)
+        return last_pass['megapixels']
+    return last_pass['megapixels']
+
+# ---------------------------------------------------------------------------
+# Profile store
+# ---------------------------------------------------------------------------
+
+def device_key(backend: str, device: int) -> str:
+    return f"{backend}:{device}"
+
+def load_profiles(path: Path = PROFILE_PATH) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'devices': {}}
+
+def store_profile(profiles: dict, backend: str, device: int, model: int, entry: dict,
+                  device_name: Optional[str] = None) -> dict:
+    """Put one model's calibration under its device; returns profiles."""
+    devices = profiles.setdefault('devices', {})
+    slot = devices.setdefault(device_key(backend, device), {'models': {}})
+    if device_name:
+        slot['name'] = device_name
+    slot.setdefault('models', {})[str(model)] = entry
+    return profiles
+
+def save_profiles(profiles: dict, path: Path = PROFILE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, indent=1)
+    tmp.replace(path)
+
+def device_name(backend: str, device: int) -> Optional[str]:
+    """GPU name from nvidia-smi, the CPU for CPU backends (None if unknown)."""
+    if backend.endswith('_cpu'):
+        return platform.processor() or platform.machine()
+    try:
+        proc = subprocess.run(['nvidia-smi', '--query-gpu=name', '--format=csv,noheader', '-i', str(device)],
+                              capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+# ---------------------------------------------------------------------------
+# Worker (runs process() at one shape)
+# ---------------------------------------------------------------------------
+
+def run_point(model: int, backend: str, device: int, width: int, height: int, vsr: bool,
+              frames: int, fps: tuple) -> Dict[str, object]:
+    """Build process() on a BlankClip of width x height and time its output."""
+    row = {'status': 'ok'}
+    try:
+        import vapoursynth as vs
+        import rife_processor
+    except ImportError as e:
+        return {'status': 'skipped', 'detail': f'{e}'}
+
+    try:
+        clip = make_source(vs, width, height, fps, frames)
+        # A blank source is all duplicates: pair routing would skip inference
+        out = rife_processor.process(clip, 0, 0, 0, 0, width, height, model, device, 2,
+                                     backend=backend, vsr=vsr, log_level="warning",
+                                     dup_threshold=0, sc_threshold=0)
+        out.get_frame(0)
+        count = min(2 * frames - 2, out.num_frames - 1)
+        stamps = [time.perf_counter()]
+        for _ in out[1:count + 1].frames():
+            stamps.append(time.perf_counter())
+        elapsed = stamps[-1] - stamps[0]
+        intervals = [(b - a) * 1000 for a, b in zip(stamps, stamps[1:])]
+        row['backend'] = rife_processor.select_backend(backend)
+        row['fps'] = round(count / elapsed, 2) if elapsed > 0 else None
+        row['p95_frame_ms'] = round(percentile(intervals, 95), 2) if intervals else None
+    except Exception as e:
+        row = {'status': classify_error(e), 'detail': f"{type(e).__name__}: {e}".strip()[:300]}
+    return row
+
+def worker_main(argv: List[str]):
+    """Entry point of the worker process: prints one JSON result line."""
+    parser = argparse.ArgumentParser(prog='calibrate.py --worker')
+    parser.add_argument('model', type=int)
+    parser.add_argument('backend')
+    parser.add_argument('device', type=int)
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('--vsr', action='store_true')
+    parser.add_argument('--frames', type=int, required=True)
+    parser.add_argument('--fps', required=True)
+    args = parser.parse_args(argv)
+    print(json.dumps(run_point(args.model, args.backend, args.device, args.width, args.height,
+                               args.vsr, args.frames, parse_fps(args.fps))))
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def measure(model: int, backend: str, device: int, megapixels: float, vsr: bool, frames: int,
+            fps: str, timeout: float, python: str = sys.executable) -> Dict[str, object]:
+    """One calibration point in a fresh worker process."""
+    width, height = calibration_shape(megapixels)
+    cmd = [python, str(Path(__file__).resolve()), '--worker', str(model), backend, str(device),
+           str(width), str(height), '--frames', str(frames), '--fps', fps]
+    if vsr:
+        cmd.append('--vsr')
+    point = {'megapixels': round(width * height / 1e6, 3), 'shape': f"{width}x{height}", 'vsr': vsr}
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        point.update(status='timeout', detail=f'no result after {timeout:.0f}s')
+        return point
+    try:
+        point.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    except (IndexError, ValueError):
+        tail = (proc.stderr.strip().splitlines() or [f'exit code {proc.returncode}'])[-1]
+        point.update(status='error', detail=tail[:300])
+    return point
+
+def calibrate(model: int, backend: str, device: int, megapixels: Sequence[float], frames: int,
+              fps: str, headroom: float, timeout: float, python: str = sys.executable) -> Optional[dict]:
+    """Profile entry for one model/backend, or None if nothing could run."""
+    num, den = parse_fps(fps)
+    required = 2 * num / den * headroom
+    entry = {'fps': round(num / den, 3), 'headroom': headroom, 'required_fps': round(required, 2),
+             'calibrated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'points': []}
+    for vsr, name in ((True, 'max_pixels_vsr_on'), (False, 'max_pixels_vsr_off')):
+        points = []
+        for mp in sorted(megapixels):
+            point = measure(model, backend, device, mp, vsr, frames, fps, timeout, python)
+            print(f"  {model} {backend} {point['shape']} vsr={vsr}: {point['status']}"
+                  + (f" {point['fps']} fps" if point.get('fps') else f" {point.get('detail', '')}"),
+                  file=sys.stderr)
+            points.append(point)
+            if point.get('fps') and point['fps'] < required:
+                break  # Larger sizes only get slower
+        entry['points'] += points
+        entry[name] = derive_budget(points, required)
+    entry['backend'] = next((p['backend'] for p in entry['points'] if p.get('backend')), backend)
+    if entry['max_pixels_vsr_on'] is None and entry['max_pixels_vsr_off'] is None:
+        return None
+    return entry
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description='Calibrate RIFE pixel budgets for this machine')
+    parser.add_argument('--models', default=','.join(str(m) for m in MODELS),
+                        help='Comma-separated model numbers (default: %(default)s)')
+    parser.add_argument('--backends', default='auto',
+                        help='Comma-separated backends as in rife_main.lua opts (default: %(default)s)')
+    parser.add_argument('--device', type=int, default=0, help='GPU device (rife_main.lua gpu_id)')
+    parser.add_argument('--mp', default=','.join(str(m) for m in MEGAPIXELS),
+                        help='Comma-separated megapixel steps (default: %(default)s)')
+    parser.add_argument('--frames', type=int, default=120, help='Source frames timed per point')
+    parser.add_argument('--fps', default='23.976', help='Content fps the budgets are derived for')
+    parser.add_argument('--headroom', type=float, default=HEADROOM,
+                        help='Required rate over 2x fps (default: %(default)s)')
+    parser.add_argument('--timeout', type=float, default=900, help='Seconds per point (engine builds are slow)')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter with VapourSynth for the workers')
+    parser.add_argument('--profile', default=str(PROFILE_PATH), help='Profile file (default: %(default)s)')
+    args = parser.parse_args()
+
+    megapixels = [float(m) for m in args.mp.split(',') if m.strip()]
+    profiles = load_profiles(args.profile)
+    for backend in [b.strip() for b in args.backends.split(',') if b.strip()]:
+        for model in [int(m) for m in args.models.split(',') if m.strip()]:
+            entry = calibrate(model, backend, args.device, megapixels, args.frames, args.fps,
+                              args.headroom, args.timeout, args.python)
+            if entry is None:
+                print(f"{backend}:{args.device} model {model}: no usable measurement")
+                continue
+            # Keyed by the backend that ran ("auto" resolved), as rife_core.profile_backend looks it up
+            store_profile(profiles, entry['backend'], args.device, model, entry,
+                          device_name(entry['backend'], args.device))
+            print(f"{entry['backend']}:{args.device} model {model}: max_pixels_vsr_on={entry['max_pixels_vsr_on']} "
+                  f"max_pixels_vsr_off={entry['max_pixels_vsr_off']} (at {entry['required_fps']} fps)")
+    save_profiles(profiles, args.profile)
+    print(f"Profile written to {args.profile}")
+
+if __name__ == '__main__':
+    main()
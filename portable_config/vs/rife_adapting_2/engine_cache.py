@@ -0,0 +1,267 @@
+"""
+engine_cache.py - TensorRT engine cache for the RIFE pipeline
+
+Usage:
+    python engine_cache.py prewarm --model 4221 --device 0 1600x672 1920x800
+    python engine_cache.py list
+    python engine_cache.py evict [--max-gb 4]
+
+process() builds its TensorRT engine with static_shape=True, so every new
+target resolution costs a full engine build. Engines are kept one folder per
+EngineKey (model, shape, precision, device) under
+portable_config/_cache/trt_engines, with a small index.json recording size
+and last use for LRU eviction. A .lock file next to a folder marks a build
+in progress, so a background prewarm and the player never build the same
+engine twice at once.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+CACHE_DIR = Path(__file__).parent.parent.parent / "_cache" / "trt_engines"  # portable_config/_cache
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3  # Engines are ~50-200 MB each
+ENGINE_GLOB = "*.engine"           # vsmlrt's engine file naming
+LOCK_POLL_S = 0.5
+LOCK_STALE_S = 900                 # A lock older than this is left over from a crashed build
+PRECISION = "fp16"
+
+@dataclass(frozen=True)
+class EngineKey:
+    """What a static-shape RIFE engine depends on."""
+    model: int
+    width: int
+    height: int
+    precision: str = PRECISION
+    device: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"rife{self.model}_{self.width}x{self.height}_{self.precision}_dev{self.device}"
+
+def parse_shape(text: str) -> tuple:
+    """'1600x672' -> (1600, 672)."""
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+
+class EngineCache:
+    """Size-bounded LRU store of TensorRT engine folders.
+
+    builder(key, folder) is whatever produces the engine files inside folder;
+    in the player that is vsmlrt itself (see rife_processor), elsewhere it can
+    be any stand-in.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.json"
+
+    def folder(self, key: EngineKey) -> Path:
+        return self.root / key.name
+
+    def lock_path(self, key: EngineKey) -> Path:
+        return self.root / (key.name + ".lock")
+
+    def cached(self, key: EngineKey) -> bool:
+        """Whether a built engine exists for key."""
+        folder = self.folder(key)
+        return folder.is_dir() and any(folder.glob(ENGINE_GLOB))
+
+    # -- index ---------------------------------------------------------------
+
+    def load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, dict]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + f'.{os.getpid()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, self.index_path)
+
+    def record(self, key: EngineKey):
+        """Mark key as just used and refresh its size."""
+        index = self.load_index()
+        entry = asdict(key)
+        entry['size'] = _dir_size(self.folder(key)) if self.folder(key).is_dir() else 0
+        entry['last_used'] = time.time()
+        index[key.name] = entry
+        self._save_index(index)
+
+    def evict(self, keep: Iterable[EngineKey] = ()) -> List[str]:
+        """Remove least recently used engines until the cache fits max_bytes.
+
+        Engines in keep and engines being built are never removed. Returns the
+        names of the evicted entries.
+        """
+        keep = {key.name for key in keep}
+        index = self.load_index()
+        # Drop entries whose folder is gone (deleted by hand or another process)
+        index = {name: entry for name, entry in index.items() if (self.root / name).is_dir()}
+        total = sum(entry['size'] for entry in index.values())
+        evicted = []
+        for name, entry in sorted(index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if name in keep or (self.root / (name + ".lock")).exists():
+                continue
+            shutil.rmtree(self.root / name, ignore_errors=True)
+            total -= entry['size']
+            evicted.append(name)
+            del index[name]
+        self._save_index(index)
+        return evicted
+
+    # -- locking -------------------------------------------------------------
+
+    def try_lock(self, key: EngineKey) -> bool:
+        """Take the build lock for key without waiting."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.lock_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > LOCK_STALE_S:
+                path.unlink()
+        except OSError:
+            pass
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return True
+
+    def unlock(self, key: EngineKey):
+        try:
+            self.lock_path(key).unlink()
+        except OSError:
+            pass
+
+    def lock(self, key: EngineKey, timeout: Optional[float] = None) -> bool:
+        """Take the build lock for key, waiting for a build in progress
+        (e.g. a prewarm of the same shape) for up to timeout seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_lock(key):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_S)
+        return True
+
+    # -- use -----------------------------------------------------------------
+
+    @contextmanager
+    def engine(self, key: EngineKey, timeout: Optional[float] = None):
+        """Yield the engine folder for key with its build lock held.
+
+        Whatever is built inside the block is recorded and the cache is
+        trimmed to max_bytes afterwards. If the lock cannot be taken within
+        timeout, the folder is yielded anyway (the engine may get built twice,
+        which is still correct).
+        """
+        locked = self.lock(key, timeout)
+        folder = self.folder(key)
+        folder.mkdir(parents=True, exist_ok=True)
+        try:
+            yield folder
+        finally:
+            if locked:
+                self.unlock(key)
+            self.record(key)
+            self.evict(keep=[key])
+
+    def build(self, key: EngineKey, builder: Callable[[EngineKey, Path], None]) -> bool:
+        """Build key's engine unless it is cached or already being built.
+
+        Returns True if builder ran.
+        """
+        if self.cached(key):
+            self.record(key)
+            return False
+        if not self.try_lock(key):
+            return False
+        try:
+            folder = self.folder(key)
+            folder.mkdir(parents=True, exist_ok=True)
+            builder(key, folder)
+        finally:
+            self.unlock(key)
+            self.record(key)
+        self.evict(keep=[key])
+        return True
+
+    def prewarm(self, keys: Iterable[EngineKey], builder: Callable[[EngineKey, Path], None]) -> List[EngineKey]:
+        """Build every key not yet cached, in order; returns the keys built.
+
+        A failing build is skipped so the remaining shapes still get built.
+        """
+        built = []
+        for key in keys:
+            try:
+                if self.build(key, builder):
+                    built.append(key)
+            except Exception as e:
+                print(f"prewarm {key.name} failed: {e}", file=sys.stderr)
+        return built
+
+def build_rife_engine(key: EngineKey, folder: Path):
+    """Builder that runs the player's own RIFE graph on a blank clip of key's shape."""
+    import vapoursynth as vs
+    import rife_processor
+
+    clip = vs.core.std.BlankClip(format=vs.RGBH, width=key.width, height=key.height,
+                                 length=2, fpsnum=24, fpsden=1)
+    rife_processor.rife_interpolate(clip, key.model, key.device, 1, str(folder))
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the TensorRT engine cache used by rife_processor')
+    parser.add_argument('--max-gb', type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3,
+                        help='Cache size bound in GiB (default: %(default)s)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    prewarm = sub.add_parser('prewarm', help='Build engines for the given shapes in the background')
+    prewarm.add_argument('shapes', nargs='+', type=parse_shape, metavar='WxH')
+    prewarm.add_argument('--model', type=int, required=True)
+    prewarm.add_argument('--device', type=int, default=0)
+    sub.add_parser('list', help='List cached engines, most recently used first')
+    sub.add_parser('evict', help='Trim the cache to --max-gb')
+    args = parser.parse_args()
+
+    cache = EngineCache(max_bytes=int(args.max_gb * 1024 ** 3))
+    if args.command == 'prewarm':
+        import vapoursynth as vs
+        if not hasattr(vs.core, 'trt'):
+            print("TensorRT plugin not loaded, nothing to prewarm")
+            return
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        keys = [EngineKey(args.model, w, h, device=args.device) for w, h in args.shapes]
+        for key in cache.prewarm(keys, build_rife_engine):
+            print(f"built {key.name}")
+    elif args.command == 'list':
+        index = cache.load_index()
+        for name, entry in sorted(index.items(), key=lambda item: -item[1]['last_used']):
+            used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+            print(f"{name:<36} {entry['size'] / 1e6:8.1f} MB  {used}")
+        print(f"{len(index)} engines, {sum(e['size'] for e in index.values()) / 1e6:.1f} MB")
+    elif args.command == 'evict':
+        for name in cache.evict():
+            print(f"evicted {name}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,495 @@
+"""
+infer_server.py - Shared RIFE inference daemon for several mpv instances
+
+Usage:
+    python infer_server.py serve [--address 127.0.0.1:47300] [--batch 4] [--gpu 0] [--gpu-threads 2]
+    python infer_server.py serve --dummy      # byte-wise blend instead of RIFE (plumbing checks)
+
+Every mpv instance normally builds its own RIFE graph, so two players hold
+two copies of the model, engine and CUDA streams. With rife_main.lua's
+infer_server opt set, rife_processor sends each frame pair to this daemon
+instead: the frames travel through a shared memory block owned by the
+client (InferenceClient), only small ('infer', seq, slot) / ('done', seq)
+messages go over the socket. The daemon keeps one model per (model, shape,
+format) and batches pending requests round-robin across clients, at most
+one request per client per round, so a busy player cannot starve another.
+If the daemon is not running, process() falls back to in-process inference.
+"""
+
+import sys
+import time
+import ctypes
+import socket
+import argparse
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_ADDRESS = "127.0.0.1:47300"
+AUTHKEY = b"rife_adapting_2"  # Local daemon; keeps stray connections out
+MAX_BATCH = 4
+CLIENT_SLOTS = 4              # Requests a client can have in flight
+CONNECT_TIMEOUT = 2.0         # Seconds to reach the daemon before falling back
+LOAD_TIMEOUT = 900.0          # Seconds the daemon may take to load or build a model
+REQUEST_TIMEOUT = 30.0        # Seconds for one pair
+BYTES_PER_SAMPLE = {"RGB24": 1, "RGBH": 2, "RGBS": 4}
+
+def parse_address(text: str) -> Tuple[str, int]:
+    """'127.0.0.1:47300' -> ('127.0.0.1', 47300)."""
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+def frame_bytes(width: int, height: int, fmt: str) -> int:
+    """Size of one packed planar RGB frame."""
+    return 3 * width * height * BYTES_PER_SAMPLE[fmt]
+
+_OWNED = set()  # Blocks created by clients in this process
+
+def attach_shm(name: str) -> shared_memory.SharedMemory:
+    """Open a client's block without taking ownership (the client unlinks it)."""
+    shm = shared_memory.SharedMemory(name=name)
+    if sys.platform != "win32" and name not in _OWNED:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+# -- VapourSynth frames <-> packed planar buffers ----------------------------
+
+def copy_frame_to_buffer(frame, buf, offset: int):
+    """Copy the planes of a VideoFrame into buf at offset (rows unpadded)."""
+    for plane in range(frame.format.num_planes):
+        row = frame.width * frame.format.bytes_per_sample
+        stride = frame.get_stride(plane)
+        src = frame.get_read_ptr(plane).value
+        dst = (ctypes.c_char * (row * frame.height)).from_buffer(buf, offset)
+        for y in range(frame.height):
+            ctypes.memmove(ctypes.addressof(dst) + y * row, src + y * stride, row)
+        del dst
+        offset += row * frame.height
+
+def copy_buffer_to_frame(buf, offset: int, frame):
+    """Copy packed planes from buf at offset into a writable VideoFrame."""
+    for plane in range(frame.format.num_planes):
+        row = frame.width * frame.format.bytes_per_sample
+        stride = frame.get_stride(plane)
+        dst = frame.get_write_ptr(plane).value
+        src = (ctypes.c_char * (row * frame.height)).from_buffer(buf, offset)
+        for y in range(frame.height):
+            ctypes.memmove(dst + y * stride, ctypes.addressof(src) + y * row, row)
+        del src
+        offset += row * frame.height
+
+# ---------------------------------------------------------------------------
+# Models
+# ---------------------------------------------------------------------------
+
+class DummyModel:
+    """Byte-wise average of the two frames; stands in for RIFE in tests and
+    for checking the plumbing without a GPU. Records its batch sizes."""
+
+    def __init__(self, key=None):
+        self.key = key
+        self.batches = []
+
+    def infer(self, pairs: Sequence[Tuple[bytes, bytes]]) -> List[bytes]:
+        self.batches.append(len(pairs))
+        return [bytes((a + b) // 2 for a, b in zip(img0, img1)) for img0, img1 in pairs]
+
+class VsmlrtModel:
+    """RIFE through the player's own vsmlrt graph, one instance per shape.
+
+    A long blank source whose frames are filled from the request buffers
+    feeds rife_processor.rife_stage; pair i occupies source frames 2i and
+    2i+1, so output frame 4i+1 is their interpolation. Pair numbers wrap
+    around at the end of the source. A batch is requested concurrently,
+    which the backend runs on its gpu_t streams.
+    """
+
+    SOURCE_LENGTH = 2 ** 29  # The 2x output must still fit VapourSynth's int frame count
+
+    def __init__(self, key, gpu_id: int = 0, gpu_t: int = 2, backend: str = "auto"):
+        import vapoursynth as vs
+        import rife_processor
+
+        model, width, height, fmt = key
+        self.size = frame_bytes(width, height, fmt)
+        self.inputs: Dict[int, bytes] = {}
+        self.next_pair = 0
+        self.lock = threading.Lock()
+        blank = vs.core.std.BlankClip(format=getattr(vs, fmt), width=width, height=height,
+                                      length=self.SOURCE_LENGTH, fpsnum=24, fpsden=1)
+
+        def _fill(n, f):
+            fout = f.copy()
+            data = self.inputs.get(n)
+            if data is not None:
+                copy_buffer_to_frame(bytearray(data), 0, fout)
+            return fout
+
+        source = vs.core.std.ModifyFrame(blank, blank, _fill)
+        self.node = rife_processor.rife_stage(source, model, gpu_id, gpu_t,
+                                              rife_processor.select_backend(backend))
+
+    def infer(self, pairs: Sequence[Tuple[bytes, bytes]]) -> List[bytes]:
+        futures, filled = [], []
+        for img0, img1 in pairs:
+            with self.lock:
+                index = self.next_pair
+                self.next_pair = (index + 1) % (self.SOURCE_LENGTH // 2)
+            self.inputs[2 * index], self.inputs[2 * index + 1] = img0, img1
+            filled += [2 * index, 2 * index + 1]
+            futures.append(self.node.get_frame_async(4 * index + 1))
+        outputs = []
+        try:
+            for future in futures:
+                out = bytearray(self.size)
+                copy_frame_to_buffer(future.result(), out, 0)
+                outputs.append(bytes(out))
+        finally:
+            for n in filled:
+                self.inputs.pop(n, None)
+        return outputs
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class _ClientState:
+    def __init__(self, conn, info: dict):
+        self.conn = conn
+        self.info = info
+        self.key = (info["model"], info["width"], info["height"], info["format"])
+        self.size = frame_bytes(info["width"], info["height"], info["format"])
+        self.shm = attach_shm(info["shm"])
+        self.closed = False     # Disconnected; shm is released once no batch uses it
+        self.pending = deque()  # (seq, slot)
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                pass
+
+def next_batch(queues: Sequence[deque], max_batch: int, start: int = 0) -> List[Tuple[int, object]]:
+    """Take up to max_batch items round-robin, one per queue per round,
+    starting at queue `start`; returns (queue index, item) pairs."""
+    batch = []
+    while len(batch) < max_batch and any(queues):
+        for k in range(len(queues)):
+            index = (start + k) % len(queues)
+            if queues[index] and len(batch) < max_batch:
+                batch.append((index, queues[index].popleft()))
+    return batch
+
+class InferenceServer:
+    """Accepts InferenceClients and runs their pairs through shared models.
+
+    model_factory(key) builds the model for key = (model, width, height,
+    format) the first time a client with that key connects; the client is
+    told ('loading') first, so it waits for the build instead of giving up.
+    Builds are serialized, so clients with the same key share one model.
+    A client that disconnects while its pairs are being run keeps its shared
+    memory open until the scheduler has finished that batch.
+    """
+
+    def __init__(self, model_factory: Callable, address: Tuple[str, int] = parse_address(DEFAULT_ADDRESS),
+                 max_batch: int = MAX_BATCH):
+        self.model_factory = model_factory
+        self.max_batch = max_batch
+        self.listener = Listener(address, authkey=AUTHKEY)
+        self.address = self.listener.address
+        self.models: Dict[tuple, object] = {}
+        self.model_lock = threading.Lock()
+        self.clients: List[_ClientState] = []
+        self.busy: set = set()  # Clients with pairs in the batch being run
+        self.work = threading.Condition()
+        self.start = 0  # Client the next round-robin round begins with
+        self.running = True
+
+    def serve_forever(self):
+        threading.Thread(target=self._schedule, daemon=True).start()
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except Exception:  # Failed handshake, or the wake-up from close()
+                continue
+            if not self.running:
+                conn.close()
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def close(self):
+        """Stop accepting and tell connected clients to fall back."""
+        self.running = False
+        with self.work:
+            self.work.notify_all()
+            clients = list(self.clients)
+        for client in clients:
+            client.send(("closed", None, None))
+        try:
+            socket.create_connection(self.address, timeout=1).close()  # Wakes accept()
+        except OSError:
+            pass
+        self.listener.close()
+
+    def _model(self, key, conn):
+        """Model for key, built on first use while the client waits."""
+        if key not in self.models:
+            conn.send(("loading", None))
+        with self.model_lock:
+            if key not in self.models:
+                self.models[key] = self.model_factory(key)
+            return self.models[key]
+
+    def _handle(self, conn):
+        client = None
+        try:
+            kind, info = conn.recv()
+            if kind != "hello":
+                conn.close()
+                return
+            client = _ClientState(conn, info)
+            self._model(client.key, conn)
+            conn.send(("ok", {"max_batch": self.max_batch}))
+        except Exception as e:
+            if not isinstance(e, (OSError, EOFError)):  # Otherwise the client already left
+                try:
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+                except (OSError, EOFError):
+                    pass
+            if client is not None:
+                client.shm.close()
+            conn.close()
+            return
+        with self.work:
+            self.clients.append(client)
+        try:
+            while self.running:
+                kind, seq, slot = conn.recv()
+                if kind == "infer":
+                    with self.work:
+                        client.pending.append((seq, slot))
+                        self.work.notify()
+        except (OSError, EOFError, ValueError, TypeError):  # TypeError: recv on a closed connection
+            pass
+        finally:
+            with self.work:
+                self.clients.remove(client)
+                client.closed = True
+                release = client not in self.busy
+            if release:
+                client.shm.close()
+            conn.close()
+
+    def _schedule(self):
+        while self.running:
+            with self.work:
+                while self.running and not any(c.pending for c in self.clients):
+                    self.work.wait()
+                clients = list(self.clients)
+                picked = next_batch([c.pending for c in clients], self.max_batch, self.start)
+                self.start = (self.start + 1) % max(1, len(clients))
+                self.busy = {clients[index] for index, _ in picked}
+            groups: Dict[tuple, list] = {}
+            for index, (seq, slot) in picked:
+                groups.setdefault(clients[index].key, []).append((clients[index], seq, slot))
+            for key, requests in groups.items():
+                self._run(self.models[key], requests)
+            with self.work:
+                closed = [client for client in self.busy if client.closed]
+                self.busy = set()
+            for client in closed:
+                client.shm.close()
+
+    def _run(self, model, requests):
+        pairs, taken = [], []
+        for client, seq, slot in requests:
+            if client.closed:
+                continue
+            base = slot * 3 * client.size
+            try:
+                pairs.append((bytes(client.shm.buf[base:base + client.size]),
+                              bytes(client.shm.buf[base + client.size:base + 2 * client.size])))
+            except (TypeError, ValueError) as e:  # Released block: keep serving the others
+                client.send(("error", seq, f"{type(e).__name__}: {e}"))
+                continue
+            taken.append((client, seq, slot))
+        if not taken:
+            return
+        try:
+            outputs = model.infer(pairs)
+        except Exception as e:
+            for client, seq, slot in taken:
+                client.send(("error", seq, f"{type(e).__name__}: {e}"))
+            return
+        for (client, seq, slot), out in zip(taken, outputs):
+            base = slot * 3 * client.size + 2 * client.size
+            try:
+                client.shm.buf[base:base + client.size] = out
+            except (TypeError, ValueError) as e:
+                client.send(("error", seq, f"{type(e).__name__}: {e}"))
+                continue
+            client.send(("done", seq, None))
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class InferenceClient:
+    """One player's connection to the daemon.
+
+    Owns a shared memory block of `slots` request slots (img0, img1, output);
+    interpolate() may be called from several VapourSynth threads at once.
+    """
+
+    def __init__(self, address: str, model: int, width: int, height: int, fmt: str,
+                 name: str = "", slots: int = CLIENT_SLOTS, timeout: float = CONNECT_TIMEOUT,
+                 load_timeout: float = LOAD_TIMEOUT):
+        self.size = frame_bytes(width, height, fmt)
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * 3 * self.size)
+        _OWNED.add(self.shm.name)
+        self.free = deque(range(slots))
+        self.slot_ready = threading.Condition()
+        self.waiting: Dict[int, list] = {}
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.alive = False
+        self.conn = None
+        try:
+            self.conn = _connect(parse_address(address), timeout)
+            self.conn.send(("hello", {"name": name, "shm": self.shm.name, "model": model,
+                                      "width": width, "height": height, "format": fmt}))
+            if not self.conn.poll(timeout):
+                raise ConnectionError("no answer from inference server")
+            kind, detail = self.conn.recv()
+            if kind == "loading":  # First client of this shape: the daemon builds the model
+                if not self.conn.poll(load_timeout):
+                    raise ConnectionError("inference server did not load the model in time")
+                kind, detail = self.conn.recv()
+            if kind != "ok":
+                raise ConnectionError(f"inference server refused: {detail}")
+        except (OSError, EOFError) as e:
+            self._abandon()
+            raise e if isinstance(e, ConnectionError) else ConnectionError(f"inference server: {e}") from e
+        except BaseException:
+            self._abandon()
+            raise
+        self.alive = True
+        threading.Thread(target=self._receive, daemon=True).start()
+
+    def interpolate(self, fill: Callable, read: Callable, timeout: float = REQUEST_TIMEOUT):
+        """fill(buf, offset0, offset1) writes the pair, read(buf, offset) takes
+        the result. Raises ConnectionError once the daemon is gone."""
+        with self.slot_ready:
+            while not self.free:
+                self.slot_ready.wait()
+            slot = self.free.popleft()
+        try:
+            base = slot * 3 * self.size
+            fill(self.shm.buf, base, base + self.size)
+            done = threading.Event()
+            with self.lock:
+                if not self.alive:
+                    raise ConnectionError("inference server connection lost")
+                self.seq += 1
+                seq = self.seq
+                self.waiting[seq] = [done, None]
+                self.conn.send(("infer", seq, slot))
+            if not done.wait(timeout):
+                self._fail()
+                raise ConnectionError("inference server timed out")
+            error = self.waiting.pop(seq)[1]
+            if error:
+                raise ConnectionError(error)
+            read(self.shm.buf, base + 2 * self.size)
+        finally:
+            with self.slot_ready:
+                self.free.append(slot)
+                self.slot_ready.notify()
+
+    def close(self):
+        self._fail()
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self._release_shm()
+
+    def _receive(self):
+        try:
+            while True:
+                kind, seq, detail = self.conn.recv()
+                if kind == "closed":
+                    break
+                entry = self.waiting.get(seq)
+                if entry:
+                    entry[1] = detail if kind == "error" else None
+                    entry[0].set()
+        except (OSError, EOFError, ValueError, TypeError):  # TypeError: recv on a closed connection
+            pass
+        self._fail()
+
+    def _fail(self):
+        with self.lock:
+            self.alive = False
+            for entry in self.waiting.values():
+                entry[1] = entry[1] or "inference server connection lost"
+                entry[0].set()
+
+    def _abandon(self):
+        if self.conn is not None:
+            self.conn.close()
+        self._release_shm()
+
+    def _release_shm(self):
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (OSError, BufferError):
+            pass
+
+def _connect(address: Tuple[str, int], timeout: float):
+    """multiprocessing Client with a deadline (it retries only on some OSes)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return Client(address, authkey=AUTHKEY)
+        except ConnectionRefusedError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared RIFE inference server for several mpv instances')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='Run the daemon in the foreground')
+    serve.add_argument('--address', default=DEFAULT_ADDRESS, help='host:port (default: %(default)s)')
+    serve.add_argument('--batch', type=int, default=MAX_BATCH, help='Pairs per batch (default: %(default)s)')
+    serve.add_argument('--gpu', type=int, default=0)
+    serve.add_argument('--gpu-threads', type=int, default=2)
+    serve.add_argument('--backend', default='auto')
+    serve.add_argument('--dummy', action='store_true', help='Blend frames instead of running RIFE')
+    args = parser.parse_args()
+
+    if args.dummy:
+        factory = DummyModel
+    else:
+        from pathlib import Path
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+        def factory(key):
+            return VsmlrtModel(key, args.gpu, args.gpu_threads, args.backend)
+
+    server = InferenceServer(factory, parse_address(args.address), args.batch)
+    print(f"Serving on {server.address[0]}:{server.address[1]} (batch {args.batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+
+if __name__ == '__main__':
+    main()
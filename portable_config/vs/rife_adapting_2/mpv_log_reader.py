@@ -3,17 +3,48 @@ mpv_log_reader.py - Parse mpv-debug.log for errors and VapourSynth issues
 
 Usage:
     python mpv_log_reader.py [log_path]
-
-If no path given, searches for mpv-debug.log in common locations.
+    python mpv_log_reader.py --fleet DIR_OR_GLOB [--ndjson PATH|-]
+
+The log is streamed (see LogParser / iter_log), so it is never loaded into
+memory as a whole: plain logs are memory-mapped and only lines that can match
+are decoded, compressed ones (.gz/.bz2/.xz, .zst with the zstandard module)
+are decompressed on the fly. --limit additionally bounds the collected
+results and the events kept per RIFE session. Parsed positions are kept in a sidecar index under
+portable_config/_cache/log_reader (see LogIndex), so repeated queries on the
+same log only read the lines they print. If no path given, searches for
+mpv-debug.log in common locations. --fleet parses many logs (e.g. collected
+from several machines) in parallel and summarizes them together, optionally
+streaming every event as one JSON object per line (--ndjson).
 """
 
+import io
+import os
 import re
 import sys
+import bz2
+import gzip
+import lzma
+import mmap
+import csv
+import json
+import bisect
+import time
+import glob
+import shutil
+import hashlib
+import tempfile
 import argparse
 from pathlib import Path
-from collections import defaultdict
-from typing import Optional, List, Tuple
-from dataclasses import dataclass, field
+from array import array
+from itertools import islice, repeat
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import defaultdict, deque, Counter
+from typing import Optional, List, Tuple, Dict, Iterator, Sequence, Callable
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass, field, fields
+
+from proc_stats import percentile
 
 # ANSI colors for terminal output
 class Colors:
@@ -24,6 +55,114 @@ class Colors:
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
+class SessionEvents(SequenceABC):
+    """Compact append-only store of (line, time, category, message) events.
+
+    Line numbers, timestamps and category codes live in typed arrays, the
+    category names are interned per store and messages are kept as end
+    offsets into one UTF-8 buffer. Positions of Lua and Python (PY_*) events
+    are indexed on append, so the per-origin views cost nothing to build.
+    With maxlen only the most recent maxlen events are kept (like a deque);
+    dropped events are skipped until they make up half the store, then the
+    arrays are compacted in one go.
+    """
+
+    def __init__(self, events=(), maxlen: Optional[int] = None):
+        self.lines = array('q')
+        self.times = array('d')
+        self.codes = array('H')
+        self.message_ends = array('Q')
+        self.buffer = bytearray()
+        self.categories = []  # code -> category name
+        self.category_codes = {}  # category name -> code
+        self.lua_index = array('L')
+        self.python_index = array('L')
+        self.maxlen = maxlen
+        self.first = 0  # Position of the oldest kept event
+        self.extend(events)
+
+    def append(self, event):
+        if self.maxlen == 0:
+            return
+        line, timestamp, category, message = event
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        origin = self.python_index if category.startswith('PY_') else self.lua_index
+        origin.append(len(self.lines))
+        self.lines.append(line)
+        self.times.append(timestamp)
+        self.codes.append(code)
+        self.buffer += message.encode('utf-8')
+        self.message_ends.append(len(self.buffer))
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.first += 1
+            if self.first >= self.maxlen:
+                self._compact()
+
+    def _compact(self):
+        """Physically drop the events before self.first."""
+        first = self.first
+        self.lua_index = self.live(self.lua_index)
+        self.python_index = self.live(self.python_index)
+        dropped = self.message_ends[first - 1]
+        del self.buffer[:dropped]
+        self.message_ends = array('Q', (end - dropped for end in self.message_ends[first:]))
+        del self.lines[:first]
+        del self.times[:first]
+        del self.codes[:first]
+        self.first = 0
+
+    def live(self, index: array) -> array:
+        """Positions of the kept events listed in an origin index array."""
+        if not self.first:
+            return index
+        return array('L', (k - self.first for k in index[bisect.bisect_left(index, self.first):]))
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    def shift_lines(self, delta: int):
+        """Add delta to every line number (used when merging chunks)."""
+        self.lines = array('q', (line + delta for line in self.lines))
+
+    def __len__(self):
+        return len(self.lines) - self.first
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('event index out of range')
+        index += self.first
+        start = self.message_ends[index - 1] if index > 0 else 0
+        return (self.lines[index], self.times[index], self.categories[self.codes[index]],
+                self.buffer[start:self.message_ends[index]].decode('utf-8'))
+
+    def __eq__(self, other):
+        if not isinstance(other, SessionEvents):
+            return NotImplemented
+        return list(self) == list(other)
+
+class EventView(SequenceABC):
+    """Events of a SessionEvents selected by one of its index arrays (no copy)."""
+
+    def __init__(self, events: SessionEvents, index: array):
+        self.events = events
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self.events[i] for i in self.index[k]]
+        return self.events[self.index[k]]
+
 @dataclass
 class RIFESession:
     """Represents a single RIFE toggle on/off cycle."""
@@ -32,15 +171,29 @@ class RIFESession:
     end_line: int = 0
     start_time: float = 0.0
     end_time: float = 0.0
-    events: List[Tuple[int, float, str, str]] = field(default_factory=list)  # (line, time, category, message)
+    events: SessionEvents = field(default_factory=SessionEvents)  # (line, time, category, message)
+
+    def __post_init__(self):
+        if not isinstance(self.events, SessionEvents):
+            self.events = SessionEvents(self.events)
 
     @property
     def lua_events(self):
-        return [e for e in self.events if not e[2].startswith('PY_')]
+        return EventView(self.events, self.events.live(self.events.lua_index))
 
     @property
     def python_events(self):
-        return [e for e in self.events if e[2].startswith('PY_')]
+        return EventView(self.events, self.events.live(self.events.python_index))
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form (see from_dict)."""
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data['events'] = list(self.events)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, maxlen: Optional[int] = None) -> 'RIFESession':
+        return cls(**dict(data, events=SessionEvents(data['events'], maxlen)))
 
     @property
     def duration(self):
@@ -61,118 +214,1829 @@ def find_log_file() -> Optional[Path]:
             return p
     return None
 
-def parse_log(log_path: Path) -> dict:
-    """Parse mpv log and extract relevant information."""
-    results = {
-        'errors': [],
-        'lua_errors': [],
-        'script_loading': [],
-        'vapoursynth': [],
-        'rife_adaptive': [],
-        'rife_sessions': [],  # NEW: List of RIFESession objects
-        'rife_by_category': defaultdict(list),  # NEW: Events grouped by category
-        'warnings': [],
-        'python_traceback': [],
-    }
+# Result buckets collected by parse_log(); LogParser yields events keyed by
+# the same names (plus 'session_end', which has no bucket of its own)
+BUCKETS = (
+    'errors',
+    'lua_errors',
+    'script_loading',
+    'vapoursynth',
+    'frame_timing',
+    'rife_adaptive',
+    'rife_sessions',
+    'rife_by_category',
+    'warnings',
+    'python_traceback',
+)
+
+# Patterns to match
+PATTERNS = {
+    'error': re.compile(r'\[.*?\]\[(e|f)\]\[.*?\](.*)'),  # [e] or [f] level
+    'lua_error': re.compile(r'\[.*?\]\[(e|f)\]\[.*?\].*?(Lua error:|attempt to call|attempt to compare|attempt to perform|Profile condition error)'),
+    'script_loading': re.compile(r'Loading (lua )?script (.+)'),
+    'vapoursynth': re.compile(r'\[vapoursynth\](.*)'),
+    # mpv frame timing from the player, VO, decoder or filter chain: dropped/delayed frames
+    'frame_timing': re.compile(r'\]\[[a-z]\]\[(?:cplayer|vo|vd|vf|ffmpeg/video)[^\]]*\].*?(?:[Dd]rop|[Dd]elayed)'),
+    'rife_adaptive_cat': re.compile(r'\[rife_adaptive\]\[([A-Z_]+)\]\s*(.*)'),  # Extract category
+    'timestamp': re.compile(r'^\[\s*([0-9.]+)\]'),  # Extract timestamp
+    'python_exception': re.compile(r'(Python exception|Traceback|ModuleNotFoundError|ImportError|AttributeError)'),
+}
+
+# Literal prefilter run on every line. Each alternative is a substring that
+# the corresponding pattern above cannot match without, so a line failing it
+# can only matter to an open traceback and the full regexes are skipped.
+PREFILTER_LITERALS = ('[rife_adaptive][', '][e][', '][f][', '[vapoursynth]', 'Loading ', 'Traceback',
+                      'Python exception', 'Drop', 'drop', 'Delayed', 'delayed')
+PREFILTER = re.compile('|'.join(re.escape(literal) for literal in PREFILTER_LITERALS))
+LUA_ERROR_TAGS = ('Lua error:', 'attempt to call', 'attempt to compare', 'attempt to perform', 'Profile condition error')
+NO_EVENTS = ()
+MAX_TRACEBACK_LINES = 200  # Lines kept of one traceback (its first and the last ones)
+
+def starts_traceback(line: str) -> bool:
+    """Whether a line opens a Python traceback."""
+    return 'Traceback' in line or 'Python exception' in line
+
+def continues_traceback(line: str) -> bool:
+    """Whether a line extends an open Python traceback (trailing whitespace is ignored)."""
+    stripped = line.strip()
+    return bool(stripped) and (line.startswith('[') or 'Error' in line or 'File' in stripped or stripped.startswith('import'))
+
+def append_traceback_line(lines: list, item):
+    """Extend an open traceback; past MAX_TRACEBACK_LINES the oldest lines
+    after the first are dropped (the exception itself comes last)."""
+    if len(lines) >= MAX_TRACEBACK_LINES:
+        del lines[1]
+    lines.append(item)
+
+def line_timestamp(line: str) -> float:
+    """Extract the leading [  12.345] timestamp of a log line."""
+    ts_match = PATTERNS['timestamp'].search(line)
+    return float(ts_match.group(1)) if ts_match else 0.0
+
+class LogParser:
+    """Incremental mpv log parser.
+
+    Lines are fed one at a time and the parser only keeps the state needed to
+    interpret the next line (open traceback, open RIFE session), so memory use
+    does not depend on the size of the log. Each feed() returns a sequence of
+    (kind, item) events, where kind is a BUCKETS name or 'session_end'.
+    event_cap bounds the events kept per RIFE session (the most recent ones).
+    """
+
+    def __init__(self, event_cap: Optional[int] = None):
+        self.event_cap = event_cap
+        self.line_num = 0
+        self.last_line = ''
+        self.in_traceback = False
+        self.traceback_lines = []
+        self.current_session = None
+        self.session_counter = 0
 
-    # Patterns to match
-    patterns = {
-        'error': re.compile(r'\[.*?\]\[(e|f)\]\[.*?\](.*)'),  # [e] or [f] level
-        'lua_error': re.compile(r'\[.*?\]\[(e|f)\]\[.*?\].*?(Lua error:|attempt to call|attempt to compare|attempt to perform|Profile condition error)'),
-        'script_loading': re.compile(r'Loading (lua )?script (.+)'),
-        'vapoursynth': re.compile(r'\[vapoursynth\](.*)'),
-        'rife_adaptive_cat': re.compile(r'\[rife_adaptive\]\[([A-Z_]+)\]\s*(.*)'),  # NEW: Extract category
-        'timestamp': re.compile(r'^\[\s*([0-9.]+)\]'),  # Extract timestamp
-        'python_exception': re.compile(r'(Python exception|Traceback|ModuleNotFoundError|ImportError|AttributeError)'),
-    }
+    @property
+    def timestamp(self) -> float:
+        """Timestamp of the last fed line (0.0 if it had none)."""
+        return line_timestamp(self.last_line)
 
-    try:
-        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-    except Exception as e:
-        return {'error': f'Failed to read log: {e}'}
+    def feed(self, line: str) -> Sequence[Tuple[str, object]]:
+        """Parse the next log line and return the events it produced."""
+        self.line_num += 1
+        self.last_line = line
 
-    in_traceback = False
-    traceback_lines = []
-    current_session = None
-    session_counter = 0
+        # Fast path: most debug lines carry none of the tags we look for
+        if not self.in_traceback and not PREFILTER.search(line):
+            return NO_EVENTS
 
-    for i, line in enumerate(lines, 1):
+        i = self.line_num
         line = line.rstrip()
-
-        # Extract timestamp
-        ts_match = patterns['timestamp'].search(line)
-        timestamp = float(ts_match.group(1)) if ts_match else 0.0
+        events = []
 
         # Track Python tracebacks
-        if 'Traceback' in line or 'Python exception' in line:
-            in_traceback = True
-            traceback_lines = [(i, line)]
-        elif in_traceback:
-            if line.strip() and (line.startswith('[') or 'Error' in line or 'File' in line.strip() or line.strip().startswith('import')):
-                traceback_lines.append((i, line))
+        if starts_traceback(line):
+            self.in_traceback = True
+            self.traceback_lines = [(i, line)]
+        elif self.in_traceback:
+            if continues_traceback(line):
+                append_traceback_line(self.traceback_lines, (i, line))
             else:
-                if traceback_lines:
-                    results['python_traceback'].append(traceback_lines.copy())
-                in_traceback = False
-                traceback_lines = []
+                if self.traceback_lines:
+                    events.append(('python_traceback', self.traceback_lines))
+                self.in_traceback = False
+                self.traceback_lines = []
 
         # Check for RIFE adaptive messages with categories
-        cat_match = patterns['rife_adaptive_cat'].search(line)
+        cat_match = '[rife_adaptive][' in line and PATTERNS['rife_adaptive_cat'].search(line)
         if cat_match:
             category = cat_match.group(1)
             message = cat_match.group(2)
+            timestamp = line_timestamp(line)
 
             # Session boundary detection
             if category == 'TOGGLE':
-                if 'activation requested' in message.lower():
+                # 'deactivation requested' contains 'activation requested': test it first
+                lowered = message.lower()
+                if 'deactivation requested' in lowered:
+                    if self.current_session:
+                        # End current session
+                        self.current_session.end_line = i
+                        self.current_session.end_time = timestamp
+                        events.append(('session_end', self.current_session))
+                        self.current_session = None
+                elif 'activation requested' in lowered:
                     # Start new session
-                    session_counter += 1
-                    current_session = RIFESession(
-                        session_id=session_counter,
+                    self.session_counter += 1
+                    self.current_session = RIFESession(
+                        session_id=self.session_counter,
                         start_line=i,
-                        start_time=timestamp
+                        start_time=timestamp,
+                        events=SessionEvents(maxlen=self.event_cap)
                     )
-                    results['rife_sessions'].append(current_session)
-                elif 'deactivation requested' in message.lower() and current_session:
-                    # End current session
-                    current_session.end_line = i
-                    current_session.end_time = timestamp
-                    current_session = None
+                    events.append(('rife_sessions', self.current_session))
 
             # Add event to current session
-            if current_session:
-                current_session.events.append((i, timestamp, category, message))
+            if self.current_session:
+                self.current_session.events.append((i, timestamp, category, message))
 
             # Add to category grouping
-            results['rife_by_category'][category].append((i, timestamp, message))
+            events.append(('rife_by_category', (category, (i, timestamp, message))))
 
             # Add to general rife_adaptive list
-            results['rife_adaptive'].append((i, line))
+            events.append(('rife_adaptive', (i, line)))
 
-        # Check for error level messages
-        if patterns['error'].search(line):
-            results['errors'].append((i, line))
+        # Check for error level messages (a Lua error is always an error line too)
+        if ('][e][' in line or '][f][' in line) and PATTERNS['error'].search(line):
+            events.append(('errors', (i, line)))
 
-        # Check for Lua-specific errors
-        if patterns['lua_error'].search(line):
-            results['lua_errors'].append((i, line))
+            # Check for Lua-specific errors
+            if any(tag in line for tag in LUA_ERROR_TAGS) and PATTERNS['lua_error'].search(line):
+                events.append(('lua_errors', (i, line)))
 
         # Track script loading
-        match = patterns['script_loading'].search(line)
+        match = 'Loading ' in line and PATTERNS['script_loading'].search(line)
         if match:
-            results['script_loading'].append((i, line, match.group(2)))
+            events.append(('script_loading', (i, line, match.group(2))))
+
+        # VapourSynth messages (the tag alone is a full match)
+        if '[vapoursynth]' in line:
+            events.append(('vapoursynth', (i, line)))
+
+        # mpv frame drops / delayed frames
+        if ('rop' in line or 'elayed' in line) and PATTERNS['frame_timing'].search(line):
+            events.append(('frame_timing', (i, line)))
+
+        return events
+
+    def skip(self, count: int):
+        """Account for `count` lines without feeding them; only valid for lines
+        that PREFILTER rejects while no traceback is open (they produce no
+        events). last_line is left to the caller (see scan_lines)."""
+        self.line_num += count
+
+    def close(self) -> List[Tuple[str, object]]:
+        """Finish parsing; closes a session left open at end of log."""
+        if not self.current_session:
+            return []
+        session = self.current_session
+        session.end_line = self.line_num
+        session.end_time = self.timestamp
+        self.current_session = None
+        return [('session_end', session)]
+
+    def state(self) -> dict:
+        """JSON-serializable parser state (see from_state)."""
+        return {
+            'line_num': self.line_num,
+            'last_line': self.last_line,
+            'in_traceback': self.in_traceback,
+            'traceback_lines': self.traceback_lines,
+            'session_counter': self.session_counter,
+            'current_session': self.current_session.to_dict() if self.current_session else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, event_cap: Optional[int] = None) -> 'LogParser':
+        """Recreate a parser that continues where state() was taken."""
+        parser = cls(event_cap)
+        parser.line_num = state['line_num']
+        parser.last_line = state['last_line']
+        parser.in_traceback = state['in_traceback']
+        parser.traceback_lines = [tuple(item) for item in state['traceback_lines']]
+        parser.session_counter = state['session_counter']
+        if state['current_session']:
+            parser.current_session = RIFESession.from_dict(state['current_session'], event_cap)
+        return parser
+
+# ---------------------------------------------------------------------------
+# Log input
+# ---------------------------------------------------------------------------
+
+try:
+    import zstandard  # Optional: only needed for .zst logs
+except ImportError:
+    zstandard = None
+
+NEWLINE_BYTES = re.compile(rb'\r\n|\r|\n')
+PREFILTER_BYTES = tuple(literal.encode('ascii') for literal in PREFILTER_LITERALS)
+COUNT_BLOCK = 1 << 20  # Bytes copied at a time when counting skipped lines
+FEED_BLOCK = 1 << 16   # Bytes split into lines at a time inside a traceback
+
+def _open_zstd(path, mode: str = 'rb'):
+    if zstandard is None:
+        raise OSError(f"{path}: reading .zst logs needs the zstandard module (pip install zstandard)")
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')))
+
+COMPRESSED = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.zst': _open_zstd}
+# Decompression errors that are not OSErrors (truncated or corrupt archives)
+CORRUPT_ERRORS = (EOFError, lzma.LZMAError) + ((zstandard.ZstdError,) if zstandard else ())
+
+def is_compressed(log_path: Path) -> bool:
+    return Path(log_path).suffix.lower() in COMPRESSED
+
+def open_log(log_path: Path):
+    """Binary stream of a log, decompressed on the fly for .gz/.bz2/.xz/.zst."""
+    return COMPRESSED.get(Path(log_path).suffix.lower(), open)(log_path, 'rb')
+
+@contextmanager
+def map_log(log_path: Path):
+    """Read-only memory map of an uncompressed log (its bytes if it cannot be mapped)."""
+    with open(log_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # Empty file, pipe
+            yield f.read()
+            return
+        with buf:
+            yield buf
+
+def line_end(buf, pos: int, end: int) -> int:
+    """Offset just past the line starting at pos (universal newlines, at most end)."""
+    match = NEWLINE_BYTES.search(buf, pos, end)
+    return match.end() if match else end
+
+def decode_line(raw: bytes) -> str:
+    """One raw line as text-mode iteration returns it (terminator as '\\n')."""
+    text = raw.rstrip(b'\r\n')
+    return text.decode('utf-8', errors='replace') + ('\n' if len(text) < len(raw) else '')
+
+def count_lines(buf, start: int, stop: int) -> int:
+    """Number of lines in buf[start:stop] (start at a line start), counted in
+    blocks so a long run of lines is never copied or decoded as a whole."""
+    count = 0
+    for block_start in range(start, stop, COUNT_BLOCK):
+        block_stop = min(block_start + COUNT_BLOCK, stop)
+        block = buf[block_start:block_stop]
+        count += block.count(b'\n') + block.count(b'\r') - block.count(b'\r\n')
+        if block.endswith(b'\r') and block_stop < stop and buf[block_stop:block_stop + 1] == b'\n':
+            count -= 1  # CRLF split across blocks
+    if stop > start and buf[stop - 1:stop] not in (b'\n', b'\r'):
+        count += 1  # Unterminated last line
+    return count
+
+def _last_line_start(buf, start: int, stop: int) -> int:
+    """Start of the last line in buf[start:stop] (start at a line start)."""
+    tail = stop
+    if buf[tail - 1:tail] in (b'\n', b'\r'):
+        tail -= 2 if buf[tail - 2:tail] == b'\r\n' else 1
+    return max(buf.rfind(b'\n', start, tail), buf.rfind(b'\r', start, tail), start - 1) + 1
+
+def scan_lines(parser: LogParser, buf, start: int = 0, end: Optional[int] = None,
+               feed: Optional[Callable[[int, str], Sequence[Tuple[str, object]]]] = None
+               ) -> Iterator[Tuple[str, object]]:
+    """Feed the lines of buf[start:end] (start at a line start) to parser and
+    yield their events. If given, feed(offset, line) is called instead of
+    parser.feed(line), with the byte offset of the line in buf (LogIndex
+    records it).
+
+    Same result as feeding every line, but outside an open traceback the
+    raw bytes are searched for the next PREFILTER literal (one bytes.find per
+    literal, far faster than the regex alternation) and the lines before the
+    candidate line are only counted (LogParser.skip), so just the candidates
+    are decoded: time and memory follow the number of matches rather than
+    the size of the log. Lines that may continue an open traceback are split
+    and decoded a block at a time.
+    """
+    end = len(buf) if end is None else end
+    pos = start
+    hits = [-1] * len(PREFILTER_BYTES)  # Next occurrence of each literal (end: none left)
+
+    def next_hit() -> int:
+        best = end
+        for k, literal in enumerate(PREFILTER_BYTES):
+            hit = hits[k]
+            if hit < pos:
+                hit = buf.find(literal, pos, end)
+                hit = hits[k] = end if hit < 0 else hit
+            if hit < best:
+                best = hit
+        return best
+
+    skipped = None  # (start, stop) of a run of skipped lines not followed by a fed line
+    while pos < end:
+        if parser.in_traceback:
+            limit = min(pos + FEED_BLOCK, end)
+            cut = max(buf.rfind(b'\n', pos, limit), buf.rfind(b'\r', pos, limit))
+            stop = line_end(buf, cut if cut >= pos else pos, end)
+            block = buf[pos:stop]
+            # newline=None splits and translates like text-mode file iteration
+            lines = io.StringIO(block.decode('utf-8', errors='replace'), newline=None)
+            if feed:
+                raw_lines = block.splitlines(True)  # Same split as newline=None, in bytes
+                line_start = pos
+            for count, line in enumerate(lines, 1):
+                if feed:
+                    events = feed(line_start, line)
+                    line_start += len(raw_lines[count - 1])
+                else:
+                    events = parser.feed(line)
+                if events:
+                    yield from events
+                if not parser.in_traceback:
+                    match = next(islice(NEWLINE_BYTES.finditer(block), count - 1, None), None)
+                    stop = pos + match.end() if match else stop  # else: unterminated last line
+                    break
+            pos = stop
+            skipped = None
+            continue
+
+        hit = next_hit()
+        if hit >= end:
+            line_start = end
+        else:
+            line_start = max(buf.rfind(b'\n', pos, hit), buf.rfind(b'\r', pos, hit), pos - 1) + 1
+        if line_start > pos:
+            parser.skip(count_lines(buf, pos, line_start))
+            skipped = (pos, line_start)
+            pos = line_start
+            if pos >= end:
+                break
+        stop = line_end(buf, pos, end)
+        line = decode_line(buf[pos:stop])
+        events = feed(pos, line) if feed else parser.feed(line)
+        skipped = None
+        if events:
+            yield from events
+        pos = stop
+    if skipped:
+        parser.last_line = decode_line(buf[_last_line_start(buf, *skipped):skipped[1]])
+
+def iter_log(log_path: Path, event_cap: Optional[int] = None) -> Iterator[Tuple[str, object]]:
+    """Stream (kind, item) events from a log without loading it into memory.
+
+    Plain logs are memory-mapped and scanned with scan_lines(); compressed
+    ones (see COMPRESSED) are decompressed as a stream and fed line by line.
+    event_cap is passed on to LogParser.
+    """
+    parser = LogParser(event_cap)
+    if is_compressed(log_path):
+        feed = parser.feed
+        try:
+            with open_log(log_path) as f:
+                for raw in f:
+                    for _, line in split_lines(raw):
+                        events = feed(line)
+                        if events:
+                            yield from events
+        except CORRUPT_ERRORS as e:
+            raise OSError(f"{log_path}: {e}") from e
+    else:
+        with map_log(log_path) as buf:
+            yield from scan_lines(parser, buf)
+    yield from parser.close()
+
+class ResultCollector:
+    """Collects streamed events into the parse_log() result dict.
+
+    caps maps a bucket name to the number of most recent entries to keep
+    (ring buffer); 'rife_by_category' caps apply per category. Buckets
+    without a cap are unbounded. Totals are counted regardless of caps.
+    The parsers read the 'session_events' cap (events kept per RIFE session)
+    from the same dict.
+    """
+
+    def __init__(self, caps: Optional[Dict[str, int]] = None):
+        self.caps = caps or {}
+        self.buckets = {name: deque(maxlen=self.caps.get(name)) for name in BUCKETS
+                        if name != 'rife_by_category'}
+        category_cap = self.caps.get('rife_by_category')
+        self.by_category = defaultdict(lambda: deque(maxlen=category_cap))
+        self.totals = Counter()
+
+    def add(self, kind: str, item):
+        if kind == 'rife_by_category':
+            category, event = item
+            self.by_category[category].append(event)
+        elif kind in self.buckets:
+            self.buckets[kind].append(item)
+        else:
+            return
+        self.totals[kind] += 1
+
+    def results(self) -> dict:
+        results = {name: list(items) for name, items in self.buckets.items()}
+        results['rife_by_category'] = defaultdict(list, {
+            category: list(events) for category, events in self.by_category.items()
+        })
+        results['totals'] = dict(self.totals)
+        return results
+
+def parse_log(log_path: Path, caps: Optional[Dict[str, int]] = None, jobs: int = 1) -> dict:
+    """Parse mpv log and extract relevant information.
+
+    See ResultCollector for caps; without caps every match is kept. With
+    jobs > 1 the log is parsed in chunks by a process pool (parse_log_parallel),
+    unless it is compressed: a compressed stream can only be read in order.
+    """
+    try:
+        if jobs > 1 and not is_compressed(log_path):
+            return parse_log_parallel(log_path, jobs, caps)
+        collector = ResultCollector(caps)
+        for kind, item in iter_log(log_path, (caps or {}).get('session_events')):
+            collector.add(kind, item)
+    except OSError as e:
+        return {'error': f'Failed to read log: {e}'}
+    return collector.results()
+
+# ---------------------------------------------------------------------------
+# Parallel (chunked) parsing
+# ---------------------------------------------------------------------------
+
+def split_lines(raw: bytes) -> List[Tuple[int, str]]:
+    """Split one b'\\n'-terminated chunk of bytes into text-mode lines.
+
+    Returns (offset within raw, decoded line) pairs. Lone CR (and CRLF) also
+    end a line in text mode; CR/LF bytes never occur inside UTF-8 sequences,
+    so splitting before decoding is exact.
+    """
+    if b'\r' not in raw:
+        return [(0, raw.decode('utf-8', errors='replace'))]
+    lines = []
+    start = 0
+    for match in NEWLINE_BYTES.finditer(raw):
+        lines.append((start, raw[start:match.start()].decode('utf-8', errors='replace') + '\n'))
+        start = match.end()
+    if start < len(raw):
+        lines.append((start, raw[start:].decode('utf-8', errors='replace')))
+    return lines
+
+def read_line_at(f, offset: int) -> str:
+    """Read back the (rstripped) line starting at byte offset of binary file f."""
+    f.seek(offset)
+    raw = NEWLINE_BYTES.split(f.readline(), 1)[0]
+    return raw.decode('utf-8', errors='replace').rstrip()
+
+def iter_lines(f, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """Yield decoded lines of binary file f from byte offset start up to end.
+
+    Lines are split like text-mode iteration (universal newlines), so line
+    numbers agree with iter_log(). start must be at a line boundary.
+    """
+    f.seek(start)
+    pos = start
+    for raw in f:
+        if end is not None and pos >= end:
+            break
+        pos += len(raw)
+        for _, line in split_lines(raw):
+            yield line
+
+def chunk_ranges(log_path: Path, jobs: int) -> List[Tuple[int, int]]:
+    """Split a file into at most `jobs` byte ranges that start at line boundaries."""
+    size = os.path.getsize(log_path)
+    bounds = [0]
+    with open(log_path, 'rb') as f:
+        for k in range(1, jobs):
+            target = size * k // jobs
+            if target <= bounds[-1]:
+                continue
+            # Move to the start of the line containing/after target
+            f.seek(target - 1)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
 
-        # VapourSynth messages
-        if patterns['vapoursynth'].search(line):
-            results['vapoursynth'].append((i, line))
+@dataclass
+class ChunkResult:
+    """Parse of one byte range of a log, made from a clean parser state.
+
+    Line numbers are local to the chunk. The lead_* fields describe how the
+    start of the chunk continues state left open by the previous chunk:
+    lead_session collects events that belong to a session open at the chunk
+    start (and is closed by a leading deactivation), lead_lines counts the
+    leading lines that would extend an open traceback and lead_break tells
+    what ended that run ('start' of a new traceback, 'end', or '' for none).
+    """
+    start: int
+    line_count: int
+    last_line: str
+    results: dict
+    lead_session: RIFESession
+    lead_lines: int
+    lead_break: str
+    open_session: Optional[RIFESession]
+    open_traceback: Optional[List[Tuple[int, str]]]
+
+def parse_chunk(log_path: Path, start: int, end: int, caps: Optional[Dict[str, int]] = None) -> ChunkResult:
+    """Parse the byte range [start, end) of a log (process pool worker)."""
+    parser = LogParser((caps or {}).get('session_events'))
+    # Placeholder for a session the previous chunks may have left open
+    lead_session = parser.current_session = RIFESession(
+        session_id=0, start_line=0, events=SessionEvents(maxlen=parser.event_cap))
+    collector = ResultCollector(caps)
+    lead_lines, lead_break = 0, ''
+
+    with map_log(log_path) as buf:
+        pos = start
+        # Leading lines are read one by one until it is clear how far they
+        # would extend a traceback left open by the previous chunk
+        while pos < end and not lead_break:
+            stop = line_end(buf, pos, end)
+            line = decode_line(buf[pos:stop])
+            if starts_traceback(line):
+                lead_break = 'start'
+            elif continues_traceback(line):
+                lead_lines += 1
+            else:
+                lead_break = 'end'
+            for kind, item in parser.feed(line):
+                collector.add(kind, item)
+            pos = stop
+        for kind, item in scan_lines(parser, buf, pos, end):
+            collector.add(kind, item)
+
+    return ChunkResult(
+        start=start,
+        line_count=parser.line_num,
+        last_line=parser.last_line,
+        results=collector.results(),
+        lead_session=lead_session,
+        lead_lines=lead_lines,
+        lead_break=lead_break,
+        open_session=parser.current_session,
+        open_traceback=parser.traceback_lines if parser.in_traceback else None,
+    )
+
+def _shift_session(session: RIFESession, base: int, id_offset: int):
+    session.session_id += id_offset
+    session.start_line += base
+    if session.end_line:
+        session.end_line += base
+    session.events.shift_lines(base)
+
+def merge_chunks(log_path: Path, chunks: List[ChunkResult], caps: Optional[Dict[str, int]] = None) -> dict:
+    """Merge consecutive chunk parses into the same result as a serial parse.
+
+    Sessions and tracebacks left open at the end of a chunk are carried into
+    the next one; traceback continuation lines are re-read from the log only
+    when a traceback is actually open across the boundary.
+    """
+    collector = ResultCollector(caps)
+    totals = Counter()
+    base = 0
+    id_offset = 0
+    carried_session = None
+    carried_traceback = None
+
+    for chunk in chunks:
+        results = chunk.results
+        totals.update(results['totals'])
+
+        # Traceback open across the boundary
+        if carried_traceback is not None:
+            if chunk.lead_lines:
+                with open(log_path, 'rb') as f:
+                    lines = iter_lines(f, chunk.start)
+                    for k in range(1, chunk.lead_lines + 1):
+                        append_traceback_line(carried_traceback, (base + k, next(lines).rstrip()))
+            if chunk.lead_break == 'end':
+                collector.add('python_traceback', carried_traceback)
+                totals['python_traceback'] += 1
+                carried_traceback = None
+            elif chunk.lead_break == 'start':
+                carried_traceback = None
+
+        # Session open across the boundary
+        lead = chunk.lead_session
+        if carried_session is not None:
+            carried_session.events.extend(
+                (i + base, ts, cat, msg) for i, ts, cat, msg in lead.events)
+            if lead.end_line:
+                carried_session.end_line = lead.end_line + base
+                carried_session.end_time = lead.end_time
+
+        sessions = results['rife_sessions']
+        for session in sessions:
+            _shift_session(session, base, id_offset)
+            collector.add('rife_sessions', session)
+        if chunk.open_session is not lead:
+            if chunk.open_session is not None and not (sessions and sessions[-1] is chunk.open_session):
+                _shift_session(chunk.open_session, base, id_offset)  # evicted by caps
+            carried_session = chunk.open_session
+        id_offset += results['totals'].get('rife_sessions', 0)
+
+        for category, events in results['rife_by_category'].items():
+            for i, ts, msg in events:
+                collector.add('rife_by_category', (category, (i + base, ts, msg)))
+        for kind in ('errors', 'lua_errors', 'vapoursynth', 'frame_timing', 'rife_adaptive', 'warnings'):
+            for i, line in results[kind]:
+                collector.add(kind, (i + base, line))
+        for i, line, script in results['script_loading']:
+            collector.add('script_loading', (i + base, line, script))
+        for tb in results['python_traceback']:
+            collector.add('python_traceback', [(i + base, line) for i, line in tb])
+
+        if chunk.open_traceback is not None:
+            carried_traceback = [(i + base, line) for i, line in chunk.open_traceback]
+        elif chunk.lead_break:
+            carried_traceback = None
+
+        base += chunk.line_count
 
     # Close any open session
-    if current_session:
-        current_session.end_line = len(lines)
-        current_session.end_time = timestamp
+    if carried_session is not None and chunks:
+        carried_session.end_line = base
+        carried_session.end_time = line_timestamp(chunks[-1].last_line)
+
+    collector.totals = totals
+    return collector.results()
+
+def parse_log_parallel(log_path: Path, jobs: int, caps: Optional[Dict[str, int]] = None) -> dict:
+    """Parse a log in `jobs` byte-range chunks on a process pool and merge them."""
+    ranges = chunk_ranges(log_path, jobs)
+    with ProcessPoolExecutor(max_workers=max(1, len(ranges))) as pool:
+        chunks = list(pool.map(parse_chunk, repeat(log_path), [a for a, _ in ranges],
+                               [b for _, b in ranges], repeat(caps)))
+    return merge_chunks(log_path, chunks, caps)
+
+# ---------------------------------------------------------------------------
+# Follow (tail) mode
+# ---------------------------------------------------------------------------
+
+CACHE_DIR = Path(__file__).parent.parent.parent / "_cache" / "log_reader"  # portable_config/_cache
+HEAD_BYTES = 4096  # Leading bytes hashed to notice a rotated/replaced log
+
+def cache_path(log_path: Path, suffix: str) -> Path:
+    """Per-log cache file under portable_config/_cache/log_reader."""
+    key = hashlib.sha1(str(Path(log_path).resolve()).encode('utf-8')).hexdigest()[:12]
+    return CACHE_DIR / f"{Path(log_path).name}-{key}{suffix}"
+
+def default_checkpoint_path(log_path: Path) -> Path:
+    """Follow mode checkpoint file for a log."""
+    return cache_path(log_path, '.follow.json')
+
+def _head_digest(f, length: int) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+class LogFollower:
+    """Tails a growing log, parsing only appended bytes.
+
+    The LogParser is kept between polls, so sessions and tracebacks that are
+    still open carry over to the next read. After every poll the byte offset
+    and parser state are written to checkpoint_path (if given); a later
+    follower for the same log resumes from there. Only complete lines are
+    consumed - a line still being written is picked up by the next poll.
+    event_cap bounds the events kept for the open session (see LogParser).
+    """
+
+    checkpoint_version = 1
+
+    def __init__(self, log_path: Path, checkpoint_path: Optional[Path] = None,
+                 event_cap: Optional[int] = None):
+        self.log_path = Path(log_path)
+        self.checkpoint_path = checkpoint_path
+        self.event_cap = event_cap
+        self.reset()
+        self.resumed = self._load_checkpoint()
+
+    def reset(self):
+        self.parser = LogParser(self.event_cap)
+        self.offset = 0
+        self.head = ('', 0)  # (digest, length)
+
+    def _load_checkpoint(self) -> bool:
+        if not self.checkpoint_path or not Path(self.checkpoint_path).exists():
+            return False
+        try:
+            data = self._read(Path(self.checkpoint_path))
+            if data.get('version') != self.checkpoint_version or data['log_path'] != str(self.log_path.resolve()):
+                return False
+            self.parser = LogParser.from_state(data['parser'], self.event_cap)
+            self.offset = data['offset']
+            self.head = tuple(data['head'])
+            self._restore(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reset()
+            return False
+        return True
+
+    def save(self):
+        """Persist offset and parser state (atomic replace)."""
+        if not self.checkpoint_path:
+            return
+        data = {
+            'version': self.checkpoint_version,
+            'log_path': str(self.log_path.resolve()),
+            'offset': self.offset,
+            'head': list(self.head),
+            'parser': self.parser.state(),
+        }
+        data.update(self._extra_state())
+        path = Path(self.checkpoint_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        self._write(tmp, data)
+        os.replace(tmp, path)
+
+    def _read(self, path: Path) -> dict:
+        """Load a checkpoint file written by _write()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, path: Path, data: dict):
+        """Write the checkpoint data to path."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data))  # dumps() encodes in C, dump() in Python
+
+    def _extra_state(self) -> dict:
+        """Additional checkpoint fields (for subclasses)."""
+        return {}
+
+    def _restore(self, data: dict):
+        """Restore _extra_state() fields from a checkpoint (for subclasses)."""
+
+    def _feed(self, offset: int, line: str) -> Sequence[Tuple[str, object]]:
+        """Feed one line starting at byte offset to the parser."""
+        return self.parser.feed(line)
+
+    def poll(self) -> Iterator[Tuple[str, object]]:
+        """Parse lines appended since the last poll and yield their events.
+
+        Yields ('log_reset', log_path) first if the log was truncated or
+        replaced, in which case parsing restarts from byte 0.
+        """
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return  # Not created yet, or mid-rotation
+        with open(self.log_path, 'rb') as f:
+            digest, length = self.head
+            if size < self.offset or (length and _head_digest(f, length) != digest):
+                self.reset()
+                yield ('log_reset', self.log_path)
+            if size == self.offset:
+                return
+
+            with map_log(self.log_path) as buf:
+                # Complete lines only: a line still being written is left for the next poll
+                end = buf.rfind(b'\n', self.offset, len(buf)) + 1
+                if end > self.offset:
+                    yield from scan_lines(self.parser, buf, self.offset, end, self._feed)
+                    self.offset = end
+
+            if self.head[1] < HEAD_BYTES:
+                length = min(self.offset, HEAD_BYTES)
+                self.head = (_head_digest(f, length), length)
+        self.save()
+
+def print_follow_event(kind: str, item, parser: LogParser, categories=None,
+                       show_lua=True, show_python=True):
+    """Print one live event in follow mode."""
+    if kind == 'rife_sessions':
+        print(f"\n{Colors.CYAN}{Colors.BOLD}RIFE SESSION #{item.session_id} started "
+              f"(L{item.start_line}, {item.start_time:.2f}s){Colors.RESET}")
+    elif kind == 'session_end':
+        print(f"{Colors.CYAN}{Colors.BOLD}RIFE SESSION #{item.session_id} ended "
+              f"(L{item.end_line}, duration: {item.duration:.1f}s){Colors.RESET}")
+    elif kind == 'rife_by_category':
+        category, (line_num, timestamp, message) = item
+        is_python = category.startswith('PY_')
+        if (categories and category not in categories) or (is_python and not show_python) \
+                or (not is_python and not show_lua):
+            return
+        session = parser.current_session
+        prefix = f"#{session.session_id}" if session else "  "
+        cat_color = Colors.GREEN if is_python else Colors.YELLOW
+        print(f"  {prefix} L{line_num:5d} [{timestamp:8.2f}s] "
+              f"{cat_color}[{category}]{Colors.RESET} {message}")
+    elif kind == 'lua_errors':
+        line_num, text = item
+        print(f"{Colors.RED}L{line_num:5d}{Colors.RESET}: {text}")
+    elif kind == 'python_traceback':
+        for line_num, text in item:
+            print(f"{Colors.RED}L{line_num:5d}{Colors.RESET}: {text}")
+    elif kind == 'log_reset':
+        print(f"{Colors.YELLOW}Log truncated or replaced, restarting from the beginning{Colors.RESET}")
+
+def follow(log_path: Path, args):
+    """Run follow mode until interrupted."""
+    checkpoint = None if args.no_checkpoint else Path(args.checkpoint or default_checkpoint_path(log_path))
+    follower = LogFollower(log_path, checkpoint, args.limit or None)
+    categories = args.category.split(',') if args.category else None
+
+    if follower.resumed:
+        print(f"{Colors.CYAN}Resuming at byte {follower.offset} (line {follower.parser.line_num}){Colors.RESET}")
+    elif not args.replay:
+        # Catch up silently; only events appended from now on are printed
+        for _ in follower.poll():
+            pass
+        session = follower.parser.current_session
+        print(f"{Colors.CYAN}Caught up at line {follower.parser.line_num}"
+              f"{f', session #{session.session_id} open' if session else ''}{Colors.RESET}")
 
-    return results
+    try:
+        while True:
+            for kind, item in follower.poll():
+                print_follow_event(kind, item, follower.parser, categories,
+                                   show_lua=not args.python_only, show_python=not args.lua_only)
+            sys.stdout.flush()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+# ---------------------------------------------------------------------------
+# Persistent index
+# ---------------------------------------------------------------------------
+
+LINE_BUCKETS = ('errors', 'lua_errors', 'script_loading', 'vapoursynth', 'frame_timing', 'rife_adaptive', 'warnings')
+
+def default_index_path(log_path: Path) -> Path:
+    """Sidecar index file for a log."""
+    return cache_path(log_path, '.index')
+
+def _decode_line_item(f, entry):
+    line_num, offset = entry
+    return (line_num, read_line_at(f, offset))
+
+def _decode_script_item(f, entry):
+    line_num, offset = entry
+    line = read_line_at(f, offset)
+    return (line_num, line, PATTERNS['script_loading'].search(line).group(2))
+
+def _decode_category_item(f, entry):
+    line_num, offset = entry
+    line = read_line_at(f, offset)
+    return (line_num, line_timestamp(line), PATTERNS['rife_adaptive_cat'].search(line).group(2))
+
+def _decode_traceback_item(f, entries):
+    return [_decode_line_item(f, entry) for entry in entries]
+
+def _decode_event_item(f, entry):
+    line_num, offset = entry
+    line = read_line_at(f, offset)
+    match = PATTERNS['rife_adaptive_cat'].search(line)
+    return (line_num, line_timestamp(line), match.group(1), match.group(2))
+
+class OffsetList(SequenceABC):
+    """(line_num, byte_offset) pairs of indexed lines in two typed arrays.
+
+    With maxlen only the last maxlen pairs are kept (compacted like
+    SessionEvents). A list read from an index file is loaded from `source`
+    (path, position, length) on first use.
+    """
+
+    def __init__(self, maxlen: Optional[int] = None, source: Optional[Tuple[Path, int, int]] = None):
+        self.maxlen = maxlen
+        self.first = 0  # Position of the oldest kept pair
+        self.source = source
+        self.lines = array('q')
+        self.offsets = array('q')
+
+    def _load(self):
+        path, position, length = self.source
+        self.source = None
+        with open(path, 'rb') as f:
+            f.seek(position)
+            self.lines.fromfile(f, length)
+            self.offsets.fromfile(f, length)
+
+    def append(self, line_num: int, offset: int):
+        if self.source:
+            self._load()
+        self.lines.append(line_num)
+        self.offsets.append(offset)
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self.first += 1
+            if self.first >= self.maxlen:
+                self._compact()
+
+    def _compact(self):
+        del self.lines[:self.first]
+        del self.offsets[:self.first]
+        self.first = 0
+
+    def write(self, f):
+        """Write the kept pairs (line numbers, then offsets) to binary file f."""
+        if self.source:
+            self._load()
+        self._compact()
+        self.lines.tofile(f)
+        self.offsets.tofile(f)
+
+    def __len__(self):
+        if self.source:
+            return self.source[2]
+        return len(self.lines) - self.first
+
+    def __getitem__(self, index):
+        if self.source:
+            self._load()
+        if isinstance(index, slice):
+            return [self[k] for k in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('offset index out of range')
+        index += self.first
+        return (self.lines[index], self.offsets[index])
+
+class IndexedItems(SequenceABC):
+    """Read-only view of indexed log lines, decoded only when accessed.
+
+    entries hold the (line_num, byte_offset) positions recorded by LogIndex;
+    decode(f, entry) reads one back into the item shape parse_log() uses.
+    """
+
+    def __init__(self, log_path: Path, entries, decode):
+        self.log_path = log_path
+        self.entries = entries
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        with open(self.log_path, 'rb') as f:
+            if isinstance(index, slice):
+                return [self.decode(f, entry) for entry in self.entries[index]]
+            return self.decode(f, self.entries[index])
+
+    def __iter__(self):
+        with open(self.log_path, 'rb') as f:
+            for entry in self.entries:
+                yield self.decode(f, entry)
+
+class IndexedSessionEvents(SessionEvents):
+    """Events of an indexed session, read back from the log on first use."""
+
+    def __init__(self, log_path: Path, entries: OffsetList):
+        self.log_path = log_path
+        self.entries = entries
+
+    def __getattr__(self, name):  # Only reached while the events are not loaded yet
+        if name.startswith('__') or 'entries' not in self.__dict__ or 'lines' in self.__dict__:
+            raise AttributeError(name)
+        SessionEvents.__init__(self, IndexedItems(self.log_path, self.entries, _decode_event_item))
+        return getattr(self, name)
+
+    def __len__(self):
+        return SessionEvents.__len__(self) if 'lines' in self.__dict__ else len(self.entries)
+
+class LogIndex(LogFollower):
+    """Sidecar index of a parsed log for fast repeated queries.
+
+    Stores the line number and byte offset of every matched line (per
+    bucket, per RIFE category, per traceback line and per session event) in
+    typed arrays, the session boundaries and the totals, keyed on the log's
+    size and mtime; no message text is kept. caps (see ResultCollector)
+    apply while the index is built, so a capped index stays as small as the
+    result; an index built with other caps is rebuilt. The file is a JSON
+    header line followed by the arrays, which are only read when used.
+    update() extends the index incrementally when the log has grown and
+    rebuilds it when the log was replaced; results() then returns a
+    parse_log()-style dict whose items are decoded from the log on access.
+    """
+
+    checkpoint_version = 3  # 3: binary offset arrays, caps applied while building
+
+    def __init__(self, log_path: Path, checkpoint_path: Optional[Path] = None,
+                 caps: Optional[Dict[str, int]] = None):
+        self.caps = dict(caps or {})
+        super().__init__(log_path, checkpoint_path, event_cap=0)  # Events are kept as offsets
+
+    def reset(self):
+        super().reset()
+        caps = self.caps
+        self.stat = (0, 0)
+        self.totals = Counter()
+        self.lines = {kind: OffsetList(caps.get(kind)) for kind in LINE_BUCKETS}
+        self.categories = {}
+        self.tracebacks = deque(maxlen=caps.get('python_traceback'))
+        self.traceback_offsets = []
+        self.sessions = deque(maxlen=caps.get('rife_sessions'))
+        self.session_events = deque(maxlen=caps.get('rife_sessions'))  # OffsetList per session
+
+    def _lists(self) -> Iterator[Tuple[list, OffsetList]]:
+        """(key, list) of every OffsetList, in file order."""
+        for kind, entries in self.lines.items():
+            yield ['lines', kind], entries
+        for category, entries in self.categories.items():
+            yield ['categories', category], entries
+        for entries in self.tracebacks:
+            yield ['tracebacks', None], entries
+        for entries in self.session_events:
+            yield ['session_events', None], entries
+
+    def _extra_state(self) -> dict:
+        return {
+            'stat': list(self.stat),
+            'caps': self.caps,
+            'totals': self.totals,
+            'traceback_offsets': self.traceback_offsets,
+            'sessions': [[s.session_id, s.start_line, s.end_line, s.start_time, s.end_time]
+                         for s in self.sessions],
+        }
+
+    def _write(self, path: Path, data: dict):
+        lists = list(self._lists())
+        data['lists'] = [key + [len(entries)] for key, entries in lists]
+        with open(path, 'wb') as f:
+            f.write(json.dumps(data).encode('utf-8') + b'\n')
+            for _, entries in lists:
+                entries.write(f)
+
+    def _read(self, path: Path) -> dict:
+        with open(path, 'rb') as f:
+            data = json.loads(f.readline())
+            position = f.tell()
+        lists = []
+        for kind, name, length in data['lists']:
+            lists.append((kind, name, (path, position, length)))
+            position += 2 * length * array('q').itemsize
+        data['lists'] = lists
+        return data
+
+    def _restore(self, data: dict):
+        if data['caps'] != self.caps:
+            raise ValueError('index built with other caps')
+        caps = self.caps
+        self.stat = tuple(data['stat'])
+        self.totals = Counter(data['totals'])
+        self.traceback_offsets = data['traceback_offsets']
+        for kind, name, source in data['lists']:
+            if kind == 'lines':
+                self.lines[name] = OffsetList(caps.get(name), source)
+            elif kind == 'categories':
+                self.categories[name] = OffsetList(caps.get('rife_by_category'), source)
+            elif kind == 'tracebacks':
+                self.tracebacks.append(OffsetList(source=source))
+            else:
+                self.session_events.append(OffsetList(caps.get('session_events'), source))
+        self.sessions.extend(RIFESession(session_id, start_line, end_line, start_time, end_time,
+                                         SessionEvents(maxlen=0))
+                             for session_id, start_line, end_line, start_time, end_time in data['sessions'])
+        # The open session is the most recent one; keep a single object for it
+        if self.parser.current_session and self.sessions:
+            self.parser.current_session = self.sessions[-1]
+
+    def _feed(self, offset: int, line: str) -> Sequence[Tuple[str, object]]:
+        parser = self.parser
+        events = parser.feed(line)
+        for kind, item in events:
+            if kind == 'session_end':
+                continue
+            self.totals[kind] += 1
+            if kind == 'python_traceback':
+                entries = OffsetList()
+                for (line_num, _), off in zip(item, self.traceback_offsets):
+                    entries.append(line_num, off)
+                self.tracebacks.append(entries)
+            elif kind == 'rife_sessions':
+                self.sessions.append(item)
+                self.session_events.append(OffsetList(self.caps.get('session_events')))
+            elif kind == 'rife_by_category':
+                entries = self.categories.get(item[0])
+                if entries is None:
+                    entries = self.categories[item[0]] = OffsetList(self.caps.get('rife_by_category'))
+                entries.append(parser.line_num, offset)
+                if parser.current_session:
+                    self.session_events[-1].append(parser.line_num, offset)
+            elif kind in self.lines:
+                self.lines[kind].append(parser.line_num, offset)
+        # Offsets of the open traceback, in step with parser.traceback_lines
+        if parser.in_traceback and parser.traceback_lines[-1][0] == parser.line_num:
+            if len(parser.traceback_lines) == 1:
+                self.traceback_offsets = []
+            append_traceback_line(self.traceback_offsets, offset)
+        return events
+
+    def update(self) -> bool:
+        """Bring the index up to date with the log; returns True if it changed."""
+        st = os.stat(self.log_path)
+        stat = (st.st_size, st.st_mtime_ns)
+        if self.resumed and stat == self.stat:
+            return False
+        offset = self.offset
+        self.stat = stat
+        for _ in self.poll():
+            pass
+        if self.offset == offset:
+            self.save()  # poll() only saves when it consumed bytes
+        return True
+
+    def results(self) -> dict:
+        """Build the parse_log() result; call once, after update().
+
+        A trailing line without newline (not stored in the index) is parsed
+        here, and a session still open is closed at end of log like parse_log()
+        does.
+        """
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.offset)
+            tail = f.read()
+        if tail:
+            for rel, line in split_lines(tail):
+                self._feed(self.offset + rel, line)
+        self.parser.close()
+
+        results = {
+            kind: IndexedItems(self.log_path, entries,
+                               _decode_script_item if kind == 'script_loading' else _decode_line_item)
+            for kind, entries in self.lines.items()
+        }
+        results['python_traceback'] = IndexedItems(self.log_path, list(self.tracebacks), _decode_traceback_item)
+        results['rife_by_category'] = defaultdict(list, {
+            category: IndexedItems(self.log_path, entries, _decode_category_item)
+            for category, entries in self.categories.items()
+        })
+        results['rife_sessions'] = [
+            RIFESession(s.session_id, s.start_line, s.end_line, s.start_time, s.end_time,
+                        IndexedSessionEvents(self.log_path, events))
+            for s, events in zip(self.sessions, self.session_events)
+        ]
+        results['totals'] = {kind: self.totals[kind] for kind in BUCKETS}
+        return results
+
+def parse_log_indexed(log_path: Path, caps: Optional[Dict[str, int]] = None,
+                      index_path: Optional[Path] = None) -> dict:
+    """Like parse_log(), but backed by a sidecar index that is built on the
+    first call and extended when the log grows. Falls back to a plain parse
+    if the index cannot be read or written, and for compressed logs (byte
+    offsets into them cannot be seeked to)."""
+    if is_compressed(log_path):
+        return parse_log(log_path, caps)
+    try:
+        index = LogIndex(log_path, index_path or default_index_path(log_path), caps)
+        index.update()
+        return index.results()
+    except OSError:
+        return parse_log(log_path, caps)
+
+# ---------------------------------------------------------------------------
+# Latency analysis
+# ---------------------------------------------------------------------------
+
+# A marker picks the 'first' or 'last' event of a category in a session,
+# optionally only among events whose message starts with a prefix.
+ACTIVATION = ('TOGGLE', 'RIFE activation requested', 'first')
+LATENCY_STAGES = (
+    # stage,           start marker,                       end marker
+    ('crop_detect',    ACTIVATION,                         ('CROP', None, 'last')),
+    ('vpy_to_py_init', ('VPY', 'Script written', 'first'), ('PY_INIT', None, 'first')),
+    ('model_resolve',  ('PY_MODEL', None, 'first'),        ('PY_MODEL', None, 'last')),
+    ('rife_setup',     ('PY_RIFE', None, 'first'),         ('PY_RIFE', None, 'last')),
+    ('graph_build',    ('PY_INIT', None, 'first'),         ('PY_OUTPUT', None, 'last')),
+    ('first_frame',    ('PY_OUTPUT', None, 'last'),        ('PY_FRAME', 'First frame', 'first')),
+    ('total',          ACTIVATION,                         ('PY_FRAME', 'First frame', 'first')),
+)
+# Session parameters: the first match of each field wins, in table order
+SESSION_FIELDS = (
+    # field,          category,  pattern
+    ('container_fps', 'TOGGLE',  re.compile(r'container_fps=([0-9.]+)')),
+    ('model',         'PY_INIT', re.compile(r'model=(\d+)')),
+    ('target',        'PY_INIT', re.compile(r'target=(\d+x\d+)')),
+    ('target',        'VPY',     re.compile(r'-> (\d+x\d+)')),
+    ('crop',          'VPY',     re.compile(r'Crop: (\d+x\d+)')),
+    ('vsr_path',      'VPY',     re.compile(r'VSR Path: (true|false)')),
+)
+
+def session_params(session: RIFESession) -> Dict[str, Optional[str]]:
+    """Container fps, model, target, crop and VSR path a session ran with (None if not logged)."""
+    params = dict.fromkeys(field for field, _, _ in SESSION_FIELDS)
+    for field, category, pattern in SESSION_FIELDS:
+        if params[field] is not None:
+            continue
+        for _, _, event_category, message in session.events:
+            match = event_category == category and pattern.search(message)
+            if match:
+                params[field] = match.group(1)
+                break
+    return params
+
+def find_marker(session: RIFESession, marker) -> Optional[float]:
+    """Timestamp of the event a marker selects, or None if there is none."""
+    category, prefix, which = marker
+    found = None
+    for _, timestamp, event_category, message in session.events:
+        if event_category == category and (prefix is None or message.startswith(prefix)):
+            found = timestamp
+            if which == 'first':
+                break
+    return found
+
+def session_latency(session: RIFESession) -> Dict[str, Optional[float]]:
+    """Per-stage durations (seconds) of a session; None where a marker is missing."""
+    stages = {}
+    for stage, start_marker, end_marker in LATENCY_STAGES:
+        start = find_marker(session, start_marker)
+        end = find_marker(session, end_marker)
+        stages[stage] = round(end - start, 6) if start is not None and end is not None and end >= start else None
+    return stages
+
+def latency_report(sessions: List[RIFESession]) -> dict:
+    """Per-session stage durations plus p50/p95/max per stage across sessions."""
+    rows = []
+    for session in sessions:
+        params = session_params(session)
+        row = {'session_id': session.session_id, 'start_line': session.start_line,
+               'model': params['model'], 'target': params['target']}
+        row.update(session_latency(session))
+        rows.append(row)
+    return {'sessions': rows, 'summary': summarize_stages(rows, [stage for stage, _, _ in LATENCY_STAGES])}
+
+def summarize_stages(rows: List[dict], columns: List[str]) -> Dict[str, dict]:
+    """count/p50/p95/max of each numeric column over the rows that have it."""
+    summary = {}
+    for column in columns:
+        values = [row[column] for row in rows if row.get(column) is not None]
+        summary[column] = {
+            'count': len(values),
+            'p50': percentile(values, 50) if values else None,
+            'p95': percentile(values, 95) if values else None,
+            'max': max(values) if values else None,
+        }
+    return summary
+
+def export_report(report: dict, path: Path):
+    """Write a report as JSON, or as CSV (per-session rows, then p50/p95/max rows)."""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        rows = report['sessions']
+        columns = list(rows[0]) if rows else ['session_id']
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+            for stat in ('p50', 'p95', 'max'):
+                writer.writerow({'session_id': stat, **{
+                    column: values[stat] for column, values in report['summary'].items()}})
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+def merge_reports(reports: List[dict]) -> dict:
+    """Combine reports over the same sessions into one (columns side by side)."""
+    merged = {'sessions': [dict(row) for row in reports[0]['sessions']], 'summary': {}}
+    for report in reports:
+        for target, row in zip(merged['sessions'], report['sessions']):
+            target.update(row)
+        for key, value in report.items():
+            if key != 'sessions':
+                merged.setdefault(key, {}).update(value)
+    return merged
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:8.0f}" if value is not None else f"{'-':>8}"
+
+def print_latency_report(report: dict):
+    """Print per-session stage durations and their p50/p95/max (milliseconds)."""
+    stages = list(report['summary'])
+    print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*70}{Colors.RESET}")
+    print(f"{Colors.CYAN}{Colors.BOLD}RIFE ACTIVATION LATENCY (ms){Colors.RESET}")
+    print(f"{Colors.CYAN}{'='*70}{Colors.RESET}")
+    print(f"  {'ID':<4} {'Model':<6} {'Target':<10}" + ''.join(f" {s[:8]:>8}" for s in stages))
+    for row in report['sessions']:
+        print(f"  {row['session_id']:<4} {row['model'] or '-':<6} {row['target'] or '-':<10}"
+              + ''.join(f" {_ms(row[s])}" for s in stages))
+    print(f"  {'-'*70}")
+    for stat in ('p50', 'p95', 'max'):
+        print(f"  {stat:<22}" + ''.join(f" {_ms(report['summary'][s][stat])}" for s in stages))
+
+# ---------------------------------------------------------------------------
+# Frame rate analysis
+# ---------------------------------------------------------------------------
+
+# [FRAMES] samples logged by rife_main.lua (mpv's cumulative counters)
+FRAMES_SAMPLE = re.compile(r'vf_fps=([0-9.]+) drops=(\d+) decoder_drops=(\d+) delayed=(\d+)')
+FRAME_PROGRESS = re.compile(r'count=(\d+)')
+FIRST_FRAME = ('PY_FRAME', 'First frame', 'first')
+TIER_CHANGE = re.compile(r'Tier (\d+) -> (\d+)')  # PY_TIER governor switches
+SKIP_SAMPLE = re.compile(r'pairs=(\d+) skipped=(\d+) duplicate=(\d+) scene_cut=(\d+)')  # PY_SKIP counters
+PREFETCH_SAMPLE = re.compile(r'hits=(\d+) misses=(\d+) ready=(\d+)')  # PY_PREFETCH counters
+BEHIND_RATIO = 0.95  # Achieved/target fps below this counts as not keeping up
+FRAME_COLUMNS = ('megapixels', 'target_fps', 'vf_fps', 'vs_fps', 'fps_ratio',
+                 'drops', 'decoder_drops', 'delayed', 'logged_drops', 'logged_delayed', 'skip_ratio', 'prefetch_hit_ratio', 'tier_changes')
+
+def frame_timing_kind(line: str) -> str:
+    """Classify a frame_timing line as 'drops', 'decoder_drops' or 'delayed'."""
+    lowered = line.lower()
+    if 'decoder' in lowered:
+        return 'decoder_drops'
+    if 'delayed' in lowered:
+        return 'delayed'
+    return 'drops'
+
+def _vs_fps(session: RIFESession) -> Optional[float]:
+    """Output rate of the VapourSynth filter from the PY_FRAME progress markers."""
+    points = []
+    for _, timestamp, category, message in session.events:
+        if category != 'PY_FRAME':
+            continue
+        if message.startswith('First frame'):
+            points = [(timestamp, 1)]
+        else:
+            match = FRAME_PROGRESS.search(message)
+            if match and points:
+                points.append((timestamp, int(match.group(1))))
+    if len(points) < 2 or points[-1][0] <= points[0][0]:
+        return None
+    return (points[-1][1] - points[0][1]) / (points[-1][0] - points[0][0])
+
+def session_skips(session: RIFESession) -> dict:
+    """Interpolated frames served without inference (duplicate blends and
+    scene cut repeats), from the session's last PY_SKIP counters."""
+    last = None
+    for _, _, category, message in session.events:
+        match = category == 'PY_SKIP' and SKIP_SAMPLE.search(message)
+        if match:
+            last = [int(v) for v in match.groups()]
+    if last is None:
+        return dict.fromkeys(('skipped_duplicate', 'skipped_scene_cut', 'skip_ratio'))
+    pairs, skipped, duplicate, scene_cut = last
+    return {'skipped_duplicate': duplicate, 'skipped_scene_cut': scene_cut,
+            'skip_ratio': round(skipped / pairs, 3) if pairs else None}
+
+def session_prefetch(session: RIFESession) -> dict:
+    """Share of output frames the prefetch window already held, and the
+    frames ready in it, from the session's last PY_PREFETCH counters."""
+    last = None
+    for _, _, category, message in session.events:
+        match = category == 'PY_PREFETCH' and PREFETCH_SAMPLE.search(message)
+        if match:
+            last = [int(v) for v in match.groups()]
+    if last is None:
+        return dict.fromkeys(('prefetch_hit_ratio', 'prefetch_ready'))
+    hits, misses, ready = last
+    return {'prefetch_hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None,
+            'prefetch_ready': ready}
+
+def session_frames(session: RIFESession, frame_lines: Sequence = ()) -> dict:
+    """Frame rate and drop figures of one session.
+
+    vf_fps averages mpv's [FRAMES] samples taken once frames were flowing
+    (after the first PY_FRAME marker when logged); drop counters are the
+    difference between the last sample and the one just before that.
+    frame_lines are (line, text) frame_timing items; those inside the
+    session's line range are counted as logged_drops/logged_delayed.
+    Inference skips come from session_skips(); tier_changes/lowest_tier
+    count the quality governor's PY_TIER switches (0 = full resolution).
+    """
+    params = session_params(session)
+    samples = []
+    for _, timestamp, category, message in session.events:
+        match = category == 'FRAMES' and FRAMES_SAMPLE.search(message)
+        if match:
+            samples.append((timestamp, float(match.group(1)), *(int(v) for v in match.groups()[1:])))
+    first_frame = find_marker(session, FIRST_FRAME)
+    steady = [x for x in samples if first_frame is None or x[0] >= first_frame]
+    baseline = None
+    if steady:
+        before = [x for x in samples if x[0] < steady[0][0]]
+        baseline = before[-1] if before else steady[0]
+
+    row = {'session_id': session.session_id, 'start_line': session.start_line}
+    row.update(params)
+    if params['target']:
+        width, height = params['target'].split('x')
+        row['megapixels'] = round(int(width) * int(height) / 1e6, 3)
+    else:
+        row['megapixels'] = None
+    row['target_fps'] = round(2 * float(params['container_fps']), 3) if params['container_fps'] else None
+    row['vf_fps'] = round(sum(x[1] for x in steady) / len(steady), 3) if steady else None
+    vs_fps = _vs_fps(session)
+    row['vs_fps'] = round(vs_fps, 3) if vs_fps is not None else None
+    achieved = row['vf_fps'] if row['vf_fps'] is not None else row['vs_fps']
+    row['fps_ratio'] = round(achieved / row['target_fps'], 3) if achieved is not None and row['target_fps'] else None
+    for k, name in enumerate(('drops', 'decoder_drops', 'delayed'), 2):
+        row[name] = steady[-1][k] - baseline[k] if steady else None
+
+    row.update(session_skips(session))
+    row.update(session_prefetch(session))
+    tiers = []
+    for _, _, category, message in session.events:
+        match = category == 'PY_TIER' and TIER_CHANGE.match(message)
+        if match:
+            tiers.append(int(match.group(2)))
+    row['tier_changes'] = len(tiers)
+    row['lowest_tier'] = max(tiers, default=0)
+
+    logged = Counter(frame_timing_kind(text) for line_num, text in frame_lines
+                     if session.start_line <= line_num <= session.end_line)
+    row['logged_drops'] = logged['drops'] + logged['decoder_drops']
+    row['logged_delayed'] = logged['delayed']
+    row['behind'] = row['fps_ratio'] is not None and row['fps_ratio'] < BEHIND_RATIO
+    return row
+
+def budget_summary(rows: List[dict]) -> Dict[str, dict]:
+    """Per pixel budget (VSR path on/off): how many sessions fell behind, the
+    largest target that kept up and the smallest one that did not."""
+    budgets = {}
+    for path, flag in (('max_pixels_vsr_on', 'true'), ('max_pixels_vsr_off', 'false')):
+        measured = [row for row in rows if row['vsr_path'] == flag and row['fps_ratio'] is not None
+                    and row['megapixels'] is not None]
+        kept_up = [row['megapixels'] for row in measured if not row['behind']]
+        behind = [row['megapixels'] for row in measured if row['behind']]
+        budgets[path] = {
+            'sessions': len(measured),
+            'behind': len(behind),
+            'max_kept_up_mp': max(kept_up) if kept_up else None,
+            'min_behind_mp': min(behind) if behind else None,
+        }
+    return budgets
+
+def frame_report(sessions: List[RIFESession], frame_lines: Sequence = ()) -> dict:
+    """Per-session achieved vs target fps and drops, p50/p95/max, and budget verdicts."""
+    frame_lines = list(frame_lines)
+    rows = [session_frames(session, frame_lines) for session in sessions]
+    return {'sessions': rows, 'summary': summarize_stages(rows, list(FRAME_COLUMNS)),
+            'budgets': budget_summary(rows)}
+
+def _num(value, width: int = 7, digits: int = 1) -> str:
+    return f"{value:{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+def print_frame_report(report: dict):
+    """Print achieved vs target fps per session and the pixel budget verdicts."""
+    print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*70}{Colors.RESET}")
+    print(f"{Colors.CYAN}{Colors.BOLD}RIFE FRAME RATE (achieved vs 2x container fps){Colors.RESET}")
+    print(f"{Colors.CYAN}{'='*70}{Colors.RESET}")
+    print(f"  {'ID':<4} {'Model':<6} {'Target':<10} {'VSR':<5} {'MP':>5} {'target':>7} {'vf':>7} "
+          f"{'vs':>7} {'ratio':>6} {'drops':>6} {'dec':>5} {'delay':>6} {'skip':>5} {'hit':>5} {'tier':>4}")
+    for row in report['sessions']:
+        color = Colors.RED if row['behind'] else ''
+        reset = Colors.RESET if row['behind'] else ''
+        counts = ''.join(f" {row[k] if row[k] is not None else '-':>{w}}"
+                         for k, w in (('drops', 6), ('decoder_drops', 5), ('delayed', 6)))
+        print(f"  {color}{row['session_id']:<4} {row['model'] or '-':<6} {row['target'] or '-':<10} "
+              f"{row['vsr_path'] or '-':<5} {_num(row['megapixels'], 5, 2)} {_num(row['target_fps'])} "
+              f"{_num(row['vf_fps'])} {_num(row['vs_fps'])} {_num(row['fps_ratio'], 6, 2)}{counts} "
+              f"{_num(row['skip_ratio'], 5, 2)} {_num(row['prefetch_hit_ratio'], 5, 2)} "
+              f"{row['tier_changes'] or '-':>4}{reset}")
+    for path, budget in report['budgets'].items():
+        if not budget['sessions']:
+            continue
+        if budget['behind']:
+            verdict = (f"{Colors.RED}too high: {budget['behind']}/{budget['sessions']} sessions below "
+                       f"{BEHIND_RATIO:.0%} of target (smallest {budget['min_behind_mp']} MP){Colors.RESET}")
+        else:
+            verdict = f"{Colors.GREEN}ok: {budget['sessions']} sessions kept up{Colors.RESET}"
+        largest = f", largest keeping up {budget['max_kept_up_mp']} MP" if budget['max_kept_up_mp'] else ''
+        print(f"  {path}: {verdict}{largest}")
+
+# ---------------------------------------------------------------------------
+# Stage timing analysis
+# ---------------------------------------------------------------------------
+
+# [PY_PERF] lines logged by rife_trace (span = graph build step, stage = per-frame)
+PERF_SPAN = re.compile(r'span=(\w+) ms=([0-9.]+)')
+PERF_STAGE = re.compile(r'stage=(\w+) n=\d+ ms=([0-9.,]+)')
+PERF_STAGES = ('crop', 'resize_in', 'rife', 'resize_out')
+PERF_SPANS = ('graph_build', 'model_resolve', 'rife_setup')
+HISTOGRAM_EDGES_MS = (0.5, 1, 2, 4, 8, 16, 33, 67, 133, 267, float('inf'))  # Upper bin edges
+
+def session_perf(session: RIFESession) -> Tuple[Dict[str, List[float]], Dict[str, float]]:
+    """Per-frame stage durations and graph build spans (ms) logged in a session."""
+    stages = {stage: [] for stage in PERF_STAGES}
+    spans = {}
+    for _, _, category, message in session.events:
+        if category != 'PY_PERF':
+            continue
+        match = PERF_STAGE.search(message)
+        if match:
+            stages.setdefault(match.group(1), []).extend(float(v) for v in match.group(2).split(',') if v)
+            continue
+        match = PERF_SPAN.search(message)
+        if match:
+            spans.setdefault(match.group(1), float(match.group(2)))
+    return stages, spans
+
+def histogram(values: List[float], edges: Sequence[float] = HISTOGRAM_EDGES_MS) -> List[int]:
+    """Counts of values per bin; bin k holds edges[k-1] < value <= edges[k]."""
+    counts = [0] * len(edges)
+    for value in values:
+        counts[bisect.bisect_left(edges, value)] += 1
+    return counts
+
+def perf_report(sessions: List[RIFESession]) -> dict:
+    """Per-session median stage times and build spans, p50/p95/max per stage
+    over every sampled frame of all sessions, and a histogram per stage."""
+    rows = []
+    samples = {stage: [] for stage in PERF_STAGES}
+    for session in sessions:
+        stages, spans = session_perf(session)
+        params = session_params(session)
+        row = {'session_id': session.session_id, 'start_line': session.start_line,
+               'model': params['model'], 'target': params['target'],
+               'perf_frames': max((len(v) for v in stages.values()), default=0)}
+        for stage in PERF_STAGES:
+            row[f'{stage}_ms'] = percentile(stages[stage], 50) if stages[stage] else None
+            samples[stage].extend(stages[stage])
+        for name in PERF_SPANS:
+            row[f'{name}_ms'] = spans.get(name)
+        rows.append(row)
+
+    # Stage columns summarize frames, not per-session medians
+    frame_rows = [{f'{stage}_ms': value} for stage in PERF_STAGES for value in samples[stage]]
+    summary = summarize_stages(frame_rows, [f'{stage}_ms' for stage in PERF_STAGES])
+    summary.update(summarize_stages(rows, [f'{name}_ms' for name in PERF_SPANS]))
+    histograms = {stage: histogram(samples[stage]) for stage in PERF_STAGES}
+    return {'sessions': rows, 'summary': summary, 'histograms': histograms}
+
+def print_perf_report(report: dict):
+    """Print per-stage frame time percentiles and histograms, then build spans."""
+    print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*70}{Colors.RESET}")
+    print(f"{Colors.CYAN}{Colors.BOLD}RIFE STAGE TIMING (ms per frame){Colors.RESET}")
+    print(f"{Colors.CYAN}{'='*70}{Colors.RESET}")
+    if not any(report['histograms'].values()) and not any(
+            row[f'{name}_ms'] is not None for row in report['sessions'] for name in PERF_SPANS):
+        print(f"  {Colors.YELLOW}No PY_PERF lines (enable perf_probes in rife_main.lua){Colors.RESET}")
+        return
+    labels = [f"<={edge:g}" if edge != float('inf') else f">{HISTOGRAM_EDGES_MS[-2]:g}"
+              for edge in HISTOGRAM_EDGES_MS]
+    for stage, counts in report['histograms'].items():
+        stats = report['summary'][f'{stage}_ms']
+        if not stats['count']:
+            continue
+        print(f"  {Colors.BOLD}{stage}{Colors.RESET}: n={stats['count']} p50={stats['p50']:.2f} "
+              f"p95={stats['p95']:.2f} max={stats['max']:.2f}")
+        peak = max(counts)
+        for label, count in zip(labels, counts):
+            if count:
+                print(f"    {label:>6} {'#' * max(1, round(40 * count / peak)):<40} {count}")
+    print(f"  {'ID':<4} {'Model':<6} {'Target':<10} {'frames':>7}"
+          + ''.join(f" {name[:11]:>11}" for name in PERF_SPANS))
+    for row in report['sessions']:
+        print(f"  {row['session_id']:<4} {row['model'] or '-':<6} {row['target'] or '-':<10} "
+              f"{row['perf_frames']:>7}" + ''.join(f" {_num(row[f'{name}_ms'], 11)}" for name in PERF_SPANS))
+
+# ---------------------------------------------------------------------------
+# Memory analysis
+# ---------------------------------------------------------------------------
+
+# [PY_MEM] lines logged by rife_processor (cache_budget plan, then periodic samples)
+MEM_BUDGET = re.compile(r'threads=\d+->(\d+) cache=\d+MB->(\d+)MB frame=([0-9.]+)MB')
+MEM_SAMPLE = re.compile(r'frames=(\d+) cache=(\d+)MB/(\d+)MB rss=(\d+)MB peak=(\d+)MB')
+MEMORY_COLUMNS = ('frame_mb', 'cache_limit_mb', 'cache_mb', 'rss_mb', 'peak_mb')
+
+def session_memory(session: RIFESession) -> dict:
+    """Cache budget and memory figures of a session: the planned threads and
+    cache limit, the largest cache use, the last resident size and the peak."""
+    row = {'threads': None, 'cache_limit_mb': None, 'frame_mb': None,
+           'samples': 0, 'cache_mb': None, 'rss_mb': None, 'peak_mb': None}
+    for _, _, category, message in session.events:
+        if category != 'PY_MEM':
+            continue
+        match = MEM_SAMPLE.search(message)
+        if match:
+            cache, limit, rss, peak = (int(v) for v in match.groups()[1:])
+            row['samples'] += 1
+            row['cache_mb'] = max(row['cache_mb'] or 0, cache)
+            row['cache_limit_mb'] = limit
+            row['rss_mb'] = rss
+            row['peak_mb'] = max(row['peak_mb'] or 0, peak)
+            continue
+        match = MEM_BUDGET.search(message)
+        if match:
+            row['threads'], row['cache_limit_mb'] = int(match.group(1)), int(match.group(2))
+            row['frame_mb'] = float(match.group(3))
+    return row
+
+def memory_report(sessions: List[RIFESession]) -> dict:
+    """Per-session cache budget and memory use, with p50/p95/max over sessions."""
+    rows = []
+    for session in sessions:
+        params = session_params(session)
+        rows.append({'session_id': session.session_id, 'start_line': session.start_line,
+                     'model': params['model'], 'target': params['target'], **session_memory(session)})
+    return {'sessions': rows, 'summary': summarize_stages(rows, list(MEMORY_COLUMNS))}
+
+def print_memory_report(report: dict):
+    """Print the cache budget and memory use of each session."""
+    print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*70}{Colors.RESET}")
+    print(f"{Colors.CYAN}{Colors.BOLD}RIFE FRAME CACHE AND MEMORY (MB){Colors.RESET}")
+    print(f"{Colors.CYAN}{'='*70}{Colors.RESET}")
+    if not any(row['threads'] is not None or row['samples'] for row in report['sessions']):
+        print(f"  {Colors.YELLOW}No PY_MEM lines (cache_budget off in rife_main.lua?){Colors.RESET}")
+        return
+    print(f"  {'ID':<4} {'Model':<6} {'Target':<10} {'thr':>4} {'frame':>7} {'limit':>7} "
+          f"{'cache':>7} {'rss':>7} {'peak':>7}")
+    for row in report['sessions']:
+        full = row['cache_mb'] is not None and row['cache_limit_mb'] and row['cache_mb'] >= row['cache_limit_mb']
+        color = Colors.YELLOW if full else ''
+        print(f"  {color}{row['session_id']:<4} {row['model'] or '-':<6} {row['target'] or '-':<10} "
+              f"{row['threads'] if row['threads'] is not None else '-':>4} {_num(row['frame_mb'])} "
+              f"{_num(row['cache_limit_mb'], 7, 0)} {_num(row['cache_mb'], 7, 0)} "
+              f"{_num(row['rss_mb'], 7, 0)} {_num(row['peak_mb'], 7, 0)}{Colors.RESET if color else ''}")
+    peak = report['summary']['peak_mb']
+    if peak['count']:
+        print(f"  Peak memory over sessions: p50={peak['p50']:.0f} max={peak['max']:.0f}")
+
+# ---------------------------------------------------------------------------
+# Multi-log aggregation
+# ---------------------------------------------------------------------------
+
+LOG_SUFFIXES = ('.log',) + tuple(f'.log{suffix}' for suffix in COMPRESSED)  # Collected from directories
+TOP_MESSAGES = 10      # Most common Lua errors / tracebacks in the summary
+LINE_PREFIX = re.compile(r'^\[\s*[0-9.]+\]\[[a-z]\]\[[^\]]*\]\s*')  # [  1.234][e][module]
+
+def expand_logs(spec: str) -> List[Path]:
+    """Log files named by a directory (every *.log below it, also compressed
+    ones like *.log.gz), a glob or a file."""
+    path = Path(spec)
+    if path.is_dir():
+        return sorted(p for p in path.rglob('*') if p.name.endswith(LOG_SUFFIXES) and p.is_file())
+    if path.is_file():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(spec, recursive=True) if Path(p).is_file())
+
+def message_key(line: str) -> str:
+    """A log line without its timestamp/level/module prefix, for grouping."""
+    return LINE_PREFIX.sub('', line.strip())
+
+def traceback_key(lines: Sequence[Tuple[int, str]]) -> str:
+    """The exception line of a traceback (its last line naming an error)."""
+    texts = [text for _, text in lines]
+    return message_key(next((t for t in reversed(texts) if 'Error' in t or 'Exception' in t), texts[-1]))
+
+def event_record(log: str, kind: str, item) -> Optional[dict]:
+    """NDJSON record of one iter_log() event, None for kinds not exported.
+
+    RIFE lines are exported once, as 'rife_event' (category split out), and
+    sessions once they are closed, as 'session'; the raw rife_adaptive lines
+    and the session openings would only repeat them.
+    """
+    if kind == 'rife_by_category':
+        category, (line, timestamp, message) = item
+        return {'log': log, 'kind': 'rife_event', 'line': line, 'time': timestamp,
+                'category': category, 'message': message}
+    if kind == 'session_end':
+        return {'log': log, 'kind': 'session', 'line': item.start_line, 'session_id': item.session_id,
+                'end_line': item.end_line, 'start_time': item.start_time, 'end_time': item.end_time,
+                'duration': round(item.duration, 3), 'events': len(item.events)}
+    if kind == 'python_traceback':
+        return {'log': log, 'kind': kind, 'line': item[0][0], 'lines': [text for _, text in item]}
+    if kind == 'script_loading':
+        line, text, script = item
+        return {'log': log, 'kind': kind, 'line': line, 'text': text, 'script': script}
+    if kind in ('rife_sessions', 'rife_adaptive'):
+        return None
+    line, text = item
+    return {'log': log, 'kind': kind, 'line': line, 'text': text}
+
+def _closed_sessions(log_path: Path) -> Iterator[Tuple[str, object]]:
+    """iter_log() plus a 'session_end' for each session that a new activation
+    replaced without a deactivation (left with end_line 0, as in parse_log())."""
+    open_session = None
+    for kind, item in iter_log(log_path):
+        if kind == 'rife_sessions':
+            if open_session is not None:
+                yield 'session_end', open_session
+            open_session = item
+        elif kind == 'session_end':
+            open_session = None
+        yield kind, item
+
+def aggregate_log(log_path: Path, ndjson_path: Optional[Path] = None) -> dict:
+    """Event counts, session durations and Lua error / traceback messages of
+    one log; with ndjson_path its event records are written there as well."""
+    log = str(log_path)
+    counts = Counter()
+    durations = []
+    lua_errors = Counter()
+    tracebacks = Counter()
+    summary = {'log': log}
+    out = open(ndjson_path, 'w', encoding='utf-8') if ndjson_path else None
+    try:
+        for kind, item in _closed_sessions(log_path):
+            counts[kind] += 1
+            if kind == 'session_end' and item.end_line:
+                durations.append(round(item.duration, 3))
+            elif kind == 'lua_errors':
+                lua_errors[message_key(item[1])] += 1
+            elif kind == 'python_traceback':
+                tracebacks[traceback_key(item)] += 1
+            if out:
+                record = event_record(log, kind, item)
+                if record:
+                    out.write(json.dumps(record) + '\n')
+    except OSError as e:
+        summary['error'] = f'Failed to read log: {e}'
+    finally:
+        if out:
+            out.close()
+    summary.update(counts=dict(counts), durations=durations,
+                   lua_errors=dict(lua_errors), tracebacks=dict(tracebacks))
+    return summary
+
+def fleet_summary(summaries: List[dict], top: int = TOP_MESSAGES) -> dict:
+    """Merge aggregate_log() summaries: totals, per-log counts, session
+    duration statistics and the most common Lua errors and tracebacks."""
+    totals = Counter()
+    lua_errors = Counter()
+    tracebacks = Counter()
+    durations = []
+    logs = []
+    for summary in sorted(summaries, key=lambda s: s['log']):
+        counts = summary['counts']
+        totals.update(counts)
+        lua_errors.update(summary['lua_errors'])
+        tracebacks.update(summary['tracebacks'])
+        durations += summary['durations']
+        logs.append({'log': summary['log'], 'error': summary.get('error'),
+                     'sessions': counts.get('session_end', 0), 'errors': counts.get('errors', 0),
+                     'lua_errors': counts.get('lua_errors', 0),
+                     'tracebacks': counts.get('python_traceback', 0)})
+    duration = summarize_stages([{'duration': d} for d in durations], ['duration'])['duration']
+    duration['total'] = round(sum(durations), 3)
+    return {
+        'logs': logs,
+        'sessions': totals['session_end'],
+        'errors': totals['errors'],
+        'lua_errors': totals['lua_errors'],
+        'tracebacks': totals['python_traceback'],
+        'session_duration': duration,
+        'top_lua_errors': lua_errors.most_common(top),
+        'top_tracebacks': tracebacks.most_common(top),
+    }
+
+def aggregate_logs(log_paths: List[Path], jobs: int = 1, out=None) -> dict:
+    """Parse many logs, `jobs` at a time on a process pool, into fleet_summary().
+
+    With out (a text stream) every log's event records are streamed to it as
+    NDJSON as soon as that log is parsed, so the records of one log stay
+    together (logs in completion order), followed by a 'summary' record.
+    """
+    with tempfile.TemporaryDirectory(prefix='mpv_log_reader-') as tmp:
+        spools = [Path(tmp) / f'{k}.ndjson' if out is not None else None for k in range(len(log_paths))]
+        if jobs > 1 and len(log_paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(log_paths))) as pool:
+                futures = {pool.submit(aggregate_log, path, spool): spool
+                           for path, spool in zip(log_paths, spools)}
+                done = ((future.result(), futures[future]) for future in as_completed(futures))
+                summaries = _drain(done, out)
+        else:
+            done = ((aggregate_log(path, spool), spool) for path, spool in zip(log_paths, spools))
+            summaries = _drain(done, out)
+    summary = fleet_summary(summaries)
+    if out is not None:
+        out.write(json.dumps({'kind': 'summary', **summary}) + '\n')
+        out.flush()
+    return summary
+
+def _drain(done, out) -> List[dict]:
+    """Collect (summary, spool) results, copying each spool file to out."""
+    summaries = []
+    for summary, spool in done:
+        summaries.append(summary)
+        if out is not None and spool.exists():
+            with open(spool, 'r', encoding='utf-8') as f:
+                shutil.copyfileobj(f, out)
+            out.flush()
+            spool.unlink()
+    return summaries
+
+def print_fleet_summary(summary: dict, file=None):
+    """Print totals over all logs, the logs with problems and the top messages."""
+    file = file or sys.stdout
+    duration = summary['session_duration']
+
+    def stat(value):
+        return f"{value:.1f}s" if value is not None else '-'
+
+    print(f"\n{Colors.CYAN}{Colors.BOLD}{'='*70}{Colors.RESET}", file=file)
+    print(f"{Colors.CYAN}{Colors.BOLD}FLEET SUMMARY ({len(summary['logs'])} logs){Colors.RESET}", file=file)
+    print(f"{Colors.CYAN}{'='*70}{Colors.RESET}", file=file)
+    print(f"  RIFE sessions:          {summary['sessions']} (total {stat(duration['total'])}, "
+          f"p50 {stat(duration['p50'])}, p95 {stat(duration['p95'])}, max {stat(duration['max'])})", file=file)
+    print(f"  Errors found:           {summary['errors']}", file=file)
+    print(f"  Lua script errors:      {summary['lua_errors']}", file=file)
+    print(f"  Python tracebacks:      {summary['tracebacks']}", file=file)
+
+    flagged = [row for row in summary['logs'] if row['error'] or row['errors'] or row['tracebacks']]
+    if flagged:
+        print(f"  {'-'*70}", file=file)
+        print(f"  {'Sessions':>8} {'Errors':>7} {'Lua':>5} {'Tb':>4}  Log", file=file)
+        for row in sorted(flagged, key=lambda r: (r['error'] is None, -r['errors'], r['log'])):
+            if row['error']:
+                print(f"  {Colors.RED}{row['error']}{Colors.RESET}", file=file)
+                continue
+            print(f"  {row['sessions']:>8} {row['errors']:>7} {row['lua_errors']:>5} "
+                  f"{row['tracebacks']:>4}  {row['log']}", file=file)
+    for title, key in (('TOP LUA ERRORS', 'top_lua_errors'), ('TOP PYTHON TRACEBACKS', 'top_tracebacks')):
+        if summary[key]:
+            print(f"\n{Colors.RED}{Colors.BOLD}{title}{Colors.RESET}", file=file)
+            for message, count in summary[key]:
+                print(f"  {count:>6}x {message}", file=file)
 
 def print_section(title: str, items: list, color: str = Colors.CYAN):
     """Print a section with colored header."""
@@ -294,15 +2158,46 @@ def print_category_grouped(results: dict):
 
 def summarize(results: dict):
     """Print summary of findings."""
+    # Totals survive bucket caps; fall back to list lengths for plain dicts
+    totals = results.get('totals', {})
+
+    def count(key):
+        return totals.get(key, len(results.get(key, [])))
+
     print(f"\n{Colors.GREEN}{Colors.BOLD}SUMMARY{Colors.RESET}")
     print(f"{'─'*40}")
-    print(f"  RIFE sessions:          {len(results.get('rife_sessions', []))}")
+    print(f"  RIFE sessions:          {count('rife_sessions')}")
     print(f"  Total RIFE events:      {sum(len(s.events) for s in results.get('rife_sessions', []))}")
-    print(f"  Errors found:           {len(results.get('errors', []))}")
-    print(f"  Lua script errors:      {len(results.get('lua_errors', []))}")
-    print(f"  Scripts loaded:         {len(results.get('script_loading', []))}")
-    print(f"  VapourSynth msgs:       {len(results.get('vapoursynth', []))}")
-    print(f"  Python tracebacks:      {len(results.get('python_traceback', []))}")
+    print(f"  Errors found:           {count('errors')}")
+    print(f"  Lua script errors:      {count('lua_errors')}")
+    print(f"  Scripts loaded:         {count('script_loading')}")
+    print(f"  VapourSynth msgs:       {count('vapoursynth')}")
+    print(f"  Frame drop/delay lines: {count('frame_timing')}")
+    print(f"  Python tracebacks:      {count('python_traceback')}")
+
+def fleet(args):
+    """--fleet: aggregate every log matched by args.fleet."""
+    log_paths = expand_logs(args.fleet)
+    if not log_paths:
+        print(f"{Colors.RED}Error: No logs match {args.fleet}{Colors.RESET}", file=sys.stderr)
+        sys.exit(1)
+    jobs = args.jobs if args.jobs > 1 else (os.cpu_count() or 1)
+    # With NDJSON on stdout, keep the human-readable part on stderr
+    console = sys.stderr if args.ndjson == '-' else sys.stdout
+    print(f"{Colors.CYAN}Aggregating {len(log_paths)} logs on {min(jobs, len(log_paths))} processes"
+          f"{Colors.RESET}", file=console)
+    if args.ndjson == '-':
+        summary = aggregate_logs(log_paths, jobs, sys.stdout)
+    elif args.ndjson:
+        with open(args.ndjson, 'w', encoding='utf-8') as out:
+            summary = aggregate_logs(log_paths, jobs, out)
+    else:
+        summary = aggregate_logs(log_paths, jobs)
+    print_fleet_summary(summary, console)
+    if args.export:
+        with open(args.export, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"{Colors.GREEN}Summary written to {args.export}{Colors.RESET}", file=console)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -316,6 +2211,13 @@ Examples:
   %(prog)s --category CROP,PATH     # Show only CROP and PATH events
   %(prog)s --lua-only               # Show only Lua events
   %(prog)s --python-only            # Show only Python events
+  %(prog)s --limit 1000             # Bounded memory: keep last 1000 per bucket
+  %(prog)s --jobs 8 huge.log        # Parse a huge log on 8 cores (bypasses the index)
+  %(prog)s --follow                 # Tail a live log, resuming from the last checkpoint
+  %(prog)s --latency --export l.csv # Activation latency per stage, exported as CSV
+  %(prog)s --frames                 # Achieved fps and frame drops per RIFE session
+  %(prog)s --fleet logs/ --ndjson - # Every *.log below logs/ as NDJSON, summary on stderr
+  %(prog)s --fleet 'logs/*/mpv-debug.log' --ndjson events.ndjson
         """
     )
 
@@ -326,9 +2228,40 @@ Examples:
     parser.add_argument('--lua-only', action='store_true', help='Show only Lua events')
     parser.add_argument('--python-only', action='store_true', help='Show only Python events')
     parser.add_argument('--all-sessions', action='store_true', help='Show all sessions (not just latest)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='Parse the log in N chunks on N processes')
+    parser.add_argument('--follow', '-f', action='store_true',
+                        help='Tail a live log and print new events as they arrive')
+    parser.add_argument('--interval', type=float, default=1.0, help='Follow mode poll interval in seconds')
+    parser.add_argument('--checkpoint', help='Follow mode checkpoint file (default: under portable_config/_cache)')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Follow mode: do not save or resume a checkpoint')
+    parser.add_argument('--replay', action='store_true',
+                        help='Follow mode without checkpoint: print the existing log too instead of skipping it')
+    parser.add_argument('--no-index', action='store_true',
+                        help='Do not use or build the sidecar index under portable_config/_cache')
+    parser.add_argument('--latency', action='store_true',
+                        help='Report per-session activation latency by stage (p50/p95/max)')
+    parser.add_argument('--frames', action='store_true',
+                        help='Report achieved vs target fps and frame drops per session')
+    parser.add_argument('--perf', action='store_true',
+                        help='Report per-frame stage timing histograms from PY_PERF lines (perf_probes)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Report frame cache budget and peak memory per session from PY_MEM lines')
+    parser.add_argument('--export', metavar='PATH',
+                        help='Write the --latency/--frames/--perf/--memory report to PATH (.json or .csv), or the --fleet summary (JSON)')
+    parser.add_argument('--fleet', metavar='DIR_OR_GLOB',
+                        help='Aggregate many logs (a directory or glob) on all cores, or --jobs N')
+    parser.add_argument('--ndjson', metavar='PATH',
+                        help="Fleet mode: stream per-event records as NDJSON to PATH ('-' for stdout)")
+    parser.add_argument('--limit', type=int, metavar='N',
+                        help='Keep only the last N entries per bucket and events per session (bounded memory on huge logs)')
 
     args = parser.parse_args()
 
+    if args.fleet:
+        fleet(args)
+        return
+
     # Get log path
     if args.log_path:
         log_path = Path(args.log_path)
@@ -340,8 +2273,20 @@ Examples:
         print("Usage: python mpv_log_reader.py [path/to/mpv-debug.log]")
         sys.exit(1)
 
+    if args.follow:
+        if is_compressed(log_path):
+            print(f"{Colors.RED}Error: Cannot follow a compressed log{Colors.RESET}")
+            sys.exit(1)
+        print(f"{Colors.CYAN}Following: {log_path}{Colors.RESET}")
+        follow(log_path, args)
+        return
+
     print(f"{Colors.CYAN}Parsing: {log_path}{Colors.RESET}")
-    results = parse_log(log_path)
+    caps = {name: args.limit for name in BUCKETS + ('session_events',)} if args.limit else None
+    if args.no_index or args.jobs > 1:
+        results = parse_log(log_path, caps, jobs=args.jobs)
+    else:
+        results = parse_log_indexed(log_path, caps)
 
     if 'error' in results:
         print(f"{Colors.RED}{results['error']}{Colors.RESET}")
@@ -395,6 +2340,24 @@ Examples:
         else:
             print_category_grouped(results)
 
+    # Latency / frame rate / stage timing / memory reports if requested
+    reports = []
+    if args.latency:
+        reports.append(latency_report(results['rife_sessions']))
+        print_latency_report(reports[-1])
+    if args.frames:
+        reports.append(frame_report(results['rife_sessions'], results['frame_timing']))
+        print_frame_report(reports[-1])
+    if args.perf:
+        reports.append(perf_report(results['rife_sessions']))
+        print_perf_report(reports[-1])
+    if args.memory:
+        reports.append(memory_report(results['rife_sessions']))
+        print_memory_report(reports[-1])
+    if args.export and reports:
+        export_report(merge_reports(reports), args.export)
+        print(f"{Colors.GREEN}Report written to {args.export}{Colors.RESET}")
+
     # Print VapourSynth messages
     print_section("VAPOURSYNTH MESSAGES", results['vapoursynth'][:30], Colors.YELLOW)
 
@@ -0,0 +1,77 @@
+"""
+prefetch.py - Lookahead ring of frame requests ahead of the player
+
+mpv pulls frames from process() one at a time, so an inference hiccup turns
+straight into a late frame. With prefetch on, every delivered frame n sends
+requests for the next frames (VideoNode.get_frame_async) without waiting
+for them, so they are rendered into VapourSynth's frame cache while n is
+shown. PrefetchRing tracks that bounded window of requests keyed by frame
+number, keeps at most `workers` of them in flight and counts how often a
+delivered frame had been requested ahead (hit) or not (miss). Kept free of
+VapourSynth so the policy can be tested on its own.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+MAX_DEPTH = 32  # Frames the window may hold ahead of the player
+
+class PrefetchRing:
+    """Window of fire-and-forget frame requests from n + 1 to n + depth.
+
+    request(n) starts fetching frame n and returns its Future; nothing ever
+    waits on it, so no VapourSynth thread is held while frames render.
+    advance(n) is called as frame n is delivered: it drops requests up to n
+    and tops the window up behind it, so a seek simply restarts it. Safe to
+    call from several VapourSynth threads.
+    """
+
+    def __init__(self, request: Callable[[int], Future], depth: int, workers: int,
+                 length: Optional[int] = None):
+        self.request = request
+        self.depth = max(0, min(int(depth), MAX_DEPTH))
+        self.workers = max(1, int(workers))
+        self.length = length
+        self.ring: Dict[int, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> int:
+        """Frames in the window that are already rendered."""
+        return sum(1 for future in list(self.ring.values()) if future.done())
+
+    @property
+    def in_flight(self) -> int:
+        return sum(1 for future in list(self.ring.values()) if not future.done())
+
+    def advance(self, n: int) -> bool:
+        """Frame n was delivered: count it (True if it had been requested
+        ahead) and request up to depth frames after it."""
+        with self._lock:
+            hit = n in self.ring
+            for key in [key for key in self.ring if key <= n or key > n + self.depth]:
+                del self.ring[key]
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._fill(n)
+        return hit
+
+    def _fill(self, n: int):
+        """Request frames n+1.. up to the window end while workers are free."""
+        in_flight = self.in_flight
+        for ahead in range(n + 1, n + self.depth + 1):
+            if in_flight >= self.workers or (self.length is not None and ahead >= self.length):
+                break
+            if ahead not in self.ring:
+                self.ring[ahead] = self.request(ahead)
+                in_flight += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the PY_PREFETCH log line."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'ready': self.ready, 'in_flight': self.in_flight}
@@ -0,0 +1,82 @@
+"""
+proc_stats.py - Memory figures and percentiles shared by the tools
+
+The filter (cache budget), the preset benchmark and the log reader all need
+the system and process memory figures and a percentile; they live here so
+none of them imports another's module for them. The memory readers work
+without psutil (ctypes on Windows, /proc or resource elsewhere).
+"""
+
+import sys
+import ctypes
+from typing import List, Optional, Sequence, Tuple
+
+MB = 1 << 20
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+# ---------------------------------------------------------------------------
+# System and process memory
+# ---------------------------------------------------------------------------
+
+class _MemoryStatusEx(ctypes.Structure):
+    _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+def _proc_fields(path: str, names: Sequence[str]) -> dict:
+    """'Name: <n> kB' fields of a /proc file, in bytes."""
+    values = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in names:
+                    values[name] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+def available_memory() -> Optional[int]:
+    """Physical memory available to new allocations (bytes), None if unknown."""
+    if sys.platform == 'win32':
+        status = _MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(status)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+        return None
+    return _proc_fields('/proc/meminfo', ('MemAvailable',)).get('MemAvailable')
+
+def process_memory() -> Tuple[Optional[int], Optional[int]]:
+    """(resident, peak resident) memory of this process in bytes (None if unknown)."""
+    if sys.platform == 'win32':
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = ctypes.c_void_p  # Pseudo handle, pointer sized
+        process = ctypes.c_void_p(kernel32.GetCurrentProcess())
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize, counters.PeakWorkingSetSize
+        return None, None
+    fields = _proc_fields('/proc/self/status', ('VmRSS', 'VmHWM'))
+    if fields:
+        return fields.get('VmRSS'), fields.get('VmHWM')
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None, peak if sys.platform == 'darwin' else peak * 1024  # kB except on macOS
@@ -0,0 +1,47 @@
+"""
+resize_plan.py - Kernels and chroma layout of the conversions around RIFE
+
+process() converts the source to RGB at the target size before RIFE and
+back to YUV after it. plan_resize() picks the kernel of each side and the
+output chroma layout from the source/target sizes, the kernel opt and
+whether VSR follows in mpv. Kept free of VapourSynth so the plan can be
+tested on its own.
+"""
+
+from typing import Dict, Union
+
+# Resize kernel tiers (resize plugin function names), cheapest first
+KERNELS = {
+    "bilinear": "Bilinear",
+    "bicubic": "Bicubic",
+    "spline36": "Spline36",
+}
+KERNEL_COST = tuple(KERNELS)
+
+def plan_resize(src_w: int, src_h: int, dest_w: int, dest_h: int, kernel: str = "spline36",
+                vsr: bool = True, output_chroma: str = "auto") -> Dict[str, Union[bool, int, str]]:
+    """Plan the two conversions around RIFE (source -> RGB, RGB -> YUV output).
+
+    Only the input side scales, and without a size change it only resamples
+    chroma, so the kernel is capped at Bicubic there. The output stays 4:2:0
+    when VSR follows (d3d11vpp needs NV12/P010); otherwise output_chroma
+    "auto" keeps 4:4:4, which skips the chroma downsample altogether (RGB ->
+    4:4:4 resamples nothing, so the cheapest kernel is used for it). 4:2:0
+    needs even dimensions, so an odd target is trimmed to the even size
+    below it; width and height are the size to convert to.
+    """
+    kernel = kernel if kernel in KERNELS else "spline36"
+    chroma = "420" if vsr else ("420" if output_chroma == "420" else "444")
+    if chroma == "420":
+        dest_w, dest_h = dest_w & ~1, dest_h & ~1
+    scale = (src_w, src_h) != (dest_w, dest_h)
+    in_kernel = kernel if scale else min(kernel, "bicubic", key=KERNEL_COST.index)
+    out_kernel = kernel if chroma == "420" else "bilinear"
+    return {
+        "scale": scale,
+        "width": dest_w,
+        "height": dest_h,
+        "in_kernel": KERNELS[in_kernel],
+        "out_kernel": KERNELS[out_kernel],
+        "out_format": "YUV420P10" if chroma == "420" else "YUV444P10",
+    }
@@ -44,6 +44,8 @@ end
 --   - max_pixels_vsr_on: megapixels when VSR active
 --   - max_pixels_vsr_off: megapixels for standard path
 --   - min_vsr_mult: minimum display/target ratio for VSR
+--   - budgets: optional calibrated {max_pixels_vsr_on, max_pixels_vsr_off}
+--     (see profile_budgets) used instead of the two opts above
 -- Returns: target_w, target_h, is_vsr_path, scale_factor
 function M.calculate_targets(crop_w, crop_h, screen_w, screen_h, opts)
     -- 1. Determine Geometric Constraints
@@ -55,14 +57,15 @@ function M.calculate_targets(crop_w, crop_h, screen_w, screen_h, opts)
 
     -- 2. Determine VSR Eligibility & Budget
     -- We assume VSR is beneficial if the screen is significantly larger than source
+    local budgets = opts.budgets or opts
     local use_vsr_path = false
-    local budget_mb = opts.max_pixels_vsr_off
+    local budget_mb = budgets.max_pixels_vsr_off
 
     if opts.enable_vsr then
         -- If we have room to upscale (physically), check if we should enable VSR logic
         if scale_screen >= opts.min_vsr_mult then
             use_vsr_path = true
-            budget_mb = opts.max_pixels_vsr_on
+            budget_mb = budgets.max_pixels_vsr_on
         end
     end
 
@@ -125,4 +128,146 @@ function M.calculate_targets(crop_w, crop_h, screen_w, screen_h, opts)
     return target_w, target_h, use_vsr_path, actual_scale
 end
 
+-- Same order rife_processor.select_backend tries for "auto"
+M.BACKEND_PREFERENCE = {"trt", "ncnn", "ov_cpu", "ort_cpu"}
+
+-- Profile key backend for an opts.backend: itself, or for "auto" the first
+-- calibrated backend in select_backend's order (calibrate.py stores the
+-- backend that actually ran). Profiles written under "auto" are still read.
+function M.profile_backend(profile, backend, gpu_id)
+    if backend ~= "auto" then
+        return backend
+    end
+    local devices = profile and profile.devices or {}
+    for _, name in ipairs(M.BACKEND_PREFERENCE) do
+        if devices[name .. ":" .. gpu_id] then
+            return name
+        end
+    end
+    return backend
+end
+
+-- Calibrated pixel budgets for a backend/GPU/model from a calibrate.py profile
+-- (decoded rife_profiles.json). The profile was measured for 2x its own fps;
+-- budgets scale by profile fps / content fps since RIFE cost is per pixel.
+-- Returns: {max_pixels_vsr_on, max_pixels_vsr_off} or nil when not calibrated
+-- (a budget missing from the profile falls back to fallback_opts)
+function M.profile_budgets(profile, backend, gpu_id, model, fps, fallback_opts)
+    backend = M.profile_backend(profile, backend, gpu_id)
+    local device = profile and profile.devices and profile.devices[backend .. ":" .. gpu_id]
+    local entry = device and device.models and device.models[tostring(model)]
+    if not entry or not (entry.max_pixels_vsr_on or entry.max_pixels_vsr_off) then
+        return nil
+    end
+    local factor = 1.0
+    if entry.fps and fps and fps > 0 then
+        factor = entry.fps / fps
+    end
+    local function scaled(value, fallback)
+        if value then
+            return math.floor(value * factor * 100 + 0.5) / 100
+        end
+        return fallback
+    end
+    return {
+        max_pixels_vsr_on = scaled(entry.max_pixels_vsr_on, fallback_opts.max_pixels_vsr_on),
+        max_pixels_vsr_off = scaled(entry.max_pixels_vsr_off, fallback_opts.max_pixels_vsr_off),
+    }
+end
+
+-- Common letterbox aspect ratios tried when predicting crops
+M.PREWARM_ASPECTS = {1.85, 2.0, 2.39}
+
+-- Predict the target shapes calculate_targets is likely to produce for a source
+-- before crop detection has run: the full frame first, then the usual letterbox
+-- crops of the source width. Returns a de-duplicated list of {w, h} in that order.
+function M.predict_targets(source_w, source_h, screen_w, screen_h, opts)
+    local crops = {{source_w, source_h}}
+    for _, ar in ipairs(M.PREWARM_ASPECTS) do
+        local crop_h = math.floor(source_w / ar / 2 + 0.5) * 2
+        if crop_h < source_h then
+            crops[#crops + 1] = {source_w, crop_h}
+        end
+    end
+
+    local shapes, seen = {}, {}
+    for _, crop in ipairs(crops) do
+        local w, h = M.calculate_targets(crop[1], crop[2], screen_w, screen_h, opts)
+        local id = w .. "x" .. h
+        if not seen[id] then
+            seen[id] = true
+            shapes[#shapes + 1] = {w, h}
+        end
+    end
+    return shapes
+end
+
+-- Shapes of the quality tiers process() builds for a target: the target
+-- itself, then each scale in tiers ("0.75,0.5"; only values in (0, 1) count)
+-- aligned down to 32, without duplicates. Mirrors tier_governor.tier_shapes.
+function M.tier_shapes(target_w, target_h, tiers)
+    local scales = {}
+    for part in string.gmatch(tiers or "", "[^,]+") do
+        local scale = tonumber(part)
+        if scale and scale > 0 and scale < 1 then
+            scales[#scales + 1] = scale
+        end
+    end
+    table.sort(scales, function(a, b) return a > b end)
+
+    local shapes, seen = {{target_w, target_h}}, {[target_w .. "x" .. target_h] = true}
+    for _, scale in ipairs(scales) do
+        local w = math.max(32, M.align_to_multiple(math.floor(target_w * scale), 32))
+        local h = math.max(32, M.align_to_multiple(math.floor(target_h * scale), 32))
+        if not seen[w .. "x" .. h] then
+            seen[w .. "x" .. h] = true
+            shapes[#shapes + 1] = {w, h}
+        end
+    end
+    return shapes
+end
+
+-- Shape of the one engine tiled mode uses for every target: tile_size
+-- ("512" or "640x384", aligned down to 32) with tile_batch tiles stacked
+-- vertically. nil when tiling is off. Mirrors tiling.parse_tile_size and
+-- tiling.engine_shape.
+function M.tile_engine_shape(tile_size, tile_batch)
+    local w, h = string.match(string.lower(tile_size or ""), "^(%d+)x(%d+)$")
+    if not w then
+        w = string.match(tile_size or "", "^(%d+)$")
+        h = w
+    end
+    w, h = tonumber(w), tonumber(h)
+    if not w or w <= 0 or h <= 0 then
+        return nil
+    end
+    w = math.max(32, M.align_to_multiple(w, 32))
+    h = math.max(32, M.align_to_multiple(h, 32))
+    return {w, h * math.max(1, tile_batch or 1)}
+end
+
+-- Format one frame timing sample for the [FRAMES] log line.
+-- Counters are mpv's cumulative properties; nil (not available yet) logs as 0.
+function M.format_frame_stats(vf_fps, drops, decoder_drops, delayed)
+    return string.format("vf_fps=%.3f drops=%d decoder_drops=%d delayed=%d",
+        vf_fps or 0, drops or 0, decoder_drops or 0, delayed or 0)
+end
+
+-- Lowest VapourSynth message level worth sending to mpv: "debug" when the log
+-- file or msg-level (for all modules or the vapoursynth filter) records it,
+-- otherwise "warning", so rife_processor skips formatting debug messages.
+function M.vs_log_level(log_file, msg_level)
+    if log_file and log_file ~= "" then
+        return "debug"
+    end
+    for entry in string.gmatch(msg_level or "", "[^,]+") do
+        local module, level = entry:match("^%s*([%w/_-]+)=(%w+)%s*$")
+        if (module == "all" or module == "vf" or module == "vapoursynth")
+                and (level == "debug" or level == "trace") then
+            return "debug"
+        end
+    end
+    return "warning"
+end
+
 return M
@@ -11,6 +11,7 @@
 ]]
 
 local mp = require 'mp'
+local utils = require 'mp.utils'
 
 -- Add script directory to package path for local modules
 local script_path = debug.getinfo(1, "S").source:sub(2)  -- Remove @ prefix
@@ -24,13 +25,31 @@ local core = require('rife_core')
 -----------
 
 local opts = {
-    max_pixels_vsr_on = 2.0,   -- GPU power when VSR will upscale (RTX 2060S)
-    max_pixels_vsr_off = 3.0,  -- GPU power for standard upscale (RTX 2060S)
+    max_pixels_vsr_on = 2.0,   -- GPU power when VSR will upscale (RTX 2060S; calibrate.py profile wins)
+    max_pixels_vsr_off = 3.0,  -- GPU power for standard upscale (RTX 2060S; calibrate.py profile wins)
     model = 4221,              -- RIFE model number
+    backend = "auto",          -- Inference backend: auto, trt, ncnn, ov_cpu, ort_cpu (CPU threads are automatic)
     gpu_id = 0,                -- GPU device
     gpu_threads = 2,           -- GPU threads
     enable_vsr = true,         -- Nvidia VSR upscale to screen height
     min_vsr_mult = 1.5,        -- Minimum display/target ratio for VSR activation
+    resize_kernel = "spline36", -- spline36, bicubic or bilinear (cheaper tiers for low-end GPUs)
+    output_chroma = "auto",    -- auto (4:4:4 unless VSR needs 4:2:0), 420 or 444
+    frame_stats_interval = 5,  -- Seconds between [FRAMES] samples while active (0 = off)
+    engine_prewarm = true,     -- Build TensorRT engines for likely target shapes in the background
+    python = "python",         -- Interpreter (with VapourSynth) used for engine prewarming
+    perf_probes = false,       -- Log per-frame stage timings ([PY_PERF], see mpv_log_reader.py --perf)
+    dup_threshold = 0.002,     -- Frame pairs differing less than this are blended, not inferred (0 = off)
+    sc_threshold = 0.12,       -- Frame pairs differing more than this (scene cut) repeat a frame (0 = off)
+    quality_tiers = "",        -- Extra lower resolution tiers as target scales, e.g. "0.75,0.5" (empty = off)
+    tier_budget_ms = 0,        -- Frame latency above which a lower tier is used (0 = frame time x gpu_threads)
+    infer_server = "",         -- host:port of a shared infer_server.py daemon (empty = in-process RIFE)
+    tile_size = "",            -- Run RIFE on fixed tiles, "512" or "640x384": one engine for every target (empty = off)
+    tile_overlap = 64,         -- Pixels neighbouring tiles share (cross-faded when reassembling)
+    tile_batch = 1,            -- Tiles stacked into one inference frame (engine height = tile height x this)
+    cache_budget = true,       -- Size VapourSynth's frame cache and threads from frame sizes and free memory ([PY_MEM])
+    prefetch_depth = 0,        -- Output frames kept requested ahead of playback to absorb inference spikes (0 = off, max 32)
+    prefetch_workers = 2,      -- Prefetch requests in flight at once ([PY_PREFETCH] logs hits/misses)
 }
 
 -- Log configuration on load
@@ -38,9 +57,26 @@ mp.msg.debug("[rife_adaptive][INIT] Configuration loaded: enable_vsr=" .. tostri
              ", max_pixels_vsr_on=" .. opts.max_pixels_vsr_on ..
              ", max_pixels_vsr_off=" .. opts.max_pixels_vsr_off ..
              ", model=" .. opts.model ..
+             ", backend=" .. opts.backend ..
              ", gpu_id=" .. opts.gpu_id ..
              ", gpu_threads=" .. opts.gpu_threads ..
-             ", min_vsr_mult=" .. opts.min_vsr_mult)
+             ", min_vsr_mult=" .. opts.min_vsr_mult ..
+             ", resize_kernel=" .. opts.resize_kernel ..
+             ", output_chroma=" .. opts.output_chroma ..
+             ", frame_stats_interval=" .. opts.frame_stats_interval ..
+             ", engine_prewarm=" .. tostring(opts.engine_prewarm) ..
+             ", perf_probes=" .. tostring(opts.perf_probes) ..
+             ", dup_threshold=" .. opts.dup_threshold ..
+             ", sc_threshold=" .. opts.sc_threshold ..
+             ", quality_tiers=" .. opts.quality_tiers ..
+             ", tier_budget_ms=" .. opts.tier_budget_ms ..
+             ", infer_server=" .. opts.infer_server ..
+             ", tile_size=" .. opts.tile_size ..
+             ", tile_overlap=" .. opts.tile_overlap ..
+             ", tile_batch=" .. opts.tile_batch ..
+             ", cache_budget=" .. tostring(opts.cache_budget) ..
+             ", prefetch_depth=" .. opts.prefetch_depth ..
+             ", prefetch_workers=" .. opts.prefetch_workers)
 
 -----------
 -- State
@@ -50,6 +86,7 @@ local state = {
     rife_active = false,
     current_crop = nil,
     cropdetect_timer = nil,
+    frame_stats_timer = nil,
     is_fullscreen = false,
     target_w = nil,
     target_h = nil,
@@ -138,6 +175,98 @@ local function update_vsr_state()
     end
 end
 
+-----------
+-- Frame Statistics
+-----------
+
+local function log_frame_stats()
+    mp.msg.debug("[rife_adaptive][FRAMES] " .. core.format_frame_stats(
+        mp.get_property_number("estimated-vf-fps"),
+        mp.get_property_number("frame-drop-count"),
+        mp.get_property_number("decoder-frame-drop-count"),
+        mp.get_property_number("vo-delayed-frame-count")))
+end
+
+local function start_frame_stats()
+    if opts.frame_stats_interval <= 0 or state.frame_stats_timer then
+        return
+    end
+    log_frame_stats()
+    state.frame_stats_timer = mp.add_periodic_timer(opts.frame_stats_interval, log_frame_stats)
+end
+
+local function stop_frame_stats()
+    if state.frame_stats_timer then
+        -- Final sample so the session's counters cover its whole duration
+        log_frame_stats()
+        state.frame_stats_timer:kill()
+        state.frame_stats_timer = nil
+    end
+end
+
+-----------
+-- Calibrated Budgets
+-----------
+
+-- Calibrated budgets (calibrate.py) for this backend/GPU/model at the content fps
+local function load_budgets(fps)
+    local path = mp.command_native({"expand-path", "~~/_cache/rife_profiles.json"})
+    local f = io.open(path, "r")
+    if not f then
+        return nil
+    end
+    local profile = utils.parse_json(f:read("*a"))
+    f:close()
+    local budgets = core.profile_budgets(profile, opts.backend, opts.gpu_id, opts.model, fps, opts)
+    if budgets then
+        mp.msg.debug(string.format("[rife_adaptive][INIT] Calibrated budgets: vsr_on=%.2f vsr_off=%.2f (%s)",
+            budgets.max_pixels_vsr_on, budgets.max_pixels_vsr_off, path))
+    end
+    return budgets
+end
+
+-----------
+-- Engine Prewarm
+-----------
+
+-- Build engines for the shapes this source will likely need while crop
+-- detection runs; engine_cache.py skips shapes already cached or being built.
+local function prewarm_engines()
+    -- Only TensorRT builds engines ("auto" picks it whenever it is installed)
+    if not opts.engine_prewarm or (opts.backend ~= "auto" and opts.backend ~= "trt") then
+        return
+    end
+    local source_w, source_h = get_source_dims()
+    local screen_w, screen_h = get_screen_dims()
+    local shapes = core.predict_targets(source_w, source_h, screen_w, screen_h, opts)
+
+    local script = mp.command_native({"expand-path", "~~/vs/rife_adapting_2/engine_cache.py"})
+    local args = {opts.python, script, "prewarm", "--model", tostring(opts.model), "--device", tostring(opts.gpu_id)}
+    local names = {}
+    local tile_shape = core.tile_engine_shape(opts.tile_size, opts.tile_batch)
+    if tile_shape then
+        -- Tiled mode: the same engine serves every target and tier
+        names[1] = tile_shape[1] .. "x" .. tile_shape[2]
+        args[#args + 1] = names[1]
+    else
+        for _, target in ipairs(shapes) do
+            for _, shape in ipairs(core.tier_shapes(target[1], target[2], opts.quality_tiers)) do
+                names[#names + 1] = shape[1] .. "x" .. shape[2]
+                args[#args + 1] = names[#names]
+            end
+        end
+    end
+    mp.msg.debug("[rife_adaptive][ENGINE] Prewarming: " .. table.concat(names, ", "))
+
+    mp.command_native_async({name = "subprocess", args = args, playback_only = false}, function(success, result)
+        if not success or result.status ~= 0 then
+            mp.msg.debug("[rife_adaptive][ENGINE] Prewarm failed: " .. tostring(result and (result.error_string or result.status)))
+        else
+            mp.msg.debug("[rife_adaptive][ENGINE] Prewarm finished")
+        end
+    end)
+end
+
 -----------
 -- Crop Detection
 -----------
@@ -216,6 +345,9 @@ generate_and_apply_vpy = function()
                  ", Crop: " .. crop_w .. "x" .. crop_h ..
                  " at (" .. crop_x .. "," .. crop_y .. ")")
 
+    -- Source color matrix, used by rife_processor for frames without a usable _Matrix
+    local colormatrix = mp.get_property("video-params/colormatrix") or ""
+
     -- UNIFIED LOGIC: Calculate targets and determine path in one place
     local screen_w, screen_h = get_screen_dims()
     local target_w, target_h, vsr_active, scale = core.calculate_targets(crop_w, crop_h, screen_w, screen_h, opts)
@@ -225,8 +357,11 @@ generate_and_apply_vpy = function()
     state.target_h = target_h
     state.vsr_path_active = vsr_active
 
-    mp.msg.debug(string.format("[rife_adaptive][VPY] Resolution: %dx%d -> %dx%d (Scale %.2f) | VSR Path: %s",
-        crop_w, crop_h, target_w, target_h, scale, tostring(vsr_active)))
+    mp.msg.debug(string.format("[rife_adaptive][VPY] Resolution: %dx%d -> %dx%d (Scale %.2f) | VSR Path: %s | Matrix: %s",
+        crop_w, crop_h, target_w, target_h, scale, tostring(vsr_active), colormatrix))
+
+    -- Debug messages from the filter are only built when mpv records them
+    local log_level = core.vs_log_level(mp.get_property("log-file"), mp.get_property("msg-level"))
 
     -- Generate inline VPY content
     -- Get absolute path to rife_adapting_2 directory
@@ -253,11 +388,33 @@ clip = process(
     target_h=%d,
     model=%d,
     gpu_id=%d,
-    gpu_t=%d
+    gpu_t=%d,
+    matrix="%s",
+    backend="%s",
+    kernel="%s",
+    vsr=%s,
+    output_chroma="%s",
+    log_level="%s",
+    perf=%s,
+    dup_threshold=%.6f,
+    sc_threshold=%.6f,
+    tiers="%s",
+    tier_budget_ms=%.3f,
+    infer_server="%s",
+    tile_size="%s",
+    tile_overlap=%d,
+    tile_batch=%d,
+    cache_budget=%s,
+    prefetch_depth=%d,
+    prefetch_workers=%d
 )
 
 clip.set_output()
-]], script_dir, crop_x, crop_y, crop_w, crop_h, target_w, target_h, opts.model, opts.gpu_id, opts.gpu_threads)
+]], script_dir, crop_x, crop_y, crop_w, crop_h, target_w, target_h, opts.model, opts.gpu_id, opts.gpu_threads,
+    colormatrix, opts.backend, opts.resize_kernel, vsr_active and "True" or "False", opts.output_chroma,
+    log_level, opts.perf_probes and "True" or "False", opts.dup_threshold, opts.sc_threshold,
+    opts.quality_tiers, opts.tier_budget_ms, opts.infer_server, opts.tile_size, opts.tile_overlap, opts.tile_batch,
+    opts.cache_budget and "True" or "False", opts.prefetch_depth, opts.prefetch_workers)
 
     -- Write VPY file (unique per PID to support multiple mpv instances)
     local vpy_path = get_temp_dir() .. "/rife_adapting_2_" .. state.pid .. ".vpy"
@@ -318,6 +475,7 @@ local function toggle_rife()
             mp.msg.debug("[rife_adaptive][TOGGLE] Killed pending crop detection timer")
         end
 
+        stop_frame_stats()
         mp.commandv("vf", "remove", "@rife-vsr")
         mp.commandv("vf", "remove", "vapoursynth")
         state.rife_active = false
@@ -338,6 +496,9 @@ local function toggle_rife()
 
         mp.msg.debug("[rife_adaptive][TOGGLE] FPS check: " .. fps .. " <= 50 = PASSED")
         state.rife_active = true
+        opts.budgets = load_budgets(fps)
+        start_frame_stats()
+        prewarm_engines()
         start_crop_detection()
     end
 end
@@ -3,25 +3,469 @@ rife_processor.py - Optimized RIFE pipeline
 """
 
 import os
+import time
+import threading
 import fractions
+import dataclasses
 import vapoursynth as vs
 from k7sfunc._external import vsmlrt
 
+import rife_trace
+from engine_cache import EngineCache, EngineKey
+from tier_governor import TierGovernor, parse_tiers, tier_shapes
+from backend_select import BACKEND_PLUGINS, available_backends, cpu_streams, find_model, pick_backend
+from resize_plan import plan_resize
+from tiling import (DEFAULT_OVERLAP, batch_groups, clamp_overlap, engine_shape, padded_size, parse_tile_size,
+                    tile_layout, tile_seams)
+from infer_server import InferenceClient, copy_buffer_to_frame, copy_frame_to_buffer
+from cache_budget import LOOKAHEAD_FRAMES, frame_bytes, plan_cache
+from proc_stats import MB, available_memory, process_memory
+from prefetch import PrefetchRing
+
 core = vs.core
 
-def get_matrix_name(prop_val):
-    """Map VS/mpv matrix integers to resize string names."""
-    mapping = {
-        1: "709",       # BT.709 (HD)
-        2: "709",       # Unspecified - default to 709
-        4: "fcc",       # FCC
-        5: "470bg",     # BT.470BG (PAL)
-        6: "170m",      # SMPTE 170M (NTSC)
-        7: "240m",      # SMPTE 240M
-        9: "2020ncl",   # BT.2020 NCL (HDR)
-        10: "2020cl",   # BT.2020 CL
-    }
-    return mapping.get(prop_val, "709")
+# Older vsmlrt builds have no engine_folder; engines then stay next to the model
+TRT_FIELDS = {f.name for f in dataclasses.fields(vsmlrt.Backend.TRT)}
+ENGINE_CACHE = EngineCache()
+ENGINE_LOCK_TIMEOUT = 300  # Seconds to wait for a prewarm building the same engine
+
+# Resize matrix names by VS/mpv matrix integer (2 = unspecified is left out on purpose)
+MATRIX_NAMES = {
+    1: "709",       # BT.709 (HD)
+    4: "fcc",       # FCC
+    5: "470bg",     # BT.470BG (PAL)
+    6: "170m",      # SMPTE 170M (NTSC)
+    7: "240m",      # SMPTE 240M
+    9: "2020ncl",   # BT.2020 NCL (HDR)
+    10: "2020cl",   # BT.2020 CL
+}
+
+# mpv video-params/colormatrix names (passed in by rife_main.lua) -> matrix integers
+MPV_MATRICES = {
+    "bt.601": 6,
+    "bt.709": 1,
+    "smpte-240m": 7,
+    "bt.2020-ncl": 9,
+    "bt.2020-cl": 10,
+}
+
+# Frame property carrying the source matrix through the RGB part of the graph
+MATRIX_PROP = "RifeMatrix"
+
+def get_matrix_name(prop_val, default=1):
+    """Map VS/mpv matrix integers to resize string names (unknown/unspecified -> default)."""
+    return MATRIX_NAMES.get(prop_val, MATRIX_NAMES[default])
+
+def resolve_matrix(prop_val, default=1):
+    """Matrix integer to convert with: prop_val if supported, else default."""
+    return prop_val if prop_val in MATRIX_NAMES else default
+
+def convert_per_frame_matrix(clip, prop, convert, default):
+    """Return convert(clip, matrix) with the matrix picked per frame from frame property `prop`.
+
+    Nodes are built lazily, one per matrix actually seen, so building the graph
+    renders nothing and a matrix change mid-stream takes effect on the next frame.
+    """
+    nodes = {default: convert(clip, default)}
+    last = [None]
+
+    def _select(n, f):
+        matrix = resolve_matrix(f.props.get(prop), default)
+        if matrix != last[0]:
+            last[0] = matrix
+            rife_trace.debug("PY_MATRIX", "Frame %d: %s=%s -> '%s'",
+                             n, prop, f.props.get(prop), get_matrix_name(matrix))
+        if matrix not in nodes:
+            nodes[matrix] = convert(clip, matrix)
+        return nodes[matrix]
+
+    return core.std.FrameEval(nodes[default], _select, prop_src=clip)
+
+FRAME_LOG_INTERVAL = 1000  # Output frames between PY_FRAME throughput markers
+
+def log_frame_progress(clip: vs.VideoNode, every: int = FRAME_LOG_INTERVAL) -> vs.VideoNode:
+    """Log PY_FRAME markers as output frames are requested: once for the first
+    frame (activation latency) and every `every` frames (filter throughput).
+    Only added to the graph when debug messages are logged."""
+    delivered = 0
+
+    def _mark(n, f):
+        nonlocal delivered
+        delivered += 1
+        if delivered == 1:
+            rife_trace.debug("PY_FRAME", "First frame delivered: n=%d", n)
+        elif delivered % every == 0:
+            rife_trace.debug("PY_FRAME", "Frames delivered: count=%d", delivered)
+        return f
+
+    return core.std.ModifyFrame(clip, clip, _mark)
+
+MEM_LOG_INTERVAL = 480  # Output frames between PY_MEM cache/memory samples
+
+def clip_frame_bytes(clip: vs.VideoNode) -> int:
+    """Size of one frame of clip."""
+    fmt = clip.format
+    return frame_bytes(clip.width, clip.height, fmt.bytes_per_sample, fmt.num_planes,
+                       fmt.subsampling_w, fmt.subsampling_h)
+
+def apply_cache_budget(stages, lookahead: int = LOOKAHEAD_FRAMES) -> None:
+    """Size the frame cache (and thread count) for the frames of stages, within
+    the available memory (cache_budget.plan_cache)."""
+    available = available_memory()
+    stage_bytes = [clip_frame_bytes(stage) for stage in stages]
+    threads, cache_mb = plan_cache(stage_bytes, core.num_threads, available, lookahead)
+    rife_trace.debug("PY_MEM", "Cache budget: threads=%d->%d cache=%dMB->%dMB frame=%.1fMB available=%s",
+                     core.num_threads, threads, core.max_cache_size, cache_mb, sum(stage_bytes) / MB,
+                     f"{available // MB}MB" if available else "unknown")
+    core.num_threads = threads
+    core.max_cache_size = cache_mb
+
+def log_memory(clip: vs.VideoNode, every: int = MEM_LOG_INTERVAL) -> vs.VideoNode:
+    """Log PY_MEM frame cache usage and process memory every `every` output
+    frames (only added to the graph when debug messages are logged)."""
+    delivered = 0
+
+    def _sample(n, f):
+        nonlocal delivered
+        delivered += 1
+        if delivered % every == 0:
+            info = core.core_info
+            rss, peak = process_memory()
+            rife_trace.debug("PY_MEM", "Memory: frames=%d cache=%dMB/%dMB rss=%dMB peak=%dMB",
+                             delivered, info.used_framebuffer_size // MB, info.max_framebuffer_size // MB,
+                             (rss or 0) // MB, (peak or 0) // MB)
+        return f
+
+    return core.std.ModifyFrame(clip, clip, _sample)
+
+PREFETCH_LOG_INTERVAL = 480  # Output frames between PY_PREFETCH counters
+
+def prefetch_stage(clip: vs.VideoNode, depth: int, workers: int,
+                   every: int = PREFETCH_LOG_INTERVAL) -> vs.VideoNode:
+    """clip (the RIFE output) with the next `depth` frames requested ahead of
+    the player as each frame is delivered, `workers` requests at a time.
+    The requests only warm the frame cache; nothing waits on them.
+    Window hit/miss counters are logged as PY_PREFETCH."""
+    ring = PrefetchRing(clip.get_frame_async, depth, workers, clip.num_frames)
+    delivered = 0
+
+    def _advance(n, f):
+        nonlocal delivered
+        ring.advance(n)
+        delivered += 1
+        if delivered % every == 0 and rife_trace.enabled():
+            stats = ring.stats()
+            rife_trace.debug("PY_PREFETCH", "Prefetch: frames=%d hits=%d misses=%d ready=%d in_flight=%d depth=%d",
+                             delivered, stats['hits'], stats['misses'], stats['ready'], stats['in_flight'],
+                             ring.depth)
+        return f
+
+    return core.std.ModifyFrame(clip, clip, _advance)
+
+SKIP_PROXY_WIDTH = 256  # Width of the luma proxy the pair metric is measured on
+
+def pair_metric(clip: vs.VideoNode, width: int = SKIP_PROXY_WIDTH) -> vs.VideoNode:
+    """Luma proxy of clip whose PlaneStatsDiff is the mean difference (0-1)
+    between each frame and the next one (0 on the last frame)."""
+    height = max(2, round(clip.height * width / clip.width / 2) * 2)
+    proxy = core.resize.Bilinear(clip, width=width, height=height, format=vs.GRAY8)
+    return core.std.PlaneStats(proxy, proxy[1:] + proxy[-1], plane=0)
+
+def route_pairs(clip_rgb: vs.VideoNode, clip_rife: vs.VideoNode, metric: vs.VideoNode,
+                dup_threshold: float, sc_threshold: float,
+                every: int = FRAME_LOG_INTERVAL) -> vs.VideoNode:
+    """Serve interpolated frames without inference where RIFE cannot help.
+
+    clip_rife is the 2x output of clip_rgb (source frame n at 2n, the frame
+    between n and n+1 at 2n+1). A pair whose metric difference is at most
+    dup_threshold (static shot, pulldown duplicate) gets a 50/50 blend of
+    the two frames; one above sc_threshold (hard cut) repeats frame n.
+    Source frames are passed through directly. RIFE frames are only
+    requested for the remaining pairs. A threshold of 0 disables its route.
+    Counts are logged as PY_SKIP every `every` pairs.
+    """
+    repeat = core.std.Interleave([clip_rgb, clip_rgb])
+    blend = core.std.Interleave([clip_rgb, core.std.Merge(clip_rgb, clip_rgb[1:] + clip_rgb[-1])])
+    metric = core.std.Interleave([metric, metric])
+    counts = {"pairs": 0, "duplicate": 0, "scene_cut": 0}
+
+    def _route(n, f):
+        if n % 2 == 0:
+            return repeat
+        diff = f.props["PlaneStatsDiff"]
+        if dup_threshold > 0 and diff <= dup_threshold:
+            route, node = "duplicate", blend
+        elif 0 < sc_threshold < diff:
+            route, node = "scene_cut", repeat
+        else:
+            route, node = None, clip_rife
+        counts["pairs"] += 1
+        if route:
+            counts[route] += 1
+        if counts["pairs"] % every == 0:
+            skipped = counts["duplicate"] + counts["scene_cut"]
+            rife_trace.debug("PY_SKIP", "Inference skipped: pairs=%d skipped=%d duplicate=%d scene_cut=%d",
+                             counts["pairs"], skipped, counts["duplicate"], counts["scene_cut"])
+        return node
+
+    return core.std.FrameEval(clip_rife, _route, prop_src=metric)
+
+def govern_tiers(tiers, shapes, budget: float) -> vs.VideoNode:
+    """Pick one of several same-size RIFE outputs per frame by measured latency.
+
+    tiers are the RIFE stage built at the decreasing resolutions in shapes
+    and scaled back to a common size. The time from an interpolated frame's request to its
+    delivery feeds a TierGovernor; source frames are served by the current
+    tier without being measured. Changes are logged as PY_TIER.
+    """
+    governor = TierGovernor(len(tiers), budget)
+    requested = {}
+
+    def _select(n):
+        if n % 2:
+            requested[n] = time.perf_counter()
+        return tiers[governor.tier]
+
+    def _measure(n, f):
+        start = requested.pop(n, None)
+        if start is not None:
+            previous = governor.tier
+            if governor.observe(time.perf_counter() - start) is not None:
+                rife_trace.debug("PY_TIER", "Tier %d -> %d (%dx%d): latency=%.1fms budget=%.1fms",
+                                 previous, governor.tier, *shapes[governor.tier],
+                                 governor.latency * 1000, budget * 1000)
+        return f
+
+    clip = core.std.FrameEval(tiers[0], _select)
+    return core.std.ModifyFrame(clip, clip, _measure)
+
+def trt_backend(gpu_id: int, gpu_t: int, engine_folder: str = None):
+    """The TensorRT backend (also used to prewarm engines)."""
+    extra = {}
+    if engine_folder and "engine_folder" in TRT_FIELDS:
+        extra["engine_folder"] = engine_folder
+    return vsmlrt.BackendV2.TRT(
+        num_streams=gpu_t,
+        int8=False,
+        fp16=True,
+        output_format=1,
+        workspace=256,
+        use_cuda_graph=True,
+        use_cublas=True,
+        use_cudnn=True,
+        static_shape=True,
+        min_shapes=[0, 0],
+        opt_shapes=None,
+        max_shapes=None,
+        device_id=gpu_id,
+        short_path=True,
+        **extra
+    )
+
+def ort_cpu_backend(gpu_id: int, gpu_t: int, engine_folder: str = None):
+    streams, _ = cpu_streams()
+    return vsmlrt.BackendV2.ORT_CPU(num_streams=streams)
+
+def ov_cpu_backend(gpu_id: int, gpu_t: int, engine_folder: str = None):
+    streams, threads = cpu_streams()
+    return vsmlrt.BackendV2.OV_CPU(num_streams=streams, num_threads=threads)
+
+def ncnn_backend(gpu_id: int, gpu_t: int, engine_folder: str = None):
+    return vsmlrt.BackendV2.NCNN_VK(num_streams=gpu_t, fp16=True, device_id=gpu_id)
+
+# name: (backend factory, RGB format fed to the model); plugins in BACKEND_PLUGINS
+BACKENDS = {
+    "trt": (trt_backend, vs.RGBH),
+    "ncnn": (ncnn_backend, vs.RGBH),
+    "ov_cpu": (ov_cpu_backend, vs.RGBS),
+    "ort_cpu": (ort_cpu_backend, vs.RGBS),
+}
+
+def select_backend(requested: str = "auto") -> str:
+    """Resolve a backend name against the loaded plugins (see pick_backend)."""
+    backend = pick_backend(requested, available_backends(lambda plugin: hasattr(core, plugin)))
+    if backend is None:
+        raise vs.Error("No RIFE inference plugin found (need one of: trt, ncnn, ov, ort)")
+    if requested not in ("auto", backend):
+        rife_trace.warning("PY_RIFE", "Backend '%s' unavailable, using '%s'", requested, backend)
+    return backend
+
+def model_dirs():
+    """Candidate models directories: vsmlrt's own, then next to every loaded inference plugin."""
+    dirs = []
+    if getattr(vsmlrt, "models_path", None):
+        dirs.append(vsmlrt.models_path)
+    for plugin in BACKEND_PLUGINS.values():
+        if hasattr(core, plugin):
+            plg_dir = os.path.dirname(getattr(core, plugin).Version()["path"]).decode()
+            dirs.append(os.path.join(plg_dir, "models"))
+    return list(dict.fromkeys(os.path.normpath(d) for d in dirs))
+
+def resolve_model_path(model: int):
+    """Path of a RIFE model's .onnx (first hit in model_dirs()), and the paths tried."""
+    return find_model(model, model_dirs())
+
+def rife_interpolate(clip: vs.VideoNode, model: int, gpu_id: int, gpu_t: int,
+                     engine_folder: str = None, backend: str = "trt") -> vs.VideoNode:
+    """2x RIFE interpolation of an RGB clip (format per BACKENDS) on a resolved backend name."""
+    return vsmlrt.RIFE(
+        clip=clip,
+        multi=fractions.Fraction(2, 1),
+        scale=1,
+        model=model,
+        ensemble=False,
+        _implementation=2,
+        video_player=True,
+        backend=BACKENDS[backend][0](gpu_id, gpu_t, engine_folder)
+    )
+
+def rife_stage(clip: vs.VideoNode, model: int, gpu_id: int, gpu_t: int, backend: str) -> vs.VideoNode:
+    """rife_interpolate, with TensorRT engines kept in the shared engine cache."""
+    if backend != "trt":
+        return rife_interpolate(clip, model, gpu_id, gpu_t, backend=backend)
+    key = EngineKey(model, clip.width, clip.height, device=gpu_id)
+    with ENGINE_CACHE.engine(key, timeout=ENGINE_LOCK_TIMEOUT) as engine_folder:
+        rife_trace.debug("PY_RIFE", "Engine %s: %s in %s", key.name,
+                         'cached' if ENGINE_CACHE.cached(key) else 'building', engine_folder)
+        return rife_interpolate(clip, model, gpu_id, gpu_t, str(engine_folder))
+
+def remote_stage(clip: vs.VideoNode, client: InferenceClient, fallback) -> vs.VideoNode:
+    """2x interpolation of clip through the shared inference server, with
+    rife_interpolate's frame layout. Once the server is gone, fallback()
+    builds the in-process RIFE node on a background thread (a TensorRT
+    engine build can take minutes) while frames are repeated; the node
+    serves the rest of the stream as soon as it is ready."""
+    first = core.std.Interleave([clip, clip])
+    second = core.std.Interleave([clip, clip[1:] + clip[-1]])
+    local = []
+    builder = []
+    builder_lock = threading.Lock()
+
+    def _pair(n, f):
+        if n % 2 == 0 or not client.alive:
+            return f[0]
+        out = f[0].copy()
+        try:
+            client.interpolate(
+                lambda buf, offset0, offset1: (copy_frame_to_buffer(f[0], buf, offset0),
+                                               copy_frame_to_buffer(f[1], buf, offset1)),
+                lambda buf, offset: copy_buffer_to_frame(buf, offset, out))
+        except ConnectionError as e:
+            rife_trace.warning("PY_RIFE", "Inference server lost (%s), repeating frames until in-process RIFE is ready", e)
+            return f[0]
+        return out
+
+    remote = core.std.ModifyFrame(first, [first, second], _pair)
+
+    def _build():
+        try:
+            local.append(fallback())
+        except (vs.Error, OSError) as e:
+            rife_trace.warning("PY_RIFE", "In-process RIFE unavailable (%s), frames stay repeated", e)
+            return
+        rife_trace.debug("PY_RIFE", "In-process RIFE ready")
+
+    def _route(n):
+        if local:
+            return local[0]
+        if not client.alive:
+            with builder_lock:
+                if not builder:
+                    builder.append(threading.Thread(target=_build, daemon=True))
+                    builder[0].start()
+        return remote
+
+    return core.std.FrameEval(remote, _route)
+
+def inference_stage(clip: vs.VideoNode, model: int, gpu_id: int, gpu_t: int, backend: str,
+                    server: str = "") -> vs.VideoNode:
+    """rife_stage, or the shared inference server at `server` (host:port)
+    when given and reachable."""
+    if not server:
+        return rife_stage(clip, model, gpu_id, gpu_t, backend)
+    try:
+        client = InferenceClient(server, model, clip.width, clip.height, clip.format.name,
+                                 name=f"mpv-{os.getpid()}")
+    except OSError as e:
+        rife_trace.warning("PY_RIFE", "Inference server %s unavailable (%s), using in-process RIFE", server, e)
+        return rife_stage(clip, model, gpu_id, gpu_t, backend)
+    if hasattr(vs, "register_on_destroy"):
+        vs.register_on_destroy(client.close)  # Filter removed: drop the connection and shared memory
+    rife_trace.debug("PY_RIFE", "Inference server %s: %dx%d %s", server, clip.width, clip.height, clip.format.name)
+    return remote_stage(clip, client, lambda: rife_stage(clip, model, gpu_id, gpu_t, backend))
+
+def feather(clip: vs.VideoNode, width: int, height: int, horizontal: bool) -> vs.VideoNode:
+    """Static mask ramping from 0 to 1 along x (or y), in clip's sample type."""
+    gray = clip.format.replace(color_family=vs.GRAY, subsampling_w=0, subsampling_h=0)
+    ends = [core.std.BlankClip(format=gray, width=1, height=1, color=[value], length=clip.num_frames, keep=True)
+            for value in (0.0, 1.0)]
+    pair = core.std.StackHorizontal(ends) if horizontal else core.std.StackVertical(ends)
+    return core.resize.Bilinear(pair, width=width, height=height)
+
+def join_tiles(parts, origins, horizontal: bool) -> vs.VideoNode:
+    """Join same-size clips placed at increasing origins along x (or y),
+    cross-fading every overlap with a linear ramp (tiles that only touch
+    are stacked as they are)."""
+    size = parts[0].width if horizontal else parts[0].height
+
+    def span(clip, start, length):
+        if horizontal:
+            return core.std.CropAbs(clip, length, clip.height, start, 0)
+        return core.std.CropAbs(clip, clip.width, length, 0, start)
+
+    stack = core.std.StackHorizontal if horizontal else core.std.StackVertical
+    out = parts[0]
+    for part, origin, seam in zip(parts[1:], origins[1:], tile_seams(origins, size)):
+        if seam == 0:
+            out = stack([out, part])
+            continue
+        shared_a, shared_b = span(out, origin, seam), span(part, 0, seam)
+        mask = feather(part, shared_a.width, shared_a.height, horizontal)
+        out = stack([span(out, 0, origin), core.std.MaskedMerge(shared_a, shared_b, mask, first_plane=True),
+                     span(part, seam, size - seam)])
+    return out
+
+def tiled_stage(clip: vs.VideoNode, model: int, gpu_id: int, gpu_t: int, backend: str, tile, overlap: int,
+                batch: int = 1, server: str = "") -> vs.VideoNode:
+    """2x interpolation of clip with rife_interpolate's frame layout, run on
+    fixed-size tiles (see tiling) through a single inference node.
+
+    The tile pairs of all frames go through one clip (frame n tile k, frame
+    n+1 tile k, ...); only the interpolations inside each pair are requested
+    from it. The interpolated tiles are cross-faded back into frames, which
+    keep the props of the frame they follow.
+    """
+    width, height = clip.width, clip.height
+    pad_w, pad_h = padded_size(width, height, tile)
+    padded = clip
+    if (pad_w, pad_h) != (width, height):
+        # Resizers clamp reads outside the source: the padding repeats the edge pixels
+        padded = core.resize.Point(clip, width=pad_w, height=pad_h, src_width=pad_w, src_height=pad_h)
+    xs, ys = tile_layout(width, height, tile, overlap)
+    tiles = [core.std.CropAbs(padded, tile[0], tile[1], x, y) for y in ys for x in xs]
+    groups = batch_groups(len(tiles), batch)
+    packed = [core.std.StackVertical([tiles[k] for k in group]) if len(group) > 1 else tiles[group[0]]
+              for group in groups]
+
+    first = core.std.Interleave(packed)
+    second = core.std.Interleave([p[1:] + p[-1] for p in packed])
+    pairs = core.std.Interleave([first, second])
+    mids = core.std.SelectEvery(inference_stage(pairs, model, gpu_id, gpu_t, backend, server), cycle=4, offsets=1)
+
+    mid_tiles = [None] * len(tiles)
+    for g, group in enumerate(groups):
+        packed_mid = core.std.SelectEvery(mids, cycle=len(groups), offsets=g)
+        for slot, k in enumerate(group):
+            if mid_tiles[k] is None:
+                mid_tiles[k] = core.std.CropAbs(packed_mid, tile[0], tile[1], 0, slot * tile[1])
+
+    rows = [join_tiles(mid_tiles[r * len(xs):(r + 1) * len(xs)], xs, horizontal=True) for r in range(len(ys))]
+    mid = join_tiles(rows, ys, horizontal=False)
+    if (pad_w, pad_h) != (width, height):
+        mid = core.std.CropAbs(mid, width, height, 0, 0)
+    rife_trace.debug("PY_RIFE", "Tiled: %dx%d in %d tiles of %dx%d (overlap %d), engine %dx%d",
+                     width, height, len(tiles), tile[0], tile[1], overlap, *engine_shape(tile, batch))
+    return core.std.Interleave([clip, core.std.CopyFrameProps(mid, clip)])
 
 def process(
     clip: vs.VideoNode,
@@ -34,141 +478,212 @@ def process(
     model: int,
     gpu_id: int,
     gpu_t: int,
+    matrix: str = "",
+    backend: str = "auto",
+    kernel: str = "spline36",
+    vsr: bool = True,
+    output_chroma: str = "auto",
+    log_level: str = "debug",
+    perf: bool = False,
+    dup_threshold: float = 0.002,
+    sc_threshold: float = 0.12,
+    tiers: str = "",
+    tier_budget_ms: float = 0,
+    infer_server: str = "",
+    tile_size: str = "",
+    tile_overlap: int = DEFAULT_OVERLAP,
+    tile_batch: int = 1,
+    cache_budget: bool = True,
+    prefetch_depth: int = 0,
+    prefetch_workers: int = 2,
 ) -> vs.VideoNode:
 
+    # Debug messages are neither formatted nor sent unless mpv records them
+    rife_trace.configure(log_level)
+    probe = rife_trace.StageProbe() if perf else None
+
     # Log function entry
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_INIT] Starting RIFE processing: "
-        f"clip={clip.width}x{clip.height}, "
-        f"crop=({crop_l},{crop_t},{crop_w},{crop_h}), "
-        f"target={target_w}x{target_h}, model={model}, gpu={gpu_id}, threads={gpu_t}")
-
-    # 1. Apply Crop
-    # We do this first so we don't process pixels we are about to throw away
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_CROP] Input clip: {clip.width}x{clip.height}")
-
-    if crop_w > 0 and crop_h > 0:
-        if crop_w != clip.width or crop_h != clip.height:
-            right_crop = clip.width - crop_w - crop_l
-            bottom_crop = clip.height - crop_h - crop_t
-            core.log_message(vs.MESSAGE_TYPE_DEBUG,
-                f"[rife_adaptive][PY_CROP] Applying crop: left={crop_l}, top={crop_t}, "
-                f"right={right_crop}, bottom={bottom_crop}")
-            clip = core.std.CropRel(clip, left=crop_l, top=crop_t, right=right_crop, bottom=bottom_crop)
-            core.log_message(vs.MESSAGE_TYPE_DEBUG,
-                f"[rife_adaptive][PY_CROP] After crop: {clip.width}x{clip.height}")
+    rife_trace.debug("PY_INIT",
+        "Starting RIFE processing: clip=%dx%d, crop=(%d,%d,%d,%d), target=%dx%d, "
+        "model=%s, gpu=%s, threads=%s, matrix=%s, backend=%s, kernel=%s, vsr=%s, "
+        "output_chroma=%s, dup_threshold=%s, sc_threshold=%s, tiers=%s, infer_server=%s, tile_size=%s",
+        clip.width, clip.height, crop_l, crop_t, crop_w, crop_h, target_w, target_h,
+        model, gpu_id, gpu_t, matrix or 'n/a', backend, kernel, vsr, output_chroma,
+        dup_threshold, sc_threshold, tiers or 'off', infer_server or 'off', tile_size or 'off')
+
+    with rife_trace.span("graph_build"):
+        if probe:
+            clip = probe.stamp(clip, "source")
+
+        # 1. Apply Crop
+        # We do this first so we don't process pixels we are about to throw away
+        rife_trace.debug("PY_CROP", "Input clip: %dx%d", clip.width, clip.height)
+
+        if crop_w > 0 and crop_h > 0:
+            if crop_w != clip.width or crop_h != clip.height:
+                right_crop = clip.width - crop_w - crop_l
+                bottom_crop = clip.height - crop_h - crop_t
+                rife_trace.debug("PY_CROP", "Applying crop: left=%d, top=%d, right=%d, bottom=%d",
+                                 crop_l, crop_t, right_crop, bottom_crop)
+                clip = core.std.CropRel(clip, left=crop_l, top=crop_t, right=right_crop, bottom=bottom_crop)
+                rife_trace.debug("PY_CROP", "After crop: %dx%d", clip.width, clip.height)
+            else:
+                rife_trace.debug("PY_CROP", "No crop needed (crop dimensions match input)")
         else:
-            core.log_message(vs.MESSAGE_TYPE_DEBUG,
-                f"[rife_adaptive][PY_CROP] No crop needed (crop dimensions match input)")
-    else:
-        core.log_message(vs.MESSAGE_TYPE_DEBUG,
-            f"[rife_adaptive][PY_CROP] No crop specified (crop_w={crop_w}, crop_h={crop_h})")
-
-    # 2. Prepare for AI (Single Pass: Resize + Format Convert)
-    # RIFE requires RGB input (RGBH is best for TensorRT FP16)
-
-    # Detect Color Matrix (Keep 709 as safe default)
-    matrix_val = clip.get_frame(0).props.get("_Matrix", 1)
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_MATRIX] Frame _Matrix property: {matrix_val}")
-
-    matrix_str = get_matrix_name(matrix_val)
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_MATRIX] Mapped to resize matrix: '{matrix_str}'")
-
-    # Determine final dimensions
-    # If target_w is 0 (native res), use current width
-    dest_w = target_w if target_w > 0 else clip.width
-    dest_h = target_h if target_h > 0 else clip.height
-
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_RESIZE] Target dimensions: {dest_w}x{dest_h}")
-
-    # ONE RESIZE TO RULE THEM ALL:
-    # Changes Size AND Format (YUV -> RGBH) in one optimized step
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_RESIZE] Single-pass Spline36: "
-        f"{clip.width}x{clip.height} {clip.format.name} -> {dest_w}x{dest_h} RGBH (matrix={matrix_str})")
-
-    clip_rgb = core.resize.Spline36(
-        clip,
-        width=dest_w,
-        height=dest_h,
-        format=vs.RGBH,
-        matrix_in_s=matrix_str
-    )
+            rife_trace.debug("PY_CROP", "No crop specified (crop_w=%d, crop_h=%d)", crop_w, crop_h)
 
-    # 3. Model Path Logic
-    plg_dir = os.path.dirname(core.trt.Version()["path"]).decode()
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_MODEL] Plugin directory: {plg_dir}")
-
-    mdl_pname = "rife_v2/"
-    mdl_fname = {
-        4151: "rife_v4.15_lite",
-        4221: "rife_v4.22_lite",
-    }.get(model, "rife_v4.15")
-    mdl_pth = plg_dir + "/models/" + mdl_pname + mdl_fname + ".onnx"
-
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_MODEL] Model path: {mdl_pth}")
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_MODEL] Model exists: {os.path.exists(mdl_pth)}")
-
-    if not os.path.exists(mdl_pth):
-        core.log_message(vs.MESSAGE_TYPE_ERROR,
-            f"[rife_adaptive][PY_MODEL] Model NOT FOUND: {mdl_pth}")
-        raise vs.Error(f"RIFE model not found: {mdl_pth}")
-
-    # 4. RIFE Execution
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_RIFE] Executing with: "
-        f"model={model}, ensemble=False, gpu_threads={gpu_t}, "
-        f"backend=TRT(fp16=True, static_shape=True, device={gpu_id})")
-
-    clip_rife = vsmlrt.RIFE(
-        clip=clip_rgb,
-        multi=fractions.Fraction(2, 1),
-        scale=1,
-        model=model,
-        ensemble=False,
-        _implementation=2,
-        video_player=True,
-        backend=vsmlrt.BackendV2.TRT(
-            num_streams=gpu_t,
-            int8=False,
-            fp16=True,
-            output_format=1,
-            workspace=256,
-            use_cuda_graph=True,
-            use_cublas=True,
-            use_cudnn=True,
-            static_shape=True,
-            min_shapes=[0, 0],
-            opt_shapes=None,
-            max_shapes=None,
-            device_id=gpu_id,
-            short_path=True
-        )
-    )
+        if probe:
+            clip = probe.stamp(clip, "crop")
 
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_RIFE] RIFE execution configured successfully")
+        # 2. Prepare for AI (Single Pass: Resize + Format Convert)
+        # RIFE requires RGB input (RGBH is best for TensorRT FP16, CPU backends take RGBS)
+        backend = select_backend(backend)
+        rgb_format = BACKENDS[backend][1]
 
-    # 5. Output Conversion (RGBH -> YUV420P10)
-    # We must convert back to YUV for MPV/Display:
-    # Nvidia VSR requires YUV (NV12/P010) input and solves banding
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_OUTPUT] Converting RGBH -> YUV420P10 (matrix={matrix_str})")
+        # Color Matrix: chosen per frame from _Matrix inside the graph (no frame is
+        # rendered here); mpv's colormatrix covers frames without a usable _Matrix
+        default_matrix = MPV_MATRICES.get(matrix, 1)
+        matrix_str = get_matrix_name(default_matrix)
+        rife_trace.debug("PY_MATRIX", "Per-frame matrix from _Matrix, default '%s' (mpv colormatrix=%s)",
+                         matrix_str, matrix or 'n/a')
 
-    clip_out = core.resize.Spline36(
-        clip=clip_rife,
-        format=vs.YUV420P10,
-        matrix_s=matrix_str
-    )
+        # Determine final dimensions
+        # If target_w is 0 (native res), use current width
+        dest_w = target_w if target_w > 0 else clip.width
+        dest_h = target_h if target_h > 0 else clip.height
+
+        rife_trace.debug("PY_RESIZE", "Target dimensions: %dx%d", dest_w, dest_h)
+
+        plan = plan_resize(clip.width, clip.height, dest_w, dest_h, kernel, vsr, output_chroma)
+        if (plan['width'], plan['height']) != (dest_w, dest_h):
+            rife_trace.debug("PY_RESIZE", "Odd %dx%d trimmed to %dx%d for 4:2:0 output",
+                             dest_w, dest_h, plan['width'], plan['height'])
+            dest_w, dest_h = plan['width'], plan['height']
+        rife_trace.debug("PY_RESIZE", "Plan: in=%s (%s), out=%s -> %s (VSR %s)",
+                         plan['in_kernel'], 'scale' if plan['scale'] else 'format only',
+                         plan['out_kernel'], plan['out_format'], 'on' if vsr else 'off')
+
+        # ONE RESIZE TO RULE THEM ALL:
+        # Changes Size AND Format (YUV -> RGB) in one optimized step
+        rife_trace.debug("PY_RESIZE", "Single-pass %s: %dx%d %s -> %dx%d %s (matrix=per-frame, default %s)",
+                         plan['in_kernel'], clip.width, clip.height, clip.format.name,
+                         dest_w, dest_h, rgb_format.name, matrix_str)
+
+        resize_in = getattr(core.resize, plan['in_kernel'])
+        resize_out = getattr(core.resize, plan['out_kernel'])
+        out_format = getattr(vs, plan['out_format'])
+
+        def to_rgb(src, matrix_val):
+            rgb = resize_in(
+                src,
+                width=dest_w,
+                height=dest_h,
+                format=rgb_format,
+                matrix_in_s=get_matrix_name(matrix_val)
+            )
+            return core.std.SetFrameProp(rgb, prop=MATRIX_PROP, intval=matrix_val)
+
+        clip_rgb = convert_per_frame_matrix(clip, "_Matrix", to_rgb, default_matrix)
+        if probe:
+            clip_rgb = probe.stamp(clip_rgb, "resize_in")
+
+        # 3. Model Path Logic (independent of the backend plugin)
+        with rife_trace.span("model_resolve"):
+            mdl_pth, tried = resolve_model_path(model)
+        if rife_trace.enabled():
+            rife_trace.debug("PY_MODEL", "Models directories: %s", ', '.join(model_dirs()))
+        rife_trace.debug("PY_MODEL", "Model path: %s", mdl_pth or tried)
+        rife_trace.debug("PY_MODEL", "Model exists: %s", mdl_pth is not None)
+
+        if mdl_pth is None:
+            rife_trace.error("PY_MODEL", "Model NOT FOUND: %s", ', '.join(tried))
+            raise vs.Error(f"RIFE model not found: {', '.join(tried)}")
+
+        # 4. RIFE Execution (TensorRT engines are kept in the shared engine cache)
+        if backend == "trt":
+            backend_desc = f"TRT(fp16=True, static_shape=True, device={gpu_id})"
+        elif backend == "ncnn":
+            backend_desc = f"NCNN_VK(fp16=True, device={gpu_id})"
+        else:
+            streams, threads = cpu_streams()
+            backend_desc = f"{backend.upper()}(streams={streams}, threads={threads}, cores={os.cpu_count()})"
+        rife_trace.debug("PY_RIFE", "Executing with: model=%s, ensemble=False, gpu_threads=%s, backend=%s",
+                         model, gpu_t, backend_desc)
+
+        # Tiled mode: one fixed tile-shaped engine for every target (and tier)
+        tile = parse_tile_size(tile_size)
+        if tile:
+            overlap = clamp_overlap(tile_overlap, tile)
+
+            def rife(src):
+                return tiled_stage(src, model, gpu_id, gpu_t, backend, tile, overlap, tile_batch, infer_server)
+        else:
+            def rife(src):
+                return inference_stage(src, model, gpu_id, gpu_t, backend, infer_server)
+
+        with rife_trace.span("rife_setup"):
+            clip_rife = rife(clip_rgb)
+            stages = [clip, clip_rgb, clip_rife]
+
+            # Lower resolution tiers: RIFE on a downscale of clip_rgb, scaled back
+            # up, so a load spike costs sharpness instead of dropped frames
+            shapes = tier_shapes(dest_w, dest_h, parse_tiers(tiers))
+            if len(shapes) > 1:
+                tier_clips = [clip_rife]
+                for tier_w, tier_h in shapes[1:]:
+                    small = core.resize.Bilinear(clip_rgb, width=tier_w, height=tier_h)
+                    tier_rife = rife(small)
+                    tier_clips.append(resize_in(tier_rife, width=dest_w, height=dest_h))
+                    stages += [small, tier_rife]
+                fps = clip_rife.fps
+                frame_time = fps.denominator / fps.numerator if fps.numerator else 1 / 48
+                budget = tier_budget_ms / 1000 if tier_budget_ms > 0 else frame_time * gpu_t
+                clip_rife = govern_tiers(tier_clips, shapes, budget)
+                rife_trace.debug("PY_TIER", "Tiers: %s, latency budget %.1fms",
+                                 ', '.join(f"{w}x{h}" for w, h in shapes), budget * 1000)
+
+        rife_trace.debug("PY_RIFE", "RIFE execution configured successfully")
+
+        # Duplicate pairs and scene cuts are blended/repeated instead of inferred
+        if dup_threshold > 0 or sc_threshold > 0:
+            clip_rife = route_pairs(clip_rgb, clip_rife, pair_metric(clip), dup_threshold, sc_threshold)
+            rife_trace.debug("PY_SKIP", "Pair routing: duplicate <= %s -> blend, scene cut > %s -> repeat",
+                             dup_threshold, sc_threshold)
+        if probe:
+            clip_rife = probe.stamp(clip_rife, "rife")
+
+        # Keep the next frames requested so an inference spike is absorbed by the window
+        if prefetch_depth > 0:
+            clip_rife = prefetch_stage(clip_rife, prefetch_depth, prefetch_workers)
+            rife_trace.debug("PY_PREFETCH", "Prefetch window: depth=%d workers=%d",
+                             prefetch_depth, prefetch_workers)
+
+        # 5. Output Conversion (RGB -> YUV, 4:2:0 or 4:4:4 per plan)
+        # We must convert back to YUV for MPV/Display:
+        # Nvidia VSR requires YUV (NV12/P010) input and solves banding
+        rife_trace.debug("PY_OUTPUT", "Converting %s -> %s (matrix=per-frame, default %s)",
+                         clip_rife.format.name, plan['out_format'], matrix_str)
+
+        def to_yuv(src, matrix_val):
+            return resize_out(
+                clip=src,
+                format=out_format,
+                matrix_s=get_matrix_name(matrix_val)
+            )
+
+        clip_out = convert_per_frame_matrix(clip_rife, MATRIX_PROP, to_yuv, default_matrix)
+        if probe:
+            clip_out = probe.finish(clip_out, "resize_out")
+
+    rife_trace.debug("PY_OUTPUT", "Final output: %dx%d %s",
+                     clip_out.width, clip_out.height, clip_out.format.name)
 
-    core.log_message(vs.MESSAGE_TYPE_DEBUG,
-        f"[rife_adaptive][PY_OUTPUT] Final output: {clip_out.width}x{clip_out.height} {clip_out.format.name}")
+    if cache_budget:
+        apply_cache_budget(stages + [clip_out], LOOKAHEAD_FRAMES + max(0, prefetch_depth))
 
+    # Trace-only nodes: without debug logging no Python callback runs per frame
+    if rife_trace.enabled():
+        if cache_budget:
+            clip_out = log_memory(clip_out)
+        clip_out = log_frame_progress(clip_out)
     return clip_out
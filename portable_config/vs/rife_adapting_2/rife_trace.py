@@ -0,0 +1,114 @@
+"""
+rife_trace.py - Level-gated logging, build spans and per-frame stage timing
+
+Messages take %-style arguments and are only formatted when their level is
+enabled (see configure()), so debug logging costs nothing when mpv is not
+recording it. span() and StageProbe emit [rife_adaptive][PY_PERF] lines that
+mpv_log_reader.py --perf aggregates:
+
+    span=<name> ms=<float>                       one graph-build step
+    stage=<name> n=<count> ms=<v1>,<v2>,...      per-frame stage durations
+"""
+
+import time
+from contextlib import contextmanager
+
+import vapoursynth as vs
+
+core = vs.core
+
+LEVELS = {
+    "debug": vs.MESSAGE_TYPE_DEBUG,
+    "info": vs.MESSAGE_TYPE_INFORMATION,
+    "warning": vs.MESSAGE_TYPE_WARNING,
+    "error": vs.MESSAGE_TYPE_CRITICAL,
+}
+PERF_BATCH = 120         # Frames per PY_PERF stage line
+STAMP_PREFIX = "RifeT_"  # Frame property holding the time a frame left a stage
+
+_threshold = int(vs.MESSAGE_TYPE_DEBUG)
+
+def configure(level: str = "debug"):
+    """Set the lowest level that is logged ("off" logs errors only)."""
+    global _threshold
+    _threshold = int(LEVELS.get(level, vs.MESSAGE_TYPE_CRITICAL))
+
+def enabled(msg_type=vs.MESSAGE_TYPE_DEBUG) -> bool:
+    """Whether messages of msg_type are logged (use to guard costly arguments)."""
+    return int(msg_type) >= _threshold
+
+def log(msg_type, category: str, msg: str, *args):
+    if int(msg_type) < _threshold:
+        return
+    if args:
+        msg = msg % args
+    core.log_message(msg_type, f"[rife_adaptive][{category}] {msg}")
+
+def debug(category: str, msg: str, *args):
+    log(vs.MESSAGE_TYPE_DEBUG, category, msg, *args)
+
+def warning(category: str, msg: str, *args):
+    log(vs.MESSAGE_TYPE_WARNING, category, msg, *args)
+
+def error(category: str, msg: str, *args):
+    log(vs.MESSAGE_TYPE_CRITICAL, category, msg, *args)
+
+@contextmanager
+def span(name: str):
+    """Time a block of graph construction and log it as a PY_PERF span."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        debug("PY_PERF", "span=%s ms=%.1f", name, (time.perf_counter() - start) * 1000)
+
+class StageProbe:
+    """Per-frame timing of consecutive graph stages.
+
+    stamp(clip, stage) records, as a frame property, when each frame leaves
+    a stage; finish(clip) closes the last stage and logs how long every frame
+    spent in each stage (the time between its consecutive stamps). Frame
+    properties travel with the frame through resize and RIFE, so no
+    bookkeeping by frame number is needed.
+    """
+
+    def __init__(self, batch: int = PERF_BATCH):
+        self.batch = batch
+        self.stages = []
+
+    def stamp(self, clip: vs.VideoNode, stage: str) -> vs.VideoNode:
+        self.stages.append(stage)
+        prop = STAMP_PREFIX + stage
+
+        def _stamp(n, f):
+            fout = f.copy()
+            fout.props[prop] = time.perf_counter()
+            return fout
+
+        return core.std.ModifyFrame(clip, clip, _stamp)
+
+    def finish(self, clip: vs.VideoNode, stage: str) -> vs.VideoNode:
+        """Close the last stage (named stage) at clip and log the batches."""
+        names = self.stages[1:] + [stage]
+        props = [STAMP_PREFIX + s for s in self.stages]
+        samples = {name: [] for name in names}
+
+        def _finish(n, f):
+            stamps = [f.props.get(prop) for prop in props] + [time.perf_counter()]
+            for name, start, end in zip(names, stamps, stamps[1:]):
+                if start is not None and end is not None:
+                    samples[name].append(end - start)
+            fout = f.copy()
+            for prop in props:
+                if prop in fout.props:
+                    del fout.props[prop]
+            if len(samples[names[-1]]) >= self.batch:
+                for name in names:
+                    values = samples[name]
+                    samples[name] = []
+                    if values:
+                        debug("PY_PERF", "stage=%s n=%d ms=%s", name, len(values),
+                              ",".join(f"{v * 1000:.2f}" for v in values))
+            return fout
+
+        return core.std.ModifyFrame(clip, clip, _finish)
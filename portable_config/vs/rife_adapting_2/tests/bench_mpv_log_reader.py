@@ -0,0 +1,195 @@
+"""
+bench_mpv_log_reader.py - Throughput benchmark for mpv_log_reader.parse_log
+
+Usage:
+    python bench_mpv_log_reader.py [--lines 10000000] [--log path]
+
+Writes a synthetic mpv-debug.log (mostly plain debug lines with a sprinkling of
+errors, RIFE toggles, VapourSynth messages and tracebacks), then parses it with
+the legacy one-regex-per-pattern loop and with the prefiltered LogParser,
+checks that both produce identical results and reports lines/second.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from collections import defaultdict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mpv_log_reader import parse_log, append_traceback_line, RIFESession
+
+# (weight, template) - weights roughly follow a --msg-level=all=debug log
+TEMPLATES = [
+    (9000, "[{t:8.3f}][d][vd] Decoded frame with pts={n} dts={n}"),
+    (400, "[{t:8.3f}][t][cplayer] frame-drop check: vo_delay={n}"),
+    (5, "[{t:8.3f}][v][vo/gpu] frame delayed by {n}us"),
+    (2, "[{t:8.3f}][d][rife_main] [rife_adaptive][FRAMES] vf_fps=47.952 drops={n} decoder_drops=0 delayed=0"),
+    (100, "[{t:8.3f}][v][vo/gpu] Reconfig {n}x{n}"),
+    (60, "[{t:8.3f}][d][vapoursynth] [rife_adaptive][PY_RIFE] Executing with: model=4221 gpu_threads=2"),
+    (40, "[{t:8.3f}][d][vapoursynth] frame {n} ready"),
+    (20, "[{t:8.3f}][d][rife_main] [rife_adaptive][CROP] Result: 1920x800 at (0,{n})"),
+    (10, "[{t:8.3f}][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=23.976"),
+    (10, "[{t:8.3f}][d][rife_main] [rife_adaptive][TOGGLE] RIFE deactivation requested"),
+    (10, "[{t:8.3f}][e][cplayer] Lua error: attempt to call a nil value (field '{n}')"),
+    (10, "[{t:8.3f}][e][ffmpeg] error while decoding block {n}"),
+    (5, "[{t:8.3f}][v][cplayer] Loading lua script /mpv/portable_config/scripts/s{n}.lua..."),
+    (2, "[{t:8.3f}][e][vapoursynth] Python exception: RIFE model not found"),
+    (2, "Traceback (most recent call last):"),
+    (2, '  File "rife_processor.py", line {n}, in process'),
+    (2, "vapoursynth.Error: RIFE model not found"),
+    (2, ""),
+]
+
+
+def write_synthetic_log(path: Path, lines: int, seed: int = 1):
+    rng = random.Random(seed)
+    weights = [w for w, _ in TEMPLATES]
+    templates = [t for _, t in TEMPLATES]
+    t = 0.0
+    with open(path, 'w', encoding='utf-8') as f:
+        batch = []
+        for _ in range(lines):
+            t += 0.004
+            batch.append(rng.choices(templates, weights)[0].format(t=t, n=rng.randrange(100000)))
+            if len(batch) >= 10000:
+                f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+
+
+def reference_parse(log_path: Path) -> dict:
+    """The original parse loop: every pattern searched on every line.
+
+    (Session boundaries follow the current deactivation-first rule and long
+    tracebacks are capped like LogParser's, see MAX_TRACEBACK_LINES.)
+    """
+    results = {name: [] for name in ('errors', 'lua_errors', 'script_loading', 'vapoursynth', 'frame_timing',
+                                     'rife_adaptive', 'rife_sessions', 'warnings', 'python_traceback')}
+    results['rife_by_category'] = defaultdict(list)
+    patterns = {
+        'error': re.compile(r'\[.*?\]\[(e|f)\]\[.*?\](.*)'),
+        'lua_error': re.compile(r'\[.*?\]\[(e|f)\]\[.*?\].*?(Lua error:|attempt to call|attempt to compare|attempt to perform|Profile condition error)'),
+        'script_loading': re.compile(r'Loading (lua )?script (.+)'),
+        'vapoursynth': re.compile(r'\[vapoursynth\](.*)'),
+        'frame_timing': re.compile(r'\]\[[a-z]\]\[(?:cplayer|vo|vd|vf|ffmpeg/video)[^\]]*\].*?(?:[Dd]rop|[Dd]elayed)'),
+        'rife_adaptive_cat': re.compile(r'\[rife_adaptive\]\[([A-Z_]+)\]\s*(.*)'),
+        'timestamp': re.compile(r'^\[\s*([0-9.]+)\]'),
+    }
+    in_traceback = False
+    traceback_lines = []
+    current_session = None
+    session_counter = 0
+    i = 0
+    timestamp = 0.0
+    with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+        for i, line in enumerate(f, 1):
+            line = line.rstrip()
+            ts_match = patterns['timestamp'].search(line)
+            timestamp = float(ts_match.group(1)) if ts_match else 0.0
+            if 'Traceback' in line or 'Python exception' in line:
+                in_traceback = True
+                traceback_lines = [(i, line)]
+            elif in_traceback:
+                if line.strip() and (line.startswith('[') or 'Error' in line or 'File' in line.strip() or line.strip().startswith('import')):
+                    append_traceback_line(traceback_lines, (i, line))
+                else:
+                    if traceback_lines:
+                        results['python_traceback'].append(traceback_lines.copy())
+                    in_traceback = False
+                    traceback_lines = []
+            cat_match = patterns['rife_adaptive_cat'].search(line)
+            if cat_match:
+                category, message = cat_match.group(1), cat_match.group(2)
+                if category == 'TOGGLE':
+                    if 'deactivation requested' in message.lower():
+                        if current_session:
+                            current_session.end_line = i
+                            current_session.end_time = timestamp
+                            current_session = None
+                    elif 'activation requested' in message.lower():
+                        session_counter += 1
+                        current_session = RIFESession(session_id=session_counter, start_line=i, start_time=timestamp)
+                        results['rife_sessions'].append(current_session)
+                if current_session:
+                    current_session.events.append((i, timestamp, category, message))
+                results['rife_by_category'][category].append((i, timestamp, message))
+                results['rife_adaptive'].append((i, line))
+            if patterns['error'].search(line):
+                results['errors'].append((i, line))
+            if patterns['lua_error'].search(line):
+                results['lua_errors'].append((i, line))
+            match = patterns['script_loading'].search(line)
+            if match:
+                results['script_loading'].append((i, line, match.group(2)))
+            if patterns['vapoursynth'].search(line):
+                results['vapoursynth'].append((i, line))
+            if patterns['frame_timing'].search(line):
+                results['frame_timing'].append((i, line))
+    if current_session:
+        current_session.end_line = i
+        current_session.end_time = timestamp
+    return results
+
+
+def comparable(results: dict) -> dict:
+    out = {k: v for k, v in results.items() if k != 'totals'}
+    out['rife_by_category'] = dict(results['rife_by_category'])
+    out['rife_sessions'] = [
+        (s.session_id, s.start_line, s.end_line, s.start_time, s.end_time, list(s.events))
+        for s in results['rife_sessions']
+    ]
+    return out
+
+
+def timed(fn, log_path: Path):
+    start = time.perf_counter()
+    results = fn(log_path)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mpv_log_reader.parse_log on a synthetic log')
+    parser.add_argument('--lines', type=int, default=10_000_000, help='Synthetic log size in lines')
+    parser.add_argument('--log', help='Benchmark an existing log instead of generating one')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    tmp_path = None
+    if args.log:
+        log_path = Path(args.log)
+    else:
+        fd, tmp_path = tempfile.mkstemp(suffix='.log', prefix='mpv-bench-')
+        os.close(fd)
+        log_path = Path(tmp_path)
+        print(f"Writing {args.lines:,} synthetic lines to {log_path} ...")
+        write_synthetic_log(log_path, args.lines, args.seed)
+
+    try:
+        with open(log_path, 'rb') as f:
+            lines = sum(1 for _ in f)
+        size_mb = log_path.stat().st_size / 1e6
+
+        ref, ref_s = timed(reference_parse, log_path)
+        new, new_s = timed(parse_log, log_path)
+
+        identical = comparable(ref) == comparable(new)
+        print(f"Log: {lines:,} lines, {size_mb:.1f} MB")
+        print(f"  reference (regex per line): {ref_s:7.2f}s  {lines / ref_s:12,.0f} lines/s")
+        print(f"  prefiltered LogParser:      {new_s:7.2f}s  {lines / new_s:12,.0f} lines/s")
+        print(f"  speedup: {ref_s / new_s:.2f}x   identical results: {identical}")
+        if not identical:
+            sys.exit(1)
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == '__main__':
+    main()
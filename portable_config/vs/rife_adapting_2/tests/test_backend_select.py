@@ -0,0 +1,82 @@
+"""
+test_backend_select.py - Tests for backend and model file resolution
+
+Run from this directory:
+    python -m unittest test_backend_select
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend_select import (BACKEND_PREFERENCE, MAX_CPU_STREAMS, available_backends, cpu_streams, find_model,
+                            pick_backend)
+
+
+class TestBackends(unittest.TestCase):
+    def test_available_in_preference_order(self):
+        loaded = {'ort', 'ncnn', 'trt'}
+        self.assertEqual(available_backends(loaded.__contains__), ['trt', 'ncnn', 'ort_cpu'])
+        self.assertEqual(available_backends(lambda plugin: True), list(BACKEND_PREFERENCE))
+        self.assertEqual(available_backends(lambda plugin: False), [])
+
+    def test_auto_takes_the_first_available(self):
+        self.assertEqual(pick_backend('auto', ['trt', 'ncnn']), 'trt')
+        self.assertEqual(pick_backend('auto', ['ov_cpu', 'ort_cpu']), 'ov_cpu')
+
+    def test_explicit_backend(self):
+        self.assertEqual(pick_backend('ncnn', ['trt', 'ncnn']), 'ncnn')
+        self.assertEqual(pick_backend('trt', ['ov_cpu', 'ort_cpu']), 'ov_cpu')  # Not loaded: first available
+
+    def test_nothing_available(self):
+        self.assertIsNone(pick_backend('auto', []))
+        self.assertIsNone(pick_backend('trt', []))
+
+
+class TestCpuStreams(unittest.TestCase):
+    def test_core_counts(self):
+        self.assertEqual(cpu_streams(1), (1, 1))
+        self.assertEqual(cpu_streams(8), (2, 4))
+        self.assertEqual(cpu_streams(64), (MAX_CPU_STREAMS, 16))
+
+    def test_unknown_cores(self):
+        with mock.patch.object(os, 'cpu_count', return_value=12):
+            self.assertEqual(cpu_streams(None), (3, 4))
+        with mock.patch.object(os, 'cpu_count', return_value=None):
+            self.assertEqual(cpu_streams(None), (1, 1))
+
+
+class TestFindModel(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.dirs = [str(self.tmp_dir / 'vsmlrt'), str(self.tmp_dir / 'plugins')]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_missing_model(self):
+        path, tried = find_model(4221, self.dirs)
+        self.assertIsNone(path)
+        self.assertEqual(tried, [os.path.join(d, 'rife_v2/rife_v4.22_lite.onnx') for d in self.dirs])
+
+    def test_first_hit_wins(self):
+        found = self.tmp_dir / 'plugins' / 'rife_v2' / 'rife_v4.15_lite.onnx'
+        found.parent.mkdir(parents=True)
+        found.touch()
+        path, tried = find_model(4151, self.dirs)
+        self.assertEqual(path, tried[1])
+        self.assertTrue(os.path.samefile(path, found))
+
+    def test_unknown_model_number(self):
+        _, tried = find_model(9999, self.dirs[:1])
+        self.assertTrue(tried[0].endswith('rife_v4.15.onnx'))
+
+
+if __name__ == '__main__':
+    unittest.main()
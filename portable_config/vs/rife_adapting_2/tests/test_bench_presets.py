@@ -0,0 +1,76 @@
+"""
+test_bench_presets.py - Tests for bench_presets
+
+Run from this directory:
+    python -m unittest test_bench_presets
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bench_presets as bench
+
+
+class TestHelpers(unittest.TestCase):
+    def test_discover_presets(self):
+        presets = bench.discover_presets()
+        self.assertGreaterEqual(len(presets), 15)
+        self.assertTrue(all(p.suffix == '.vpy' for p in presets))
+        self.assertEqual([p.stem for p in bench.discover_presets(['NR_CCD_STD', 'MISSING'])], ['NR_CCD_STD'])
+
+    def test_parse_fps(self):
+        self.assertEqual(bench.parse_fps('23.976'), (24000, 1001))
+        self.assertEqual(bench.parse_fps('59.94'), (60000, 1001))
+        self.assertEqual(bench.parse_fps('25'), (25, 1))
+        self.assertEqual(bench.parse_fps('24.5'), (49, 2))
+        self.assertEqual(bench.parse_fps('30000/1001'), (30000, 1001))
+
+    def test_classify_error(self):
+        self.assertEqual(bench.classify_error(ModuleNotFoundError("No module named 'k7sfunc'")), 'skipped')
+        self.assertEqual(bench.classify_error(
+            AttributeError("There is no attribute or namespace named trt")), 'skipped')
+        self.assertEqual(bench.classify_error(ValueError('bad crop')), 'error')
+
+    def test_compare_results(self):
+        old = [{'preset': 'A', 'resolution': '1080p', 'fps': 50.0},
+               {'preset': 'B', 'resolution': '1080p', 'fps': None}]
+        new = [{'preset': 'A', 'resolution': '1080p', 'fps': 60.0},
+               {'preset': 'B', 'resolution': '1080p', 'fps': 30.0}]
+        self.assertEqual(bench.compare_results(old, new), [
+            {'preset': 'A', 'resolution': '1080p', 'old_fps': 50.0, 'new_fps': 60.0, 'change_pct': 20.0}])
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_worker_result_is_collected(self):
+        # Without VapourSynth the worker reports a skip; with it, the BlankClip passes through
+        preset = self.tmp_dir / 'PASS.vpy'
+        preset.write_text('video_in.set_output()\n')
+        row = bench.run_case(preset, '720p', frames=4, fps='24', timeout=60)
+        self.assertEqual((row['preset'], row['resolution']), ('PASS', '720p'))
+        self.assertIn(row['status'], ('ok', 'skipped'))
+        if row['status'] == 'ok':
+            self.assertEqual(row['output'].split()[0], '1280x720')
+
+    def test_write_results(self):
+        results = [{'preset': 'A', 'resolution': '720p', 'status': 'ok', 'fps': 99.5}]
+        json_path, csv_path = self.tmp_dir / 'r.json', self.tmp_dir / 'r.csv'
+        bench.write_results(results, json_path)
+        bench.write_results(results, csv_path)
+        self.assertEqual(json.loads(json_path.read_text())['results'], results)
+        self.assertEqual(csv_path.read_text().splitlines()[0].split(','), list(bench.FIELDS))
+
+
+if __name__ == '__main__':
+    unittest.main()
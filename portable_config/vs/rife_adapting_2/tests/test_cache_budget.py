@@ -0,0 +1,53 @@
+"""
+test_cache_budget.py - Tests for the frame cache budget
+
+Run from this directory:
+    python -m unittest test_cache_budget
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cache_budget import LOOKAHEAD_FRAMES, MB, MIN_CACHE_MB, MIN_THREADS, frame_bytes, plan_cache
+
+GB = 1024 * MB
+
+
+class TestFrameBytes(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(frame_bytes(1920, 1080, 1, 3, 1, 1), 1920 * 1080 * 3 // 2)  # YUV420P8
+        self.assertEqual(frame_bytes(1920, 1080, 2, 3), 1920 * 1080 * 6)             # RGBH
+        self.assertEqual(frame_bytes(1920, 1080, 1, 1), 1920 * 1080)                 # GRAY8
+
+
+class TestPlanCache(unittest.TestCase):
+    def test_fits(self):
+        threads, cache_mb = plan_cache([50 * MB, 25 * MB], 8, 32 * GB)
+        self.assertEqual((threads, cache_mb), (8, 75 * (8 + LOOKAHEAD_FRAMES)))
+
+    def test_small_frames_keep_minimum(self):
+        self.assertEqual(plan_cache([MB], 4, 32 * GB), (4, MIN_CACHE_MB))
+
+    def test_threads_cut_to_memory(self):
+        # 25% of 4GB holds 1024 // 100 = 10 frames: 6 threads + lookahead
+        threads, cache_mb = plan_cache([100 * MB], 16, 4 * GB)
+        self.assertEqual((threads, cache_mb), (10 - LOOKAHEAD_FRAMES, 1000))
+
+    def test_graph_needs_win_below_minimum(self):
+        threads, cache_mb = plan_cache([400 * MB], 16, 2 * GB)
+        self.assertEqual(threads, MIN_THREADS)
+        self.assertEqual(cache_mb, 400 * (MIN_THREADS + LOOKAHEAD_FRAMES))
+
+    def test_prefetch_lookahead(self):
+        self.assertEqual(plan_cache([100 * MB], 8, 32 * GB, lookahead=12), (8, 2000))
+        self.assertEqual(plan_cache([100 * MB], 16, 4 * GB, lookahead=8), (MIN_THREADS, 1000))
+
+    def test_unknown_memory(self):
+        self.assertEqual(plan_cache([100 * MB], 16, None), (16, 100 * (16 + LOOKAHEAD_FRAMES)))
+
+
+if __name__ == '__main__':
+    unittest.main()
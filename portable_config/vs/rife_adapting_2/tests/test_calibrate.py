@@ -0,0 +1,67 @@
+"""
+test_calibrate.py - Tests for calibrate (budget derivation and profile store)
+
+Run from this directory:
+    python -m unittest test_calibrate
+"""
+
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import calibrate
+
+
+class TestDeriveBudget(unittest.TestCase):
+    POINTS = [{'megapixels': 1.0, 'fps': 90.0}, {'megapixels': 2.0, 'fps': 60.0},
+              {'megapixels': 3.0, 'fps': 40.0}]
+
+    def test_interpolates_between_pass_and_fail(self):
+        self.assertEqual(calibrate.derive_budget(self.POINTS, 55.0), 2.25)
+
+    def test_never_extrapolates_upwards(self):
+        self.assertEqual(calibrate.derive_budget(self.POINTS, 30.0), 3.0)
+
+    def test_all_failing_assumes_constant_throughput(self):
+        self.assertEqual(calibrate.derive_budget(self.POINTS, 180.0), 0.5)
+
+    def test_failed_points_ignored(self):
+        points = [{'megapixels': 1.0, 'status': 'error'}] + self.POINTS[1:]
+        self.assertEqual(calibrate.derive_budget(points, 55.0), 2.25)
+        self.assertIsNone(calibrate.derive_budget(points[:1], 55.0))
+
+    def test_shapes_are_aligned(self):
+        for mp in calibrate.MEGAPIXELS:
+            width, height = calibrate.calibration_shape(mp)
+            self.assertEqual((width % 32, height % 32), (0, 0))
+            self.assertLessEqual(width * height, mp * 1e6)
+        self.assertEqual(calibrate.calibration_shape(2.0), (1856, 1056))
+
+
+class TestProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.path = self.tmp_dir / '_cache' / 'rife_profiles.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        profiles = calibrate.load_profiles(self.path)
+        self.assertEqual(profiles, {'devices': {}})
+        calibrate.store_profile(profiles, 'trt', 0, 4221, {'max_pixels_vsr_on': 2.4}, 'RTX 2060 SUPER')
+        calibrate.store_profile(profiles, 'trt', 0, 4151, {'max_pixels_vsr_on': 3.1})
+        calibrate.save_profiles(profiles, self.path)
+        stored = json.loads(self.path.read_text())
+        self.assertEqual(stored['devices']['trt:0']['name'], 'RTX 2060 SUPER')
+        self.assertEqual(sorted(stored['devices']['trt:0']['models']), ['4151', '4221'])
+        self.assertEqual(calibrate.load_profiles(self.path), stored)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+test_engine_cache.py - Tests for engine_cache (with a stand-in engine builder)
+
+Run from this directory:
+    python -m unittest test_engine_cache
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import engine_cache
+from engine_cache import EngineCache, EngineKey
+
+
+class FakeBuilder:
+    """Writes an engine file of a fixed size and remembers what it built."""
+
+    def __init__(self, size=100):
+        self.size = size
+        self.built = []
+
+    def __call__(self, key, folder):
+        (folder / f"{key.name}.engine").write_bytes(b'\0' * self.size)
+        self.built.append(key)
+
+
+class EngineCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.cache = EngineCache(self.root, max_bytes=250)
+        self.builder = FakeBuilder()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestEngineCache(EngineCacheTestCase):
+    def test_key_name(self):
+        self.assertEqual(EngineKey(4221, 1600, 672, device=1).name, 'rife4221_1600x672_fp16_dev1')
+        self.assertEqual(engine_cache.parse_shape('1600X672'), (1600, 672))
+
+    def test_build_once(self):
+        key = EngineKey(4221, 1600, 672)
+        self.assertTrue(self.cache.build(key, self.builder))
+        self.assertFalse(self.cache.build(key, self.builder))
+        self.assertTrue(self.cache.cached(key))
+        self.assertEqual(self.builder.built, [key])
+        self.assertEqual(self.cache.load_index()[key.name]['size'], 100)
+
+    def test_lru_eviction(self):
+        keys = [EngineKey(4221, w, 672) for w in (1024, 1280, 1600)]
+        for key in keys[:2]:
+            self.cache.build(key, self.builder)
+        time.sleep(0.01)
+        self.cache.record(keys[0])  # keys[1] is now least recently used
+        self.cache.build(keys[2], self.builder)
+        self.assertEqual([self.cache.cached(key) for key in keys], [True, False, True])
+        self.assertNotIn(keys[1].name, self.cache.load_index())
+
+    def test_locked_engine_is_not_built_or_evicted(self):
+        busy, other = EngineKey(4221, 1024, 672), EngineKey(4221, 1280, 672)
+        self.assertTrue(self.cache.try_lock(busy))
+        self.assertFalse(self.cache.build(busy, self.builder))
+        self.assertEqual(self.cache.prewarm([busy, other], self.builder), [other])
+        self.cache.unlock(busy)
+        self.assertTrue(self.cache.try_lock(busy))
+
+    def test_stale_lock_is_taken_over(self):
+        key = EngineKey(4221, 1024, 672)
+        self.assertTrue(self.cache.try_lock(key))
+        old = time.time() - engine_cache.LOCK_STALE_S - 1
+        os.utime(self.cache.lock_path(key), (old, old))
+        self.assertTrue(self.cache.try_lock(key))
+
+    def test_engine_waits_for_build_in_progress(self):
+        key = EngineKey(4221, 1600, 672)
+        self.assertTrue(self.cache.try_lock(key))
+
+        def finish_prewarm():
+            time.sleep(0.2)
+            self.cache.folder(key).mkdir(parents=True)
+            self.builder(key, self.cache.folder(key))
+            self.cache.unlock(key)
+
+        thread = threading.Thread(target=finish_prewarm)
+        thread.start()
+        with self.cache.engine(key, timeout=10) as folder:
+            self.assertTrue(self.cache.cached(key))  # built by the "prewarm", not again
+            self.assertEqual(folder, self.cache.folder(key))
+        thread.join()
+        self.assertFalse(self.cache.lock_path(key).exists())
+        self.assertEqual(len(self.builder.built), 1)
+
+    def test_prewarm_continues_after_failure(self):
+        def flaky(key, folder):
+            if key.width == 1024:
+                raise RuntimeError('trtexec failed')
+            self.builder(key, folder)
+
+        keys = [EngineKey(4221, 1024, 672), EngineKey(4221, 1280, 672)]
+        self.assertEqual(self.cache.prewarm(keys, flaky), keys[1:])
+        self.assertFalse(self.cache.lock_path(keys[0]).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
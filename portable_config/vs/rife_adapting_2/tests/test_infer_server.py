@@ -0,0 +1,190 @@
+"""
+test_infer_server.py - Tests for the shared inference server (dummy model)
+
+Run from this directory:
+    python -m unittest test_infer_server
+"""
+
+import sys
+import time
+import threading
+import unittest
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import infer_server
+from infer_server import DummyModel, InferenceClient, InferenceServer, next_batch
+
+WIDTH, HEIGHT, FORMAT = 4, 2, "RGB24"
+SIZE = infer_server.frame_bytes(WIDTH, HEIGHT, FORMAT)
+
+
+def pair_io(img0: bytes, img1: bytes, result: list):
+    """fill/read callbacks for InferenceClient.interpolate."""
+    def fill(buf, offset0, offset1):
+        buf[offset0:offset0 + SIZE] = img0
+        buf[offset1:offset1 + SIZE] = img1
+
+    def read(buf, offset):
+        result.append(bytes(buf[offset:offset + SIZE]))
+
+    return fill, read
+
+
+class TestNextBatch(unittest.TestCase):
+    def test_one_per_client_per_round(self):
+        queues = [deque('aaaa'), deque('b'), deque('cc')]
+        batch = next_batch(queues, 5)
+        self.assertEqual([item for _, item in batch], ['a', 'b', 'c', 'a', 'c'])
+        self.assertEqual(list(queues[0]), ['a', 'a'])
+
+    def test_start_rotates(self):
+        queues = [deque('aa'), deque('bb')]
+        self.assertEqual(next_batch(queues, 1, start=1), [(1, 'b')])
+        self.assertEqual(next_batch([deque(), deque()], 4), [])
+
+
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.models = []
+
+        def factory(key):
+            self.models.append(DummyModel(key))
+            return self.models[-1]
+
+        self.server = InferenceServer(factory, ('127.0.0.1', 0), max_batch=4)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.address = f"{self.server.address[0]}:{self.server.address[1]}"
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.close()
+
+    def connect(self, name):
+        client = InferenceClient(self.address, 4221, WIDTH, HEIGHT, FORMAT, name=name)
+        self.clients.append(client)
+        return client
+
+    def test_pairs_from_two_clients_share_one_model(self):
+        clients = [self.connect('mpv-1'), self.connect('mpv-2')]
+        results = {0: [], 1: []}
+
+        def play(k):
+            for i in range(10):
+                fill, read = pair_io(bytes([10 * k + i] * SIZE), bytes([10 * k + i + 2] * SIZE), results[k])
+                clients[k].interpolate(fill, read)
+
+        threads = [threading.Thread(target=play, args=(k,)) for k in (0, 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(results[0], [bytes([i + 1] * SIZE) for i in range(10)])
+        self.assertEqual(results[1], [bytes([10 + i + 1] * SIZE) for i in range(10)])
+        self.assertEqual(len(self.models), 1)
+        self.assertEqual(sum(self.models[0].batches), 20)
+
+    def test_concurrent_requests_of_one_client(self):
+        client = self.connect('mpv-1')
+        results = [[] for _ in range(8)]
+
+        def request(i):
+            fill, read = pair_io(bytes([i] * SIZE), bytes([i + 4] * SIZE), results[i])
+            client.interpolate(fill, read)
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(results, [[bytes([i + 2] * SIZE)] for i in range(8)])
+
+    def test_slow_model_build_is_awaited_once(self):
+        factory = self.server.model_factory
+        self.server.model_factory = lambda key: (time.sleep(0.5), factory(key))[1]
+        clients = []
+
+        def connect():  # Handshake timeout well below the build time
+            clients.append(InferenceClient(self.address, 4221, WIDTH, HEIGHT, FORMAT, timeout=0.2))
+
+        threads = [threading.Thread(target=connect) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.clients += clients
+        self.assertEqual(len(clients), 2)
+        self.assertEqual(len(self.models), 1)
+        result = []
+        clients[0].interpolate(*pair_io(bytes([2] * SIZE), bytes([4] * SIZE), result))
+        self.assertEqual(result, [bytes([3] * SIZE)])
+
+    def test_client_leaving_during_build(self):
+        factory = self.server.model_factory
+        self.server.model_factory = lambda key: (time.sleep(0.3), factory(key))[1]
+        conn = infer_server._connect(self.server.address, 1)
+        shm = infer_server.shared_memory.SharedMemory(create=True, size=3 * SIZE)
+        infer_server._OWNED.add(shm.name)
+        conn.send(("hello", {"name": "gone", "shm": shm.name, "model": 4221,
+                             "width": WIDTH, "height": HEIGHT, "format": FORMAT}))
+        self.assertEqual(conn.recv(), ("loading", None))
+        conn.close()
+        time.sleep(0.5)  # The handler's reply fails; the server keeps serving
+        shm.close()
+        shm.unlink()
+        result = []
+        self.connect('mpv-2').interpolate(*pair_io(bytes([0] * SIZE), bytes([2] * SIZE), result))
+        self.assertEqual(result, [bytes([1] * SIZE)])
+
+    def test_client_leaving_mid_batch(self):
+        client = self.connect('mpv-2')
+        model = self.models[0]
+        started, release = threading.Event(), threading.Event()
+        infer = model.infer
+        model.infer = lambda pairs: (started.set(), release.wait(5), infer(pairs))[2]
+        conn = infer_server._connect(self.server.address, 1)
+        shm = infer_server.shared_memory.SharedMemory(create=True, size=3 * SIZE)
+        infer_server._OWNED.add(shm.name)
+        conn.send(("hello", {"name": "gone", "shm": shm.name, "model": 4221,
+                             "width": WIDTH, "height": HEIGHT, "format": FORMAT}))
+        self.assertEqual(conn.recv()[0], "ok")
+        conn.send(("infer", 1, 0))
+        self.assertTrue(started.wait(5))
+        conn.close()  # Leaves while its pair is being run
+        for _ in range(50):
+            if len(self.server.clients) == 1:
+                break
+            time.sleep(0.05)
+        self.assertEqual(len(self.server.clients), 1)
+        release.set()
+        result = []  # The scheduler survived and still serves the other client
+        client.interpolate(*pair_io(bytes([0] * SIZE), bytes([2] * SIZE), result), timeout=5)
+        self.assertEqual(result, [bytes([1] * SIZE)])
+        shm.close()
+        shm.unlink()
+
+    def test_no_server_raises(self):
+        self.server.close()
+        with self.assertRaises(OSError):
+            InferenceClient(self.address, 4221, WIDTH, HEIGHT, FORMAT, timeout=0.3)
+
+    def test_server_gone_fails_requests(self):
+        client = self.connect('mpv-1')
+        self.server.close()
+        for _ in range(50):
+            if not client.alive:
+                break
+            time.sleep(0.05)
+        self.assertFalse(client.alive)
+        fill, read = pair_io(bytes(SIZE), bytes(SIZE), [])
+        with self.assertRaises(ConnectionError):
+            client.interpolate(fill, read)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,723 @@
+"""
+test_mpv_log_reader.py - Tests for mpv_log_reader
+
+Run from this directory:
+    python -m unittest test_mpv_log_reader
+"""
+
+import io
+import sys
+import bz2
+import gzip
+import json
+import lzma
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+from collections import Counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mpv_log_reader as reader
+
+SAMPLE_LOG = """\
+[   0.010][v][cplayer] Loading lua script /mpv/portable_config/scripts/rife_main.lua...
+[   0.011][v][cplayer] Loading script @osc.lua...
+[   1.000][d][rife_main] [rife_adaptive][INIT] Configuration loaded
+[   2.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=23.976
+[   2.100][d][rife_main] [rife_adaptive][CROP] Starting detection (1s timeout)
+[   3.100][d][rife_main] [rife_adaptive][VPY] Script written to: /tmp/rife_adapting_2_1.vpy
+[   3.200][d][vapoursynth] [rife_adaptive][PY_INIT] Starting RIFE processing
+[   3.300][e][vapoursynth] Python exception: RIFE model not found
+Traceback (most recent call last):
+  File "rife_processor.py", line 120, in process
+vapoursynth.Error: RIFE model not found
+
+[   3.400][e][cplayer] Lua error: attempt to call a nil value
+[   4.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE deactivation requested
+[   4.100][d][rife_main] [rife_adaptive][TOGGLE] RIFE deactivated, filters removed
+[   5.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=24\r
+[   5.100][d][rife_main] [rife_adaptive][CROP] No black bars detected\r
+[   5.200][d][vapoursynth] [rife_adaptive][PY_OUTPUT] Final output: 1920x1080\r[   5.250][d][vd] lone CR line
+Traceback (most recent call last):
+[   5.300][d][vapoursynth] [rife_adaptive][PY_RIFE] configured
+  File "rife_processor.py", line 130, in process
+\t
+[   6.000][f][cplayer] attempt to compare number with nil
+[   6.500][w][ao] underrun
+[   7.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=25
+[   7.500][d][rife_main] [rife_adaptive][VSR] Removed
+[   8.000][d][vapoursynth] [rife_adaptive][PY_INIT] still running
+"""
+
+
+def comparable(results: dict) -> dict:
+    out = {k: list(v) if k in reader.BUCKETS else v for k, v in results.items()}
+    out['totals'] = {k: v for k, v in results['totals'].items() if v}
+    out['rife_by_category'] = {k: list(v) for k, v in results['rife_by_category'].items()}
+    out['rife_sessions'] = [
+        (s.session_id, s.start_line, s.end_line, s.start_time, s.end_time, list(s.events))
+        for s in results['rife_sessions']
+    ]
+    return out
+
+
+def json_roundtrip(value):
+    return json.loads(json.dumps(value))
+
+
+def line_offsets(data: bytes):
+    """Byte offset of every b'\\n'-terminated line start."""
+    offsets = [0]
+    for k, byte in enumerate(data):
+        if byte == 0x0A and k + 1 < len(data):
+            offsets.append(k + 1)
+    return offsets
+
+
+class TestSessionEvents(unittest.TestCase):
+    EVENTS = [
+        (4, 2.0, 'TOGGLE', 'RIFE activation requested'),
+        (7, 3.2, 'PY_INIT', 'Starting RIFE processing: clip=1920x1080'),
+        (9, 3.3, 'CROP', 'Result: 1920x800 at (0,140) \u2013 ok'),
+        (12, 3.5, 'PY_INIT', ''),
+    ]
+
+    def test_round_trip(self):
+        events = reader.SessionEvents(self.EVENTS)
+        self.assertEqual(list(events), self.EVENTS)
+        self.assertEqual(events[-1], self.EVENTS[-1])
+        self.assertEqual(events[1:3], self.EVENTS[1:3])
+        self.assertEqual(events.categories, ['TOGGLE', 'PY_INIT', 'CROP'])
+
+    def test_origin_views(self):
+        session = reader.RIFESession(session_id=1, start_line=4, events=self.EVENTS)
+        self.assertEqual(list(session.lua_events), [self.EVENTS[0], self.EVENTS[2]])
+        self.assertEqual(list(session.python_events), [self.EVENTS[1], self.EVENTS[3]])
+        session.events.append((20, 9.0, 'PY_OUTPUT', 'done'))
+        self.assertEqual(len(session.python_events), 3)
+
+    def test_dict_round_trip(self):
+        session = reader.RIFESession(session_id=1, start_line=4, events=self.EVENTS)
+        data = json.loads(json.dumps(session.to_dict()))
+        self.assertEqual(reader.RIFESession.from_dict(data), session)
+
+    def test_maxlen_keeps_latest(self):
+        stream = [(k, float(k)) + self.EVENTS[k % 4][2:] for k in range(10)]
+        events = reader.SessionEvents(maxlen=3)
+        for k, event in enumerate(stream):
+            events.append(event)
+            expected = stream[max(0, k - 2):k + 1]
+            self.assertEqual(list(events), expected)
+            self.assertLess(len(events.lines), 6)  # Compacted before it doubles
+            session = reader.RIFESession(session_id=1, start_line=0, events=events)
+            self.assertEqual(list(session.python_events), [e for e in expected if e[2].startswith('PY_')])
+        with self.assertRaises(IndexError):
+            events[-4]
+
+
+class LogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.log_path = self.tmp_dir / 'mpv-debug.log'
+        self.log_path.write_bytes(SAMPLE_LOG.encode('utf-8'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+class TestParseLog(LogTestCase):
+    def test_sessions(self):
+        results = reader.parse_log(self.log_path)
+        sessions = results['rife_sessions']
+        self.assertEqual([s.session_id for s in sessions], list(range(1, len(sessions) + 1)))
+        self.assertEqual((sessions[0].start_line, sessions[0].start_time), (4, 2.0))
+        self.assertEqual(sessions[0].events[1][2:], ('CROP', 'Starting detection (1s timeout)'))
+        # Deactivation closes the session rather than opening a new one
+        self.assertEqual(len(sessions), 3)
+        self.assertEqual((sessions[0].end_line, sessions[0].end_time), (14, 4.0))
+        # The last session is closed at end of log (the lone CR adds a line)
+        self.assertEqual((sessions[-1].end_line, sessions[-1].end_time), (28, 8.0))
+
+    def test_buckets(self):
+        results = reader.parse_log(self.log_path)
+        self.assertEqual(len(results['script_loading']), 2)
+        self.assertEqual(len(results['errors']), 3)
+        self.assertEqual(len(results['lua_errors']), 2)
+        self.assertEqual(len(results['python_traceback']), 2)
+
+    def test_caps_keep_latest_and_count_all(self):
+        results = reader.parse_log(self.log_path, caps={'errors': 1, 'rife_by_category': 1})
+        self.assertEqual(len(results['errors']), 1)
+        self.assertIn('attempt to compare', results['errors'][0][1])
+        self.assertEqual(results['totals']['errors'], 3)
+        self.assertTrue(all(len(v) == 1 for v in results['rife_by_category'].values()))
+
+    def test_caps_bound_session_events(self):
+        full = reader.parse_log(self.log_path)['rife_sessions']
+        capped = reader.parse_log(self.log_path, caps={'session_events': 2})['rife_sessions']
+        self.assertEqual([list(s.events) for s in capped], [list(s.events)[-2:] for s in full])
+
+    def test_long_traceback_keeps_head_and_tail(self):
+        frames = ''.join(f'  File "rife_processor.py", line {k}, in process\n' for k in range(500))
+        self.log_path.write_text(f'Traceback (most recent call last):\n{frames}'
+                                 'vapoursynth.Error: RIFE model not found\n\n', encoding='utf-8')
+        traceback, = reader.parse_log(self.log_path)['python_traceback']
+        self.assertEqual(len(traceback), reader.MAX_TRACEBACK_LINES)
+        self.assertEqual(traceback[0], (1, 'Traceback (most recent call last):'))
+        self.assertEqual(traceback[-1], (502, 'vapoursynth.Error: RIFE model not found'))
+        self.assertEqual(traceback[1][0], 502 - reader.MAX_TRACEBACK_LINES + 2)
+        index = reader.LogIndex(self.log_path, self.tmp_dir / 'index.json')
+        index.update()
+        self.assertEqual(list(index.results()['python_traceback']), [traceback])
+        chunks = [reader.parse_chunk(self.log_path, a, b) for a, b in reader.chunk_ranges(self.log_path, 4)]
+        self.assertEqual(reader.merge_chunks(self.log_path, chunks)['python_traceback'], [traceback])
+
+
+class TestLogInput(LogTestCase):
+    VARIANTS = {
+        'sample': SAMPLE_LOG.encode('utf-8'),
+        'crlf': SAMPLE_LOG.replace('\n', '\r\n').encode('utf-8'),
+        'unterminated': SAMPLE_LOG.rstrip('\n').encode('utf-8') + b'\n[   9.000][d][vo] trailing',
+        'invalid_utf8': SAMPLE_LOG.encode('utf-8').replace(b'Configuration', b'Config\xff\xferation'),
+        'empty': b'',
+    }
+
+    def line_by_line(self, path):
+        """Reference: every text-mode line fed to the parser."""
+        parser = reader.LogParser()
+        collector = reader.ResultCollector()
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                for kind, item in parser.feed(line):
+                    collector.add(kind, item)
+        return comparable(collector.results()), parser.line_num, parser.last_line
+
+    def scanned(self, path):
+        parser = reader.LogParser()
+        collector = reader.ResultCollector()
+        with reader.map_log(path) as buf:
+            for kind, item in reader.scan_lines(parser, buf):
+                collector.add(kind, item)
+        return comparable(collector.results()), parser.line_num, parser.last_line
+
+    def test_scan_matches_line_by_line(self):
+        for name, data in self.VARIANTS.items():
+            with self.subTest(variant=name):
+                self.log_path.write_bytes(data)
+                self.assertEqual(self.scanned(self.log_path), self.line_by_line(self.log_path))
+
+    def test_small_blocks(self):
+        # Blocks smaller than a line: CRLF pairs and lines split across block edges
+        self.log_path.write_bytes(self.VARIANTS['crlf'])
+        expected = self.line_by_line(self.log_path)
+        for size in (1, 2, 7):
+            with self.subTest(size=size), \
+                    mock.patch.object(reader, 'COUNT_BLOCK', size), mock.patch.object(reader, 'FEED_BLOCK', size):
+                self.assertEqual(self.scanned(self.log_path), expected)
+
+    def test_count_lines(self):
+        for data in (b'a\r\nb\rc\n\nd', b'\r\n\r\n', b'x'):
+            with self.subTest(data=data):
+                self.assertEqual(reader.count_lines(data, 0, len(data)), len(data.splitlines()))
+
+    def test_compressed(self):
+        plain = comparable(reader.parse_log(self.log_path))
+        data = self.log_path.read_bytes()
+        for suffix, module in (('.gz', gzip), ('.bz2', bz2), ('.xz', lzma)):
+            with self.subTest(suffix=suffix):
+                path = self.tmp_dir / f'mpv-debug.log{suffix}'
+                path.write_bytes(module.compress(data))
+                self.assertTrue(reader.is_compressed(path))
+                self.assertEqual(comparable(reader.parse_log(path)), plain)
+                # No byte ranges or index for a compressed stream: parsed serially
+                self.assertEqual(comparable(reader.parse_log(path, jobs=4)), plain)
+                index_path = self.tmp_dir / f'{suffix}.index.json'
+                self.assertEqual(comparable(reader.parse_log_indexed(path, index_path=index_path)), plain)
+                self.assertFalse(index_path.exists())
+        self.assertEqual(len(reader.expand_logs(str(self.tmp_dir))), 4)
+
+    @unittest.skipUnless(reader.zstandard, 'zstandard not installed')
+    def test_zstd(self):
+        path = self.tmp_dir / 'mpv-debug.log.zst'
+        path.write_bytes(reader.zstandard.ZstdCompressor().compress(self.log_path.read_bytes()))
+        self.assertEqual(comparable(reader.parse_log(path)), comparable(reader.parse_log(self.log_path)))
+
+    def test_truncated_archive(self):
+        path = self.tmp_dir / 'mpv-debug.log.gz'
+        path.write_bytes(gzip.compress(self.log_path.read_bytes())[:-20])
+        self.assertIn('Failed to read log', reader.parse_log(path)['error'])
+
+
+class TestParallelParse(LogTestCase):
+    def assert_same_as_serial(self, ranges, caps=None):
+        chunks = [reader.parse_chunk(self.log_path, a, b, caps) for a, b in ranges]
+        merged = reader.merge_chunks(self.log_path, chunks, caps)
+        serial = reader.parse_log(self.log_path, caps)
+        self.assertEqual(comparable(merged), comparable(serial))
+
+    def test_every_split_point(self):
+        data = self.log_path.read_bytes()
+        offsets = line_offsets(data)
+        for cut in offsets[1:]:
+            with self.subTest(cut=cut):
+                self.assert_same_as_serial([(0, cut), (cut, len(data))])
+
+    def test_one_line_per_chunk(self):
+        data = self.log_path.read_bytes()
+        offsets = line_offsets(data) + [len(data)]
+        self.assert_same_as_serial(list(zip(offsets, offsets[1:])))
+
+    def test_caps(self):
+        data = self.log_path.read_bytes()
+        offsets = line_offsets(data) + [len(data)]
+        caps = {name: 1 for name in reader.BUCKETS + ('session_events',)}
+        self.assert_same_as_serial(list(zip(offsets, offsets[1:])), caps)
+
+    def test_chunk_ranges_cover_file_at_line_starts(self):
+        data = self.log_path.read_bytes()
+        starts = set(line_offsets(data))
+        for jobs in range(1, 12):
+            ranges = reader.chunk_ranges(self.log_path, jobs)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], len(data))
+            for (a, b), (c, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(b, c)
+            self.assertTrue(all(a in starts for a, _ in ranges))
+
+    def test_process_pool(self):
+        serial = reader.parse_log(self.log_path)
+        parallel = reader.parse_log(self.log_path, jobs=4)
+        self.assertEqual(comparable(parallel), comparable(serial))
+
+
+class TestFollow(LogTestCase):
+    def grow_log(self):
+        """Append the sample log in odd-sized steps that cut lines (and a CRLF) in half."""
+        data = SAMPLE_LOG.encode('utf-8')
+        self.log_path.write_bytes(b'')
+        for end in list(range(37, len(data), 37)) + [len(data)]:
+            with open(self.log_path, 'ab') as f:
+                f.write(data[self.log_path.stat().st_size:end])
+            yield
+
+    def test_appends_match_one_shot_parse(self):
+        follower = reader.LogFollower(self.log_path)
+        collector = reader.ResultCollector()
+        for _ in self.grow_log():
+            for kind, item in follower.poll():
+                collector.add(kind, item)
+        for kind, item in follower.parser.close():
+            collector.add(kind, item)
+        self.assertEqual(comparable(collector.results()), comparable(reader.parse_log(self.log_path)))
+
+    def test_resume_from_checkpoint(self):
+        def flatten(kind, item):
+            if isinstance(item, reader.RIFESession):
+                return (kind, item.session_id, item.start_line, item.end_line)
+            return (kind, item)
+
+        single = reader.LogFollower(self.log_path)
+        checkpoint = self.tmp_dir / 'follow.json'
+        expected, resumed = [], []
+        for _ in self.grow_log():
+            expected += [flatten(*event) for event in single.poll()]
+            # A fresh follower every time: state must round-trip through the checkpoint
+            follower = reader.LogFollower(self.log_path, checkpoint)
+            resumed += [flatten(*event) for event in follower.poll()]
+        self.assertEqual(resumed, expected)
+        follower = reader.LogFollower(self.log_path, checkpoint)
+        self.assertTrue(follower.resumed)
+        self.assertEqual(follower.offset, self.log_path.stat().st_size)
+        self.assertEqual(json_roundtrip(follower.parser.state()), json_roundtrip(single.parser.state()))
+
+    def test_partial_line_waits_for_newline(self):
+        self.log_path.write_bytes(b'[   1.000][e][cplayer] Lua error: att')
+        follower = reader.LogFollower(self.log_path)
+        self.assertEqual(list(follower.poll()), [])
+        with open(self.log_path, 'ab') as f:
+            f.write(b'empt to call nil\n')
+        events = list(follower.poll())
+        self.assertEqual([kind for kind, _ in events], ['errors', 'lua_errors'])
+        self.assertEqual(events[1][1], (1, '[   1.000][e][cplayer] Lua error: attempt to call nil'))
+
+    def test_truncated_log_restarts(self):
+        follower = reader.LogFollower(self.log_path)
+        list(follower.poll())
+        self.log_path.write_bytes(b'[   0.500][e][cplayer] Lua error: attempt to call nil\n')
+        events = list(follower.poll())
+        self.assertEqual(events[0][0], 'log_reset')
+        self.assertEqual(events[-1], ('lua_errors', (1, '[   0.500][e][cplayer] Lua error: attempt to call nil')))
+
+
+class TestIndex(LogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index_path = self.tmp_dir / 'mpv-debug.log.index'
+
+    def indexed(self, caps=None):
+        index = reader.LogIndex(self.log_path, self.index_path, caps)
+        changed = index.update()
+        return index, changed, index.results()
+
+    def test_matches_parse_log(self):
+        expected = comparable(reader.parse_log(self.log_path))
+        _, changed, first = self.indexed()
+        self.assertTrue(changed)
+        self.assertEqual(comparable(first), expected)
+        _, changed, second = self.indexed()
+        self.assertFalse(changed)
+        self.assertEqual(comparable(second), expected)
+
+    def test_caps(self):
+        caps = {'errors': 1, 'python_traceback': 1, 'rife_by_category': 1, 'session_events': 1}
+        _, _, results = self.indexed(caps)
+        self.assertEqual(comparable(results), comparable(reader.parse_log(self.log_path, caps)))
+        caps = {name: 1 for name in reader.BUCKETS + ('session_events',)}
+        _, changed, results = self.indexed(caps)
+        self.assertTrue(changed)  # Built with other caps: rebuilt
+        self.assertEqual(comparable(results), comparable(reader.parse_log(self.log_path, caps)))
+
+    def test_caps_apply_while_building(self):
+        index, _, _ = self.indexed({'rife_adaptive': 2, 'rife_sessions': 1, 'session_events': 1})
+        self.assertEqual(len(index.lines['rife_adaptive'].lines), 2)
+        self.assertEqual((len(index.sessions), len(index.session_events[0])), (1, 1))
+
+    def test_no_message_text_and_lazy_reads(self):
+        self.indexed()
+        data = self.index_path.read_bytes()
+        self.assertNotIn(b'Starting detection', data)
+        self.assertNotIn(b'RIFE model not found', data)
+        index, changed, results = self.indexed()
+        self.assertFalse(changed)
+        self.assertTrue(all(entries.source for entries in index.lines.values()))
+        self.assertEqual(len(results['errors']), 3)  # Known without reading the arrays
+        self.assertIsNotNone(index.lines['errors'].source)
+        self.assertEqual(results['errors'][0][0], 8)
+        self.assertIsNone(index.lines['errors'].source)
+
+    def test_extended_when_log_grows(self):
+        data = SAMPLE_LOG.encode('utf-8')
+        # Cut inside a traceback and an open session, mid-line
+        cut = data.index(b'  File "rife_processor.py", line 130') + 5
+        self.log_path.write_bytes(data[:cut])
+        index, _, _ = self.indexed()
+        offset = index.offset
+        self.assertLess(offset, cut)
+        with open(self.log_path, 'ab') as f:
+            f.write(data[cut:])
+        index = reader.LogIndex(self.log_path, self.index_path)
+        self.assertTrue(index.resumed)
+        self.assertEqual(index.offset, offset)
+        index.update()
+        self.assertEqual(comparable(index.results()), comparable(reader.parse_log(self.log_path)))
+
+    def test_crlf_offsets(self):
+        # Offsets recorded through scan_lines point at the same lines with any line ending
+        self.log_path.write_bytes(SAMPLE_LOG.replace('\n', '\r\n').encode('utf-8'))
+        _, _, results = self.indexed()
+        self.assertEqual(comparable(results), comparable(reader.parse_log(self.log_path)))
+
+    def test_scan_lines_only(self):
+        with mock.patch.object(reader, 'split_lines', side_effect=AssertionError('line by line')):
+            self.indexed()  # Complete lines never go through the per-line loop
+
+    def test_rebuilt_when_log_replaced(self):
+        self.indexed()
+        self.log_path.write_bytes(b'[   0.500][e][cplayer] Lua error: attempt to call nil\n' * 40)
+        _, changed, results = self.indexed()
+        self.assertTrue(changed)
+        self.assertEqual(comparable(results), comparable(reader.parse_log(self.log_path)))
+
+    def test_lines_decoded_on_access(self):
+        _, _, results = self.indexed()
+        self.assertIsInstance(results['lua_errors'], reader.IndexedItems)
+        self.assertEqual(results['lua_errors'][-1],
+                         (24, '[   6.000][f][cplayer] attempt to compare number with nil'))
+
+
+class TestLatency(LogTestCase):
+    EVENTS = [
+        (1, 10.0, 'TOGGLE', 'RIFE activation requested, container_fps=23.976'),
+        (2, 10.2, 'CROP', 'Starting detection (1s timeout)'),
+        (3, 11.2, 'CROP', 'Result: 1920x800 at (0,140)'),
+        (4, 11.3, 'VPY', 'Script written to: /tmp/rife_adapting_2_1.vpy'),
+        (5, 11.8, 'PY_INIT', 'Starting RIFE processing: target=1920x800, model=4221, gpu=0'),
+        (6, 11.9, 'PY_MODEL', 'Model path: rife_v4.22_lite.onnx'),
+        (7, 12.0, 'PY_MODEL', 'Model found'),
+        (8, 12.0, 'PY_RIFE', 'Executing with: model=4221'),
+        (9, 14.0, 'PY_RIFE', 'RIFE execution configured successfully'),
+        (10, 14.5, 'PY_OUTPUT', 'Final output: 1920x800 YUV420P10'),
+        (11, 15.5, 'PY_FRAME', 'First frame delivered: n=0'),
+    ]
+
+    def session(self, session_id=1, events=EVENTS):
+        return reader.RIFESession(session_id=session_id, start_line=events[0][0], events=events)
+
+    def test_stages(self):
+        latency = reader.session_latency(self.session())
+        expected = {'crop_detect': 1.2, 'vpy_to_py_init': 0.5, 'model_resolve': 0.1, 'rife_setup': 2.0,
+                    'graph_build': 2.7, 'first_frame': 1.0, 'total': 5.5}
+        self.assertEqual(latency.keys(), expected.keys())
+        for stage, seconds in expected.items():
+            self.assertAlmostEqual(latency[stage], seconds, places=6, msg=stage)
+
+    def test_missing_markers(self):
+        latency = reader.session_latency(self.session(events=self.EVENTS[:5]))
+        self.assertIsNone(latency['model_resolve'])
+        self.assertIsNone(latency['total'])
+        self.assertAlmostEqual(latency['vpy_to_py_init'], 0.5)
+
+    def test_report_and_export(self):
+        sessions = [self.session(), self.session(2, self.EVENTS[:5])]
+        report = reader.latency_report(sessions)
+        self.assertEqual((report['sessions'][0]['model'], report['sessions'][0]['target']), ('4221', '1920x800'))
+        self.assertEqual(report['summary']['crop_detect']['count'], 2)
+        self.assertEqual(report['summary']['total']['count'], 1)
+        self.assertAlmostEqual(report['summary']['total']['p95'], 5.5)
+
+        json_path = self.tmp_dir / 'latency.json'
+        reader.export_report(report, json_path)
+        self.assertEqual(json.loads(json_path.read_text())['summary']['total']['count'], 1)
+        csv_path = self.tmp_dir / 'latency.csv'
+        reader.export_report(report, csv_path)
+        rows = csv_path.read_text().splitlines()
+        self.assertTrue(rows[0].startswith('session_id,start_line,model,target,crop_detect'))
+        self.assertEqual([row.split(',')[0] for row in rows[1:]], ['1', '2', 'p50', 'p95', 'max'])
+
+
+FRAME_LOG = """\
+[  10.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=23.976
+[  10.001][d][rife_main] [rife_adaptive][FRAMES] vf_fps=23.976 drops=4 decoder_drops=1 delayed=0
+[  11.000][d][rife_main] [rife_adaptive][VPY] Source: 1920x1080, Crop: 1920x800 at (0,140)
+[  11.100][d][rife_main] [rife_adaptive][VPY] Resolution: 1920x800 -> 1600x672 (Scale 0.84) | VSR Path: true
+[  11.900][d][vapoursynth] [rife_adaptive][PY_INIT] Starting RIFE processing: crop=(0,140,1920,800), target=1600x672, model=4221
+[  13.000][d][vapoursynth] [rife_adaptive][PY_FRAME] First frame delivered: n=0
+[  14.000][v][cplayer] Dropping frame at pts 14.0
+[  15.000][d][rife_main] [rife_adaptive][FRAMES] vf_fps=46.000 drops=6 decoder_drops=1 delayed=2
+[  15.500][d][vo/gpu] frame delayed by 20ms
+[  33.000][d][vapoursynth] [rife_adaptive][PY_FRAME] Frames delivered: count=1001
+[  35.000][d][rife_main] [rife_adaptive][FRAMES] vf_fps=48.000 drops=9 decoder_drops=2 delayed=3
+[  35.100][d][rife_main] [rife_adaptive][TOGGLE] RIFE deactivation requested
+[  36.000][e][vd] Decoder drop: too slow
+[  40.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=24
+[  40.100][d][rife_main] [rife_adaptive][VPY] Resolution: 1920x1080 -> 1920x1080 (Scale 1.00) | VSR Path: false
+[  41.000][d][rife_main] [rife_adaptive][FRAMES] vf_fps=40.000 drops=9 decoder_drops=2 delayed=3
+[  46.000][d][rife_main] [rife_adaptive][FRAMES] vf_fps=40.000 drops=29 decoder_drops=2 delayed=3
+"""
+
+
+class TestFrames(LogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log_path.write_text(FRAME_LOG)
+
+    def test_frame_timing_bucket(self):
+        results = reader.parse_log(self.log_path)
+        self.assertEqual([i for i, _ in results['frame_timing']], [7, 9, 13])
+        self.assertEqual([reader.frame_timing_kind(line) for _, line in results['frame_timing']],
+                         ['drops', 'delayed', 'decoder_drops'])
+        self.assertEqual(comparable(reader.parse_log(self.log_path, jobs=3)), comparable(results))
+        index_path = self.tmp_dir / 'index.json'
+        self.assertEqual(comparable(reader.parse_log_indexed(self.log_path, index_path=index_path)),
+                         comparable(results))
+
+    def test_session_rates(self):
+        results = reader.parse_log(self.log_path)
+        report = reader.frame_report(results['rife_sessions'], results['frame_timing'])
+        first, second = report['sessions']
+        self.assertEqual((first['model'], first['target'], first['crop'], first['vsr_path']),
+                         ('4221', '1600x672', '1920x800', 'true'))
+        self.assertEqual(first['target_fps'], 47.952)
+        self.assertEqual(first['vf_fps'], 47.0)       # samples after the first frame only
+        self.assertEqual(first['vs_fps'], 50.0)       # 1000 frames in 20 s
+        self.assertEqual((first['drops'], first['decoder_drops'], first['delayed']), (5, 1, 3))
+        self.assertEqual((first['logged_drops'], first['logged_delayed']), (1, 1))
+        self.assertFalse(first['behind'])
+        # No PY_FRAME markers: every sample counts, drops from the first one
+        self.assertEqual((second['vf_fps'], second['vs_fps'], second['drops']), (40.0, None, 20))
+        self.assertTrue(second['behind'])
+        self.assertEqual(report['budgets']['max_pixels_vsr_on'],
+                         {'sessions': 1, 'behind': 0, 'max_kept_up_mp': 1.075, 'min_behind_mp': None})
+        self.assertEqual(report['budgets']['max_pixels_vsr_off']['min_behind_mp'], 2.074)
+
+    def test_inference_skips(self):
+        events = [
+            (1, 10.0, 'TOGGLE', 'RIFE activation requested, container_fps=23.976'),
+            (2, 20.0, 'PY_SKIP', 'Inference skipped: pairs=1000 skipped=150 duplicate=140 scene_cut=10'),
+            (3, 30.0, 'PY_SKIP', 'Inference skipped: pairs=2000 skipped=500 duplicate=480 scene_cut=20'),
+        ]
+        session = reader.RIFESession(session_id=1, start_line=1, events=events)
+        self.assertEqual(reader.session_skips(session),
+                         {'skipped_duplicate': 480, 'skipped_scene_cut': 20, 'skip_ratio': 0.25})
+        row = reader.session_frames(reader.RIFESession(session_id=2, start_line=1, events=events[:1]))
+        self.assertIsNone(row['skip_ratio'])
+
+    def test_prefetch(self):
+        events = [
+            (1, 10.0, 'TOGGLE', 'RIFE activation requested, container_fps=23.976'),
+            (2, 10.5, 'PY_PREFETCH', 'Prefetch window: depth=6 workers=2'),
+            (3, 20.0, 'PY_PREFETCH', 'Prefetch: frames=480 hits=470 misses=10 ready=5 in_flight=1 depth=6'),
+            (4, 30.0, 'PY_PREFETCH', 'Prefetch: frames=960 hits=912 misses=48 ready=2 in_flight=2 depth=6'),
+        ]
+        session = reader.RIFESession(session_id=1, start_line=1, events=events)
+        self.assertEqual(reader.session_prefetch(session), {'prefetch_hit_ratio': 0.95, 'prefetch_ready': 2})
+        row = reader.session_frames(reader.RIFESession(session_id=2, start_line=1, events=events[:2]))
+        self.assertIsNone(row['prefetch_hit_ratio'])
+
+    def test_tier_changes(self):
+        events = [
+            (1, 10.0, 'TOGGLE', 'RIFE activation requested, container_fps=23.976'),
+            (2, 10.5, 'PY_TIER', 'Tiers: 1600x672, 1184x480, latency budget 41.7ms'),
+            (3, 20.0, 'PY_TIER', 'Tier 0 -> 1 (1184x480): latency=45.2ms budget=41.7ms'),
+            (4, 30.0, 'PY_TIER', 'Tier 1 -> 0 (1600x672): latency=20.1ms budget=41.7ms'),
+        ]
+        row = reader.session_frames(reader.RIFESession(session_id=1, start_line=1, events=events))
+        self.assertEqual((row['tier_changes'], row['lowest_tier']), (2, 1))
+
+    def test_merged_export(self):
+        sessions = reader.parse_log(self.log_path)['rife_sessions']
+        report = reader.merge_reports([reader.latency_report(sessions), reader.frame_report(sessions)])
+        self.assertIn('total', report['sessions'][0])
+        self.assertIn('fps_ratio', report['summary'])
+        path = self.tmp_dir / 'report.csv'
+        reader.export_report(report, path)
+        self.assertEqual(len(path.read_text().splitlines()), 1 + 2 + 3)
+
+
+PERF_LOG = """\
+[  10.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=23.976
+[  11.900][d][vapoursynth] [rife_adaptive][PY_INIT] Starting RIFE processing: crop=(0,140,1920,800), target=1600x672, model=4221
+[  11.950][d][vapoursynth] [rife_adaptive][PY_PERF] span=model_resolve ms=0.4
+[  13.800][d][vapoursynth] [rife_adaptive][PY_PERF] span=rife_setup ms=1850.2
+[  13.900][d][vapoursynth] [rife_adaptive][PY_PERF] span=graph_build ms=1998.7
+[  20.000][d][vapoursynth] [rife_adaptive][PY_PERF] stage=crop n=3 ms=0.02,0.03,0.02
+[  20.000][d][vapoursynth] [rife_adaptive][PY_PERF] stage=resize_in n=3 ms=1.50,1.70,2.60
+[  20.000][d][vapoursynth] [rife_adaptive][PY_PERF] stage=rife n=3 ms=14.20,15.10,40.00
+[  20.000][d][vapoursynth] [rife_adaptive][PY_PERF] stage=resize_out n=3 ms=0.90,1.10,0.80
+[  21.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE deactivation requested
+[  30.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=24
+[  31.000][d][vapoursynth] [rife_adaptive][PY_PERF] stage=rife n=1 ms=20.00
+"""
+
+
+class TestPerf(LogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log_path.write_text(PERF_LOG)
+        self.report = reader.perf_report(reader.parse_log(self.log_path)['rife_sessions'])
+
+    def test_session_rows(self):
+        first, second = self.report['sessions']
+        self.assertEqual((first['model'], first['target'], first['perf_frames']), ('4221', '1600x672', 3))
+        self.assertEqual((first['rife_ms'], first['resize_in_ms']), (15.1, 1.7))
+        self.assertEqual((first['graph_build_ms'], first['rife_setup_ms']), (1998.7, 1850.2))
+        self.assertEqual((second['perf_frames'], second['rife_ms'], second['crop_ms']), (1, 20.0, None))
+
+    def test_summary_over_frames(self):
+        rife = self.report['summary']['rife_ms']
+        self.assertEqual((rife['count'], rife['p50'], rife['max']), (4, 15.1, 40.0))
+        self.assertEqual(self.report['summary']['graph_build_ms']['count'], 1)
+
+    def test_histograms(self):
+        edges = reader.HISTOGRAM_EDGES_MS
+        self.assertEqual(reader.histogram([0.5, 0.6, 1000.0]), [1, 1] + [0] * (len(edges) - 3) + [1])
+        rife = self.report['histograms']['rife']
+        self.assertEqual(rife[edges.index(16)], 2)   # 14.2, 15.1
+        self.assertEqual(rife[edges.index(33)], 1)   # 20.0
+        self.assertEqual(rife[edges.index(67)], 1)   # 40.0
+        self.assertEqual(sum(self.report['histograms']['crop']), 3)
+
+    def test_merged_export(self):
+        sessions = reader.parse_log(self.log_path)['rife_sessions']
+        report = reader.merge_reports([reader.latency_report(sessions), self.report])
+        path = self.tmp_dir / 'report.csv'
+        reader.export_report(report, path)
+        self.assertEqual(len(path.read_text().splitlines()), 1 + 2 + 3)
+        path = self.tmp_dir / 'report.json'
+        reader.export_report(report, path)
+        self.assertEqual(len(json.loads(path.read_text())['histograms']['rife']), len(reader.HISTOGRAM_EDGES_MS))
+
+MEMORY_LOG = """\
+[  10.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=23.976
+[  11.900][d][vapoursynth] [rife_adaptive][PY_INIT] Starting RIFE processing: crop=(0,140,1920,800), target=1600x672, model=4221
+[  12.000][d][vapoursynth] [rife_adaptive][PY_MEM] Cache budget: threads=16->9 cache=4096MB->672MB frame=51.6MB available=10752MB
+[  40.000][d][vapoursynth] [rife_adaptive][PY_MEM] Memory: frames=480 cache=512MB/672MB rss=1830MB peak=1910MB
+[  60.000][d][vapoursynth] [rife_adaptive][PY_MEM] Memory: frames=960 cache=672MB/672MB rss=1790MB peak=2040MB
+[  61.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE deactivation requested
+[  70.000][d][rife_main] [rife_adaptive][TOGGLE] RIFE activation requested, container_fps=24
+"""
+
+
+class TestMemory(LogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log_path.write_text(MEMORY_LOG)
+        self.report = reader.memory_report(reader.parse_log(self.log_path)['rife_sessions'])
+
+    def test_session_rows(self):
+        first, second = self.report['sessions']
+        self.assertEqual((first['model'], first['threads'], first['frame_mb']), ('4221', 9, 51.6))
+        self.assertEqual((first['samples'], first['cache_limit_mb'], first['cache_mb']), (2, 672, 672))
+        self.assertEqual((first['rss_mb'], first['peak_mb']), (1790, 2040))  # Last resident, highest peak
+        self.assertEqual((second['threads'], second['samples'], second['peak_mb']), (None, 0, None))
+
+    def test_summary(self):
+        peak = self.report['summary']['peak_mb']
+        self.assertEqual((peak['count'], peak['max']), (1, 2040))
+
+class TestFleet(LogTestCase):
+    def setUp(self):
+        super().setUp()
+        (self.tmp_dir / 'b').mkdir()
+        (self.tmp_dir / 'b' / 'mpv-debug.log').write_text(PERF_LOG)
+        (self.tmp_dir / 'b' / 'notes.txt').write_text('not a log')
+        self.logs = reader.expand_logs(str(self.tmp_dir))
+
+    def test_expand_logs(self):
+        self.assertEqual(self.logs, [self.tmp_dir / 'b' / 'mpv-debug.log', self.log_path])
+        self.assertEqual(reader.expand_logs(str(self.tmp_dir / '*' / '*.log')), self.logs[:1])
+        self.assertEqual(reader.expand_logs(str(self.log_path)), [self.log_path])
+        self.assertEqual(reader.expand_logs(str(self.tmp_dir / 'missing*')), [])
+
+    def test_summary(self):
+        summary = reader.aggregate_logs(self.logs)
+        self.assertEqual((summary['sessions'], summary['errors'], summary['lua_errors'], summary['tracebacks']),
+                         (5, 3, 2, 2))
+        self.assertEqual([row['sessions'] for row in summary['logs']], [2, 3])  # Sorted by path: b/ first
+        # Session 2 of SAMPLE_LOG is replaced by a new activation: counted, but has no duration
+        self.assertEqual(summary['session_duration']['count'], 4)
+        self.assertEqual(summary['session_duration']['max'], 11.0)
+        # Prefixes (timestamps) are stripped so repeats across logs group together
+        self.assertIn(('Lua error: attempt to call a nil value', 1), summary['top_lua_errors'])
+        self.assertIn(('vapoursynth.Error: RIFE model not found', 1), summary['top_tracebacks'])
+
+    def test_ndjson_stream(self):
+        out = io.StringIO()
+        summary = reader.aggregate_logs(self.logs, out=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(records[-1], json_roundtrip({'kind': 'summary', **summary}))
+        by_kind = Counter(record['kind'] for record in records)
+        self.assertEqual((by_kind['session'], by_kind['errors'], by_kind['python_traceback']), (5, 3, 2))
+        self.assertEqual(by_kind['rife_event'],
+                         sum(reader.parse_log(path)['totals']['rife_by_category'] for path in self.logs))
+        self.assertNotIn('rife_adaptive', by_kind)
+        event = next(r for r in records if r['kind'] == 'rife_event' and r['category'] == 'CROP')
+        self.assertEqual((event['log'], event['line'], event['time']), (str(self.log_path), 5, 2.1))
+
+    def test_process_pool(self):
+        serial, parallel = io.StringIO(), io.StringIO()
+        self.assertEqual(reader.aggregate_logs(self.logs, jobs=2, out=parallel),
+                         reader.aggregate_logs(self.logs, out=serial))
+        self.assertEqual(sorted(parallel.getvalue().splitlines()), sorted(serial.getvalue().splitlines()))
+
+    def test_unreadable_log(self):
+        summary = reader.aggregate_logs([self.tmp_dir / 'gone.log'])
+        self.assertIn('Failed to read log', summary['logs'][0]['error'])
+        self.assertEqual(summary['sessions'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+test_prefetch.py - Tests for the lookahead prefetch ring
+
+Run from this directory:
+    python -m unittest test_prefetch
+"""
+
+import sys
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from prefetch import MAX_DEPTH, PrefetchRing
+
+
+class FakeNode:
+    """Stands in for VideoNode.get_frame_async; frames finish when told to."""
+
+    def __init__(self):
+        self.requested = []
+        self.futures = {}
+
+    def get_frame_async(self, n):
+        self.requested.append(n)
+        self.futures[n] = Future()
+        return self.futures[n]
+
+    def finish(self, *frames):
+        for n in frames:
+            self.futures[n].set_result(f"frame {n}")
+
+
+class TestPrefetchRing(unittest.TestCase):
+    def test_window_is_filled_ahead(self):
+        node = FakeNode()
+        ring = PrefetchRing(node.get_frame_async, depth=3, workers=3)
+        self.assertFalse(ring.advance(0))
+        self.assertEqual(node.requested, [1, 2, 3])
+        node.finish(1, 2)
+        self.assertTrue(ring.advance(1))
+        self.assertEqual(node.requested, [1, 2, 3, 4])
+        self.assertEqual((ring.hits, ring.misses), (1, 1))
+        self.assertEqual(ring.stats(), {'hits': 1, 'misses': 1, 'ready': 1, 'in_flight': 2})
+
+    def test_requests_are_never_awaited(self):
+        node = FakeNode()
+        ring = PrefetchRing(node.get_frame_async, depth=4, workers=4)
+        for n in range(3):
+            ring.advance(n)  # Would block if it waited on the unfinished futures
+        self.assertFalse(any(future.done() for future in node.futures.values()))
+
+    def test_workers_bound_requests_in_flight(self):
+        node = FakeNode()
+        ring = PrefetchRing(node.get_frame_async, depth=8, workers=2)
+        ring.advance(0)
+        self.assertEqual(node.requested, [1, 2])
+        ring.advance(0)  # Nothing finished: no new requests
+        self.assertEqual(node.requested, [1, 2])
+        node.finish(1)
+        ring.advance(1)
+        self.assertEqual(node.requested, [1, 2, 3])
+
+    def test_seek_restarts_window(self):
+        node = FakeNode()
+        ring = PrefetchRing(node.get_frame_async, depth=2, workers=4)
+        ring.advance(10)
+        ring.advance(100)
+        self.assertEqual(sorted(ring.ring), [101, 102])
+        ring.advance(50)
+        self.assertEqual(sorted(ring.ring), [51, 52])
+        self.assertEqual((ring.hits, ring.misses), (0, 3))
+
+    def test_bounds(self):
+        node = FakeNode()
+        ring = PrefetchRing(node.get_frame_async, depth=5, workers=8, length=3)
+        ring.advance(0)
+        self.assertEqual(node.requested, [1, 2])
+        self.assertEqual(PrefetchRing(node.get_frame_async, depth=1000, workers=0).depth, MAX_DEPTH)
+        ring = PrefetchRing(node.get_frame_async, depth=0, workers=1)
+        ring.advance(5)
+        self.assertEqual(ring.ring, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+test_proc_stats.py - Tests for the shared memory and percentile helpers
+
+Run from this directory:
+    python -m unittest test_proc_stats
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from proc_stats import available_memory, percentile, process_memory
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = [float(v) for v in range(1, 21)]
+        self.assertEqual(percentile(values, 50), 10.0)
+        self.assertEqual(percentile(values, 95), 19.0)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+
+
+class TestMemoryReaders(unittest.TestCase):
+    def test_figures_are_plausible(self):
+        available = available_memory()
+        rss, peak = process_memory()
+        if available is None or peak is None:
+            self.skipTest("memory figures not available on this platform")
+        self.assertGreater(available, 0)
+        self.assertGreaterEqual(peak, rss or 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+test_resize_plan.py - Tests for the resize plan around RIFE
+
+Run from this directory:
+    python -m unittest test_resize_plan
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from resize_plan import plan_resize
+
+
+class TestPlanResize(unittest.TestCase):
+    def test_upscale_and_downscale_use_the_kernel(self):
+        for src, dest in (((1280, 720), (1920, 1080)), ((3840, 2160), (1920, 1080))):
+            plan = plan_resize(*src, *dest, kernel="spline36")
+            self.assertTrue(plan['scale'])
+            self.assertEqual((plan['width'], plan['height']), dest)
+            self.assertEqual((plan['in_kernel'], plan['out_kernel']), ('Spline36', 'Spline36'))
+
+    def test_same_size_caps_input_kernel(self):
+        plan = plan_resize(1920, 1080, 1920, 1080, kernel="spline36")
+        self.assertFalse(plan['scale'])
+        self.assertEqual(plan['in_kernel'], 'Bicubic')
+        self.assertEqual(plan_resize(1920, 1080, 1920, 1080, kernel="bilinear")['in_kernel'], 'Bilinear')
+
+    def test_unknown_kernel(self):
+        self.assertEqual(plan_resize(1280, 720, 1920, 1080, kernel="lanczos")['in_kernel'], 'Spline36')
+
+    def test_vsr_keeps_420(self):
+        for chroma in ('auto', '444', '420'):
+            plan = plan_resize(1920, 1080, 1920, 1080, kernel="bicubic", vsr=True, output_chroma=chroma)
+            self.assertEqual((plan['out_format'], plan['out_kernel']), ('YUV420P10', 'Bicubic'))
+
+    def test_without_vsr_auto_is_444(self):
+        plan = plan_resize(1920, 1080, 1920, 1080, kernel="spline36", vsr=False)
+        self.assertEqual((plan['out_format'], plan['out_kernel']), ('YUV444P10', 'Bilinear'))
+        plan = plan_resize(1920, 1080, 1920, 1080, kernel="spline36", vsr=False, output_chroma="420")
+        self.assertEqual((plan['out_format'], plan['out_kernel']), ('YUV420P10', 'Spline36'))
+
+    def test_odd_dimensions(self):
+        plan = plan_resize(1919, 799, 1919, 799, vsr=True)
+        self.assertEqual((plan['width'], plan['height']), (1918, 798))  # 4:2:0 needs even sizes
+        self.assertTrue(plan['scale'])
+        plan = plan_resize(1919, 799, 1919, 799, vsr=False)
+        self.assertEqual((plan['width'], plan['height']), (1919, 799))  # 4:4:4 takes any size
+        self.assertFalse(plan['scale'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -493,3 +493,156 @@ function TestBoundaryConditions:test_width_limited_downscale_maximizes_width()
   lu.assertEquals(th, 1056)  -- Height derived from width, maintaining AR
   lu.assertTrue(tw * th <= 3000000)  -- Must still fit budget
 end
+
+TestFrameStats = {}
+
+function TestFrameStats:test_formats_counters()
+  lu.assertEquals(core.format_frame_stats(47.952, 3, 1, 12),
+                  "vf_fps=47.952 drops=3 decoder_drops=1 delayed=12")
+end
+
+function TestFrameStats:test_missing_properties_log_as_zero()
+  lu.assertEquals(core.format_frame_stats(nil, nil, nil, nil),
+                  "vf_fps=0.000 drops=0 decoder_drops=0 delayed=0")
+end
+
+TestPredictTargets = {}
+
+local prewarm_opts = {
+  enable_vsr = false,
+  max_pixels_vsr_on = 2.0,
+  max_pixels_vsr_off = 3.0,
+  min_vsr_mult = 1.5
+}
+
+function TestPredictTargets:test_full_frame_first()
+  local shapes = core.predict_targets(1920, 1080, 2560, 1440, prewarm_opts)
+  local tw, th = core.calculate_targets(1920, 1080, 2560, 1440, prewarm_opts)
+  lu.assertEquals(shapes[1], {tw, th})
+end
+
+function TestPredictTargets:test_letterbox_crops_match_calculate_targets()
+  local shapes = core.predict_targets(1920, 1080, 2560, 1440, prewarm_opts)
+  -- 2.39:1 crop of a 1920 wide source is 1920x804
+  local tw, th = core.calculate_targets(1920, 804, 2560, 1440, prewarm_opts)
+  lu.assertEquals(shapes[#shapes], {tw, th})
+  lu.assertTrue(#shapes <= 1 + #core.PREWARM_ASPECTS)
+end
+
+function TestPredictTargets:test_no_duplicates()
+  local shapes = core.predict_targets(1920, 1080, 2560, 1440, prewarm_opts)
+  local seen = {}
+  for _, shape in ipairs(shapes) do
+    local id = shape[1] .. "x" .. shape[2]
+    lu.assertNil(seen[id])
+    seen[id] = true
+  end
+end
+
+function TestPredictTargets:test_wide_source_skips_taller_crops()
+  -- A 2.4:1 source has no letterbox of the predicted aspects inside it
+  local shapes = core.predict_targets(1920, 800, 2560, 1440, prewarm_opts)
+  lu.assertEquals(#shapes, 1)
+end
+
+TestVsLogLevel = {}
+
+function TestVsLogLevel:test_log_file_records_debug()
+  lu.assertEquals(core.vs_log_level("mpv.log", ""), "debug")
+end
+
+function TestVsLogLevel:test_msg_level_debug_for_vapoursynth()
+  lu.assertEquals(core.vs_log_level("", "all=v,vapoursynth=debug"), "debug")
+  lu.assertEquals(core.vs_log_level(nil, "all=trace"), "debug")
+end
+
+function TestVsLogLevel:test_quiet_otherwise()
+  lu.assertEquals(core.vs_log_level("", ""), "warning")
+  lu.assertEquals(core.vs_log_level(nil, "all=v,cplayer=debug"), "warning")
+end
+
+TestTierShapes = {}
+
+function TestTierShapes:test_no_tiers()
+  lu.assertEquals(core.tier_shapes(1600, 672, ""), {{1600, 672}})
+end
+
+function TestTierShapes:test_scales_aligned_and_sorted()
+  lu.assertEquals(core.tier_shapes(1600, 672, "0.5,0.75"), {{1600, 672}, {1184, 480}, {800, 320}})
+end
+
+function TestTierShapes:test_invalid_and_duplicate_scales_dropped()
+  lu.assertEquals(core.tier_shapes(64, 64, "1.5,abc,0.9,0.95,0"), {{64, 64}, {32, 32}})
+end
+
+TestTileEngineShape = {}
+
+function TestTileEngineShape:test_off()
+  lu.assertNil(core.tile_engine_shape("", 1))
+  lu.assertNil(core.tile_engine_shape("0", 1))
+  lu.assertNil(core.tile_engine_shape("abc", 1))
+end
+
+function TestTileEngineShape:test_square_and_aligned()
+  lu.assertEquals(core.tile_engine_shape("512", 1), {512, 512})
+  lu.assertEquals(core.tile_engine_shape("650x400", 1), {640, 384})
+  lu.assertEquals(core.tile_engine_shape("16", 1), {32, 32})
+end
+
+function TestTileEngineShape:test_batch_stacks_vertically()
+  lu.assertEquals(core.tile_engine_shape("512x256", 3), {512, 768})
+end
+
+TestProfileBudgets = {}
+
+local profile = {
+  devices = {
+    ["trt:0"] = {name = "RTX 2060 SUPER", models = {
+      ["4221"] = {fps = 23.976, max_pixels_vsr_on = 2.4, max_pixels_vsr_off = 2.8},
+      ["4151"] = {fps = 23.976, max_pixels_vsr_off = 3.6},
+    }},
+  },
+}
+local fallback = {max_pixels_vsr_on = 2.0, max_pixels_vsr_off = 3.0}
+
+function TestProfileBudgets:test_same_fps_uses_profile()
+  local budgets = core.profile_budgets(profile, "trt", 0, 4221, 23.976, fallback)
+  lu.assertEquals(budgets, {max_pixels_vsr_on = 2.4, max_pixels_vsr_off = 2.8})
+end
+
+function TestProfileBudgets:test_scaled_to_content_fps()
+  local budgets = core.profile_budgets(profile, "trt", 0, 4221, 29.97, fallback)
+  lu.assertEquals(budgets.max_pixels_vsr_on, 1.92)
+  lu.assertEquals(budgets.max_pixels_vsr_off, 2.24)
+end
+
+function TestProfileBudgets:test_missing_budget_falls_back()
+  local budgets = core.profile_budgets(profile, "trt", 0, 4151, 23.976, fallback)
+  lu.assertEquals(budgets, {max_pixels_vsr_on = 2.0, max_pixels_vsr_off = 3.6})
+end
+
+function TestProfileBudgets:test_not_calibrated()
+  lu.assertNil(core.profile_budgets(profile, "trt", 1, 4221, 23.976, fallback))
+  lu.assertNil(core.profile_budgets(profile, "ncnn", 0, 4221, 23.976, fallback))
+  lu.assertNil(core.profile_budgets(nil, "trt", 0, 4221, 23.976, fallback))
+end
+
+function TestProfileBudgets:test_auto_uses_the_backend_it_resolves_to()
+  lu.assertEquals(core.profile_backend(profile, "auto", 0), "trt")
+  lu.assertEquals(core.profile_backend(profile, "ncnn", 0), "ncnn")
+  lu.assertEquals(core.profile_backend(profile, "auto", 1), "auto")
+  local budgets = core.profile_budgets(profile, "auto", 0, 4221, 23.976, fallback)
+  lu.assertEquals(budgets, {max_pixels_vsr_on = 2.4, max_pixels_vsr_off = 2.8})
+  local cpu_only = {devices = {["ov_cpu:0"] = {models = {["4221"] = {fps = 23.976, max_pixels_vsr_off = 0.5}}}}}
+  lu.assertEquals(core.profile_backend(cpu_only, "auto", 0), "ov_cpu")
+end
+
+function TestProfileBudgets:test_calculate_targets_prefers_budgets()
+  local opts = {enable_vsr = false, max_pixels_vsr_on = 8.0, max_pixels_vsr_off = 8.0, min_vsr_mult = 1.5,
+                budgets = {max_pixels_vsr_on = 1.0, max_pixels_vsr_off = 1.0}}
+  local tw, th = core.calculate_targets(1920, 1080, 3840, 2160, opts)
+  lu.assertTrue(tw * th <= 1000000)
+  opts.budgets = nil
+  tw, th = core.calculate_targets(1920, 1080, 3840, 2160, opts)
+  lu.assertEquals({tw, th}, {1856, 1056})
+end
@@ -0,0 +1,55 @@
+"""
+test_tier_governor.py - Tests for the resolution tier policy
+
+Run from this directory:
+    python -m unittest test_tier_governor
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tier_governor import TierGovernor, parse_tiers, tier_shapes
+
+
+class TestTierShapes(unittest.TestCase):
+    def test_parse_tiers(self):
+        self.assertEqual(parse_tiers('0.5, 0.75,0.5'), [0.75, 0.5])
+        self.assertEqual(parse_tiers('1.5,abc,0'), [])
+        self.assertEqual(parse_tiers(''), [])
+
+    def test_shapes_aligned(self):
+        self.assertEqual(tier_shapes(1600, 672, [0.75, 0.5]), [(1600, 672), (1184, 480), (800, 320)])
+        self.assertEqual(tier_shapes(64, 64, [0.9, 0.95]), [(64, 64), (32, 32)])
+
+
+class TestTierGovernor(unittest.TestCase):
+    def feed(self, governor, latency, frames):
+        return [tier for tier in (governor.observe(latency) for _ in range(frames)) if tier is not None]
+
+    def test_steps_down_under_load_and_holds(self):
+        governor = TierGovernor(3, budget=0.040, hold=10, alpha=1.0)
+        self.assertEqual(self.feed(governor, 0.030, 30), [])
+        # One change per hold period, never past the lowest tier
+        self.assertEqual(self.feed(governor, 0.060, 40), [1, 2])
+        self.assertEqual(governor.tier, 2)
+
+    def test_steps_up_only_well_below_budget(self):
+        governor = TierGovernor(3, budget=0.040, hold=10, alpha=1.0)
+        self.feed(governor, 0.060, 20)
+        self.assertEqual(governor.tier, 2)
+        self.assertEqual(self.feed(governor, 0.030, 30), [])   # between the ratios: stay
+        self.assertEqual(self.feed(governor, 0.010, 20), [1, 0])
+
+    def test_single_spike_is_smoothed(self):
+        governor = TierGovernor(2, budget=0.040, hold=5)
+        self.feed(governor, 0.020, 20)
+        self.assertIsNone(governor.observe(0.200))
+        self.assertEqual(self.feed(governor, 0.020, 20), [])
+        self.assertEqual(governor.tier, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+test_tiling.py - Tests for the tiled inference layout
+
+Run from this directory:
+    python -m unittest test_tiling
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tiling import batch_groups, clamp_overlap, engine_shape, parse_tile_size, tile_layout, tile_origins, tile_seams
+
+
+class TestTileSize(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_tile_size('512'), (512, 512))
+        self.assertEqual(parse_tile_size('650X400'), (640, 384))
+        self.assertEqual(parse_tile_size('16'), (32, 32))
+        for text in ('', '0', 'abc', '512x', '1x2x3'):
+            self.assertIsNone(parse_tile_size(text), text)
+
+    def test_clamp_overlap(self):
+        self.assertEqual(clamp_overlap(64, (512, 256)), 64)
+        self.assertEqual(clamp_overlap(400, (512, 256)), 128)
+        self.assertEqual(clamp_overlap(-5, (512, 256)), 0)
+
+
+class TestLayout(unittest.TestCase):
+    def test_origins_cover_with_overlap(self):
+        origins = tile_origins(1920, 512, 64)
+        self.assertEqual(origins, [0, 448, 896, 1344, 1408])
+        for a, b in zip(origins, origins[1:]):
+            self.assertGreaterEqual(a + 512 - b, 64)  # Every seam has at least the overlap
+        self.assertEqual(origins[-1] + 512, 1920)
+
+    def test_exact_and_small(self):
+        self.assertEqual(tile_origins(512, 512, 64), [0])
+        self.assertEqual(tile_origins(300, 512, 64), [0])
+        self.assertEqual(tile_origins(960, 512, 64), [0, 448])
+
+    def test_seams(self):
+        origins = tile_origins(1920, 512, 64)
+        self.assertEqual(tile_seams(origins, 512), [64, 64, 64, 448])
+        self.assertEqual(tile_seams([0], 512), [])
+
+    def test_zero_overlap_tiles_only_touch(self):
+        self.assertEqual(clamp_overlap(0, (512, 512)), 0)
+        origins = tile_origins(1024, 512, 0)
+        self.assertEqual(origins, [0, 512])
+        self.assertEqual(tile_seams(origins, 512), [0])  # Stacked, no cross-fade
+        origins = tile_origins(1100, 512, 0)
+        self.assertEqual(tile_seams(origins, 512), [0, 436])
+
+    def test_layout_pads_small_frames(self):
+        xs, ys = tile_layout(1600, 320, (512, 512), 64)
+        self.assertEqual((xs, ys), ([0, 448, 896, 1088], [0]))
+
+    def test_batches_keep_engine_shape(self):
+        self.assertEqual(batch_groups(5, 2), [[0, 1], [2, 3], [4, 4]])
+        self.assertEqual(batch_groups(4, 1), [[0], [1], [2], [3]])
+        self.assertEqual(batch_groups(2, 4), [[0, 1, 1, 1]])
+        self.assertEqual(engine_shape((512, 256), 3), (512, 768))
+        self.assertEqual(engine_shape((512, 256), 0), (512, 256))
+
+
+if __name__ == '__main__':
+    unittest.main()
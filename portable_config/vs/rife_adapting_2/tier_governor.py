@@ -0,0 +1,76 @@
+"""
+tier_governor.py - Runtime choice between RIFE resolution tiers
+
+process() can build the RIFE stage at a few resolutions at once (tier 0 is
+the planned target, each further tier a smaller scale of it) and pick one
+per frame. TierGovernor makes that pick from measured frame latency: it
+steps down a tier when the smoothed latency exceeds the budget and back up
+once it is well below, holding each tier for a minimum number of frames so
+a single slow frame does not make it flap. Kept free of VapourSynth so the
+policy can be tested on its own.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+ALIGN = 32           # Same alignment as rife_core.calculate_targets
+DOWN_RATIO = 1.0     # Smoothed latency above budget * this -> next lower tier
+UP_RATIO = 0.6       # Smoothed latency below budget * this -> next higher tier
+HOLD_FRAMES = 48     # Frames a tier is kept before the next change
+EMA_ALPHA = 0.1      # Weight of the newest latency sample
+
+def parse_tiers(text: str) -> List[float]:
+    """'0.75,0.5' -> [0.75, 0.5]; scales outside (0, 1) are dropped."""
+    scales = []
+    for part in (text or "").split(","):
+        try:
+            scale = float(part)
+        except ValueError:
+            continue
+        if 0 < scale < 1:
+            scales.append(scale)
+    return sorted(set(scales), reverse=True)
+
+def tier_shapes(width: int, height: int, scales: Sequence[float]) -> List[Tuple[int, int]]:
+    """Target shape of each tier: (width, height) first, then each scale of it
+    aligned down to ALIGN (at least ALIGN), without duplicates."""
+    shapes = [(width, height)]
+    for scale in scales:
+        shape = (max(ALIGN, int(width * scale) // ALIGN * ALIGN),
+                 max(ALIGN, int(height * scale) // ALIGN * ALIGN))
+        if shape not in shapes:
+            shapes.append(shape)
+    return shapes
+
+class TierGovernor:
+    """Latency-driven tier selection with hysteresis.
+
+    observe() takes one frame latency (seconds) and returns the new tier when
+    it changes, else None. Tier 0 is the highest quality, count - 1 the lowest.
+    """
+
+    def __init__(self, count: int, budget: float, down_ratio: float = DOWN_RATIO,
+                 up_ratio: float = UP_RATIO, hold: int = HOLD_FRAMES, alpha: float = EMA_ALPHA):
+        self.count = count
+        self.budget = budget
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.hold = hold
+        self.alpha = alpha
+        self.tier = 0
+        self.latency = None  # Smoothed latency (seconds)
+        self.held = 0        # Frames observed since the last change
+
+    def observe(self, latency: float) -> Optional[int]:
+        self.latency = latency if self.latency is None else (
+            self.alpha * latency + (1 - self.alpha) * self.latency)
+        self.held += 1
+        if self.held < self.hold:
+            return None
+        if self.latency > self.budget * self.down_ratio and self.tier < self.count - 1:
+            self.tier += 1
+        elif self.latency < self.budget * self.up_ratio and self.tier > 0:
+            self.tier -= 1
+        else:
+            return None
+        self.held = 0
+        return self.tier
@@ -0,0 +1,72 @@
+"""
+tiling.py - Tile layout for fixed-shape RIFE inference
+
+In tiled mode process() cuts each RGB frame into overlapping tiles of one
+fixed size, runs every tile pair through the same RIFE engine and
+cross-fades the overlaps when reassembling the frame. A frame smaller than
+a tile is padded up to it first. batch tiles are stacked vertically into
+one inference frame, so the engine shape is tile_w x (tile_h * batch) for
+every target resolution. Kept free of VapourSynth so the layout can be
+tested on its own.
+"""
+
+from typing import List, Optional, Tuple
+
+ALIGN = 32            # Same alignment as rife_core.calculate_targets
+DEFAULT_OVERLAP = 64  # Pixels shared by neighbouring tiles (cross-faded)
+
+def parse_tile_size(text: str) -> Optional[Tuple[int, int]]:
+    """'512' -> (512, 512), '640x384' -> (640, 384), aligned down to ALIGN;
+    None for '' / '0' (tiling off) or anything unparsable."""
+    parts = (text or "").lower().split("x")
+    try:
+        sizes = [int(part) for part in parts]
+    except ValueError:
+        return None
+    if len(sizes) == 1:
+        sizes *= 2
+    if len(sizes) != 2 or min(sizes) <= 0:
+        return None
+    return tuple(max(ALIGN, size // ALIGN * ALIGN) for size in sizes)
+
+def clamp_overlap(overlap: int, tile: Tuple[int, int]) -> int:
+    """Overlap limited to [0, half the smaller tile side]."""
+    return max(0, min(int(overlap), min(tile) // 2))
+
+def tile_origins(length: int, tile: int, overlap: int) -> List[int]:
+    """Tile starts along one axis of `length` pixels (at least tile): steps of
+    tile - overlap, with the last tile moved back to end exactly at length."""
+    if length <= tile:
+        return [0]
+    step = max(1, tile - overlap)
+    origins = list(range(0, length - tile, step))
+    origins.append(length - tile)
+    return origins
+
+def tile_seams(origins: List[int], tile: int) -> List[int]:
+    """Pixels each tile shares with the one before it (0 where they only
+    touch, e.g. with no overlap on a length that is a multiple of tile)."""
+    return [max(0, previous + tile - origin) for previous, origin in zip(origins, origins[1:])]
+
+def padded_size(width: int, height: int, tile: Tuple[int, int]) -> Tuple[int, int]:
+    """Frame size after padding up to at least one tile."""
+    return max(width, tile[0]), max(height, tile[1])
+
+def tile_layout(width: int, height: int, tile: Tuple[int, int],
+                overlap: int) -> Tuple[List[int], List[int]]:
+    """(x origins, y origins) of the tiles covering a padded width x height frame."""
+    pad_w, pad_h = padded_size(width, height, tile)
+    return tile_origins(pad_w, tile[0], overlap), tile_origins(pad_h, tile[1], overlap)
+
+def batch_groups(count: int, batch: int) -> List[List[int]]:
+    """Tile indices per inference frame; the last group is filled up by
+    repeating its last tile so every frame has the engine's shape."""
+    batch = max(1, batch)
+    groups = [list(range(start, min(start + batch, count))) for start in range(0, count, batch)]
+    if groups and len(groups[-1]) < batch:
+        groups[-1] += [groups[-1][-1]] * (batch - len(groups[-1]))
+    return groups
+
+def engine_shape(tile: Tuple[int, int], batch: int) -> Tuple[int, int]:
+    """Shape of the single engine serving every target in tiled mode."""
+    return tile[0], tile[1] * max(1, batch)